@@ -0,0 +1,227 @@
+"""
+Parsing pipeline benchmarks over the recorded corpora in benchmarks/corpora.
+
+    python benchmarks/bench_parsing.py                         # 1k, 50k, 500k lines
+    python benchmarks/bench_parsing.py --sizes 1000,50000 --filter gutter
+    python benchmarks/bench_parsing.py --save baseline.json
+    python benchmarks/bench_parsing.py --compare baseline.json --threshold 10
+
+Each corpus is cut or repeated to the requested number of input lines.
+Time is the best of --repeat runs; peak memory comes from one extra run
+under tracemalloc (Python allocations only, not c++filt). --compare exits
+with status 1 when any case is slower or uses more memory than the baseline
+by more than --threshold percent.
+"""
+import argparse
+import gzip
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from localbolt.parsing import (  # noqa: E402
+    clean_assembly_with_mapping, parse_diagnostics, parse_mca_output, process_assembly,
+)
+from localbolt.parsing.functions import is_instruction_line  # noqa: E402
+from localbolt.utils.highlighter import build_gutter, highlight_asm_line  # noqa: E402
+
+CORPORA = Path(__file__).resolve().parent / "corpora"
+BASELINE_VERSION = 1
+DEFAULT_SIZES = [1_000, 50_000, 500_000]
+SOURCES = {"gcc": "workload.cpp", "clang": "workload.cpp", "rustc": "workload.rs"}
+TIME_BUDGET_S = 5.0  # stop repeating a case once it has used this much time
+
+
+@dataclass
+class Case:
+    fn: Callable[[], object]
+    n_lines: int
+    n_bytes: int  # 0 when the input is not a single text (per-line cases)
+
+
+@dataclass
+class Result:
+    seconds: float
+    lines_per_s: float
+    mb_per_s: float
+    peak_kib: float
+
+
+def load_corpus(name: str) -> Optional[str]:
+    path = CORPORA / name
+    if not path.exists():
+        return None
+    with gzip.open(path, "rt") as f:
+        return f.read()
+
+
+def scale_lines(text: str, n: int) -> str:
+    """Cuts or repeats text to exactly n lines."""
+    lines = text.splitlines()
+    if not lines:
+        return ""
+    repeats = -(-n // len(lines))
+    return "\n".join((lines * repeats)[:n]) + "\n"
+
+
+def scale_mca(report: str, n: int) -> str:
+    """Repeats the Instruction Info rows so the table has about n rows; the rest of the report is kept."""
+    lines = report.splitlines()
+    start = next(i for i, line in enumerate(lines) if "[1]" in line and "[2]" in line) + 1
+    end = next(i for i in range(start, len(lines)) if not lines[i].strip())
+    rows = lines[start:end]
+    repeats = -(-n // len(rows))
+    return "\n".join(lines[:start] + (rows * repeats)[:n] + lines[end:]) + "\n"
+
+
+def listing(asm: str, source: str) -> List[str]:
+    """Cleaned listing lines, as the app displays them."""
+    clean, _ = clean_assembly_with_mapping(asm, source)
+    return clean.splitlines()
+
+
+def _synthetic_cycles(lines: List[str]) -> Dict[int, int]:
+    return {i + 1: 1 + i % 6 for i, line in enumerate(lines) if is_instruction_line(line)}
+
+
+def build_cases(sizes: List[int]) -> Dict[str, Case]:
+    """Returns {"function/toolchain/lines": Case}; inputs are prepared up front and not timed."""
+    cases: Dict[str, Case] = {}
+    for toolchain, source in SOURCES.items():
+        asm = load_corpus(f"{toolchain}.s.gz")
+        mca = load_corpus(f"{toolchain}.mca.txt.gz")
+        diag = load_corpus(f"{toolchain}.diag.txt.gz")
+        language = "rust" if toolchain == "rustc" else "cpp"
+        full_listing = "\n".join(listing(asm, source)) if asm else ""
+
+        for n in sizes:
+            if asm:
+                raw = scale_lines(asm, n)
+                lines = scale_lines(full_listing, n).splitlines()
+                cycles = _synthetic_cycles(lines)
+                cases[f"clean_assembly_with_mapping/{toolchain}/{n}"] = Case(
+                    lambda raw=raw, source=source: clean_assembly_with_mapping(raw, source), n, len(raw))
+                cases[f"process_assembly/{toolchain}/{n}"] = Case(
+                    lambda raw=raw, source=source, language=language: process_assembly(raw, source, language=language),
+                    n, len(raw))
+                cases[f"highlight_asm_line/{toolchain}/{n}"] = Case(
+                    lambda lines=lines: [highlight_asm_line(line, "on #EBEEEE") for line in lines], n, 0)
+                cases[f"build_gutter/{toolchain}/{n}"] = Case(
+                    lambda lines=lines, cycles=cycles: build_gutter(lines, cycles), n, 0)
+            if mca:
+                report = scale_mca(mca, n)
+                cases[f"parse_mca_output/{toolchain}/{n}"] = Case(
+                    lambda report=report: parse_mca_output(report), n, len(report))
+            if diag:
+                stderr = scale_lines(diag, n)
+                cases[f"parse_diagnostics/{toolchain}/{n}"] = Case(
+                    lambda stderr=stderr: parse_diagnostics(stderr), n, len(stderr))
+    return cases
+
+
+def run_case(case: Case, repeat: int) -> Result:
+    best = float("inf")
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > TIME_BUDGET_S:
+            break
+
+    tracemalloc.start()
+    try:
+        case.fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        seconds=best,
+        lines_per_s=case.n_lines / best if best else 0.0,
+        mb_per_s=case.n_bytes / best / 1e6 if best else 0.0,
+        peak_kib=peak / 1024,
+    )
+
+
+def compare(baseline: Dict[str, Result], current: Dict[str, Result], threshold: float) -> List[str]:
+    """Returns one message per case whose time or peak memory grew by more than threshold percent."""
+    limit = 1.0 + threshold / 100.0
+    regressions = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if now.seconds > before.seconds * limit:
+            regressions.append(f"{name}: time {before.seconds * 1000:.1f}ms -> {now.seconds * 1000:.1f}ms")
+        if now.peak_kib > before.peak_kib * limit:
+            regressions.append(f"{name}: peak {before.peak_kib:.0f}KiB -> {now.peak_kib:.0f}KiB")
+    return regressions
+
+
+def save_results(results: Dict[str, Result], path: str) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "results": {name: asdict(r) for name, r in sorted(results.items())},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Result]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version: {data.get('version')}")
+    return {name: Result(**r) for name, r in data["results"].items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the LocalBolt parsing pipeline")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated input line counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is reported)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent (default: 10)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cases = {name: case for name, case in build_cases(sizes).items() if args.filter in name}
+    if not cases:
+        print("No benchmark cases (missing corpora? run benchmarks/make_corpora.py)", file=sys.stderr)
+        return 1
+
+    results: Dict[str, Result] = {}
+    print(f"{'case':<48} {'time':>10} {'lines/s':>12} {'MB/s':>8} {'peak':>10}")
+    for name, case in cases.items():
+        r = run_case(case, args.repeat)
+        results[name] = r
+        mb = f"{r.mb_per_s:8.1f}" if case.n_bytes else f"{'-':>8}"
+        print(f"{name:<48} {r.seconds * 1000:>8.1f}ms {r.lines_per_s:>12,.0f} {mb} {r.peak_kib / 1024:>8.1f}MB")
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"Saved {len(results)} result(s) to {args.save}")
+
+    if args.compare:
+        regressions = compare(load_results(args.compare), results, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        print(f"{len(regressions)} regression(s) over {args.threshold:g}%")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+End-to-end refresh latency: save the source file, then wait for the
+watcher -> engine -> Textual app chain to finish rendering the new listing.
+The app runs headless (App.run_test) against the stand-in toolchain from
+fake_toolchain.py, so toolchain time is fixed and anything else that moves
+is our own code.
+
+    python benchmarks/bench_refresh.py
+    python benchmarks/bench_refresh.py --asm-lines 200000 --saves 10
+    python benchmarks/bench_refresh.py --compile-ms 300 --mca-ms 100
+    python benchmarks/bench_refresh.py --save refresh.json
+    python benchmarks/bench_refresh.py --compare refresh.json --threshold 20
+
+Per save it reports the save-to-render latency and its parts: watcher
+(save -> refresh start), the engine stages (compile, mca, ...) and ui
+(state message -> first screen refresh after the listing is mounted).
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import fake_toolchain  # noqa: E402
+from bench_parsing import CORPORA, load_corpus, scale_lines  # noqa: E402
+
+BASELINE_VERSION = 1
+SOURCES = {"gcc": "workload.cpp", "rustc": "workload.rs"}
+RENDER_TIMEOUT_S = 60.0
+
+
+def prepare_workspace(root: Path, toolchain: str, asm_lines: int, compile_ms: float, mca_ms: float) -> Path:
+    """
+    Lays out bin/ (fake tools), home/ (isolated ~/.localbolt config) and the
+    source file under root, and points PATH/HOME/LOCALBOLT_FAKE_* at them.
+    Returns the source path.
+    """
+    bin_dir, home = root / "bin", root / "home"
+    bin_dir.mkdir()
+    (home / ".localbolt").mkdir(parents=True)
+    fake_toolchain.install(bin_dir)
+
+    asm = load_corpus(f"{toolchain}.s.gz")
+    mca = load_corpus(f"{toolchain}.mca.txt.gz") or load_corpus("gcc.mca.txt.gz")
+    if asm is None or mca is None:
+        raise SystemExit(f"Missing {toolchain} corpora (run benchmarks/make_corpora.py)")
+    (root / "recorded.s").write_text(scale_lines(asm, asm_lines) if asm_lines else asm)
+    (root / "recorded.mca.txt").write_text(mca)
+
+    config = {"compiler": "g++", "opt_level": "-O2", "flags": []}
+    (home / ".localbolt" / "config.json").write_text(json.dumps(config))
+    source = root / "src" / SOURCES[toolchain]
+    source.parent.mkdir()
+    shutil.copy(CORPORA / "src" / SOURCES[toolchain], source)
+
+    os.environ.update({
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "HOME": str(home),
+        "LOCALBOLT_FAKE_ASM": str(root / "recorded.s"),
+        "LOCALBOLT_FAKE_MCA": str(root / "recorded.mca.txt"),
+        "LOCALBOLT_FAKE_COMPILE_MS": str(compile_ms),
+        "LOCALBOLT_FAKE_MCA_MS": str(mca_ms),
+    })
+    os.environ.pop("LOCALBOLT_TRACE", None)
+    return source
+
+
+async def measure(source: Path, saves: int, interval: float, size: tuple) -> List[Dict[str, float]]:
+    """Returns one {metric: ms} dict per save."""
+    from localbolt.ui.app import LocalBoltApp
+
+    app = LocalBoltApp(str(source))
+    rendered: List[float] = []  # perf_counter at each completed "ui" stage
+    record_stage = app.engine.record_stage
+
+    def record_and_mark(name: str, ms: float) -> None:
+        record_stage(name, ms)
+        if name == "ui":
+            rendered.append(time.perf_counter())
+
+    app.engine.record_stage = record_and_mark
+
+    async def wait_for_render(count: int) -> bool:
+        deadline = time.perf_counter() + RENDER_TIMEOUT_S
+        while len(rendered) < count:
+            if time.perf_counter() > deadline:
+                return False
+            await asyncio.sleep(0.002)
+        return True
+
+    samples = []
+    async with app.run_test(size=size):
+        if not await wait_for_render(1):
+            raise SystemExit("Initial render never completed")
+        original = source.read_text()
+        for i in range(saves):
+            # Stay clear of the watcher's debounce window between saves
+            await asyncio.sleep(interval)
+            saved_wall, saved = time.time(), time.perf_counter()
+            source.write_text(original + f"\n// save {i}\n")
+            if not await wait_for_render(i + 2):
+                print(f"save {i}: no render within {RENDER_TIMEOUT_S:.0f}s", file=sys.stderr)
+                continue
+            timings = app.engine.last_timings
+            sample = {"save_to_render": (rendered[-1] - saved) * 1000.0,
+                      "watcher": (timings.started_at - saved_wall) * 1000.0}
+            sample.update(timings.by_stage())
+            samples.append(sample)
+    return samples
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """{metric: {"median", "p95", "max"}} over all samples."""
+    metrics: Dict[str, List[float]] = {}
+    for sample in samples:
+        for name, ms in sample.items():
+            metrics.setdefault(name, []).append(ms)
+    summary = {}
+    for name, values in metrics.items():
+        values.sort()
+        summary[name] = {
+            "median": statistics.median(values),
+            "p95": values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))],
+            "max": values[-1],
+        }
+    return summary
+
+
+def compare(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Median regressions over threshold percent; metrics under 1ms are too noisy to gate on."""
+    limit = 1.0 + threshold / 100.0
+    regressions = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None or max(before["median"], now["median"]) < 1.0:
+            continue
+        if now["median"] > before["median"] * limit:
+            regressions.append(f"{name}: median {before['median']:.1f}ms -> {now['median']:.1f}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark save-to-render latency with a stand-in toolchain")
+    parser.add_argument("--toolchain", choices=sorted(SOURCES), default="gcc", help="Recorded corpus to replay")
+    parser.add_argument("--asm-lines", type=int, default=0, help="Scale the recorded assembly to this many lines")
+    parser.add_argument("--compile-ms", type=float, default=0.0, help="Stand-in compiler delay")
+    parser.add_argument("--mca-ms", type=float, default=0.0, help="Stand-in llvm-mca delay")
+    parser.add_argument("--saves", type=int, default=5, help="Number of saves to measure")
+    parser.add_argument("--interval", type=float, default=0.7, help="Seconds between saves")
+    parser.add_argument("--save", metavar="PATH", help="Write the summary as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare medians against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent (default: 20)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="localbolt-bench-") as tmp:
+        source = prepare_workspace(Path(tmp), args.toolchain, args.asm_lines, args.compile_ms, args.mca_ms)
+        samples = asyncio.run(measure(source, args.saves, args.interval, (160, 50)))
+
+    if not samples:
+        print("No refreshes were measured", file=sys.stderr)
+        return 1
+    summary = summarize(samples)
+    print(f"{'metric':<16} {'median':>10} {'p95':>10} {'max':>10}   ({len(samples)} saves)")
+    for name, s in summary.items():
+        print(f"{name:<16} {s['median']:>8.1f}ms {s['p95']:>8.1f}ms {s['max']:>8.1f}ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"version": BASELINE_VERSION, "summary": summary}, f, indent=1)
+            f.write("\n")
+        print(f"Saved summary to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            data = json.load(f)
+        if data.get("version") != BASELINE_VERSION:
+            print(f"Error: Unsupported baseline version: {data.get('version')}", file=sys.stderr)
+            return 1
+        regressions = compare(data["summary"], summary, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        print(f"{len(regressions)} regression(s) over {args.threshold:g}%")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+CLI startup cost: runs short-lived `localbolt` invocations in fresh
+interpreters and reports wall time and total import time from
+`python -X importtime`.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 20 --save startup.json
+    python benchmarks/bench_startup.py --compare startup.json --threshold 20
+
+Every scenario has a budget: modules it must not import at all (Textual,
+watchdog, the engine, ... on paths that never use them) and a limit on
+median import time. The exit status is 1 when any budget is broken, so
+scripted users who run LocalBolt hundreds of times notice when a
+top-level import sneaks back in.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+BASELINE_VERSION = 1
+HEAVY = ("textual", "rich", "watchdog", "localbolt.engine", "localbolt.ui", "localbolt.compiler")
+
+
+@dataclass
+class Scenario:
+    argv: List[str]
+    budget_ms: float  # median total import time
+    forbidden: Tuple[str, ...] = HEAVY
+
+
+@dataclass
+class Result:
+    wall_ms: float
+    import_ms: float
+    modules: int
+    forbidden: List[str] = field(default_factory=list)  # forbidden modules that were imported
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "help": Scenario(["--help"], budget_ms=75),
+    "missing-file": Scenario(["missing.cpp"], budget_ms=75),
+    "assemblyhelp": Scenario(["--assemblyhelp"], budget_ms=200, forbidden=("textual", "watchdog", "localbolt.engine")),
+    "analyze-help": Scenario(["analyze", "--help"], budget_ms=150),
+    "query-no-daemon": Scenario(["query", "a.cpp", "--socket", "/nonexistent/localbolt.sock"], budget_ms=160),
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """{module: self time in microseconds} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def _is_forbidden(module: str, forbidden: Tuple[str, ...]) -> bool:
+    return any(module == f or module.startswith(f + ".") for f in forbidden)
+
+
+def run_once(argv: List[str], cwd: str) -> Tuple[float, Dict[str, int]]:
+    """One fresh interpreter running `localbolt <argv>`; returns (wall ms, importtime per module)."""
+    code = f"import sys; sys.argv = ['localbolt'] + {argv!r}; from localbolt.main import run; run()"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd, env=env,
+                          capture_output=True, text=True)
+    return (time.perf_counter() - start) * 1000.0, parse_importtime(proc.stderr)
+
+
+def run_scenario(scenario: Scenario, repeat: int) -> Result:
+    walls, imports = [], []
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(repeat):
+            wall, modules = run_once(scenario.argv, cwd)
+            walls.append(wall)
+            imports.append(sum(modules.values()) / 1000.0)
+    return Result(
+        wall_ms=statistics.median(walls),
+        import_ms=statistics.median(imports),
+        modules=len(modules),
+        forbidden=sorted(m for m in modules if _is_forbidden(m, scenario.forbidden)),
+    )
+
+
+def check_budget(name: str, scenario: Scenario, result: Result) -> List[str]:
+    messages = []
+    if result.forbidden:
+        shown = ", ".join(result.forbidden[:5]) + (" ..." if len(result.forbidden) > 5 else "")
+        messages.append(f"{name}: imports {shown}")
+    if result.import_ms > scenario.budget_ms:
+        messages.append(f"{name}: import time {result.import_ms:.1f}ms over budget {scenario.budget_ms:g}ms")
+    return messages
+
+
+def compare(baseline: Dict[str, Result], current: Dict[str, Result], threshold: float) -> List[str]:
+    """Returns one message per scenario whose import time grew by more than threshold percent."""
+    limit = 1.0 + threshold / 100.0
+    regressions = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is not None and now.import_ms > before.import_ms * limit:
+            regressions.append(f"{name}: import {before.import_ms:.1f}ms -> {now.import_ms:.1f}ms")
+    return regressions
+
+
+def save_results(results: Dict[str, Result], path: str) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "results": {name: asdict(r) for name, r in sorted(results.items())},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Result]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version: {data.get('version')}")
+    return {name: Result(**r) for name, r in data["results"].items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LocalBolt CLI startup")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (median is reported)")
+    parser.add_argument("--filter", default="", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent (default: 20)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Result] = {}
+    broken: List[str] = []
+    print(f"{'scenario':<18} {'wall':>9} {'imports':>9} {'budget':>8} {'modules':>8}")
+    for name, scenario in SCENARIOS.items():
+        if args.filter not in name:
+            continue
+        r = run_scenario(scenario, args.repeat)
+        results[name] = r
+        print(f"{name:<18} {r.wall_ms:>7.1f}ms {r.import_ms:>7.1f}ms {scenario.budget_ms:>6g}ms {r.modules:>8}")
+        broken += check_budget(name, scenario, r)
+
+    for message in broken:
+        print(f"OVER BUDGET {message}")
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"Saved {len(results)} result(s) to {args.save}")
+
+    regressions: List[str] = []
+    if args.compare:
+        regressions = compare(load_results(args.compare), results, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        print(f"{len(regressions)} regression(s) over {args.threshold:g}%")
+    return 1 if broken or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
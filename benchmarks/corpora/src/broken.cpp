@@ -0,0 +1,23 @@
+// Benchmark corpus source: deliberately broken so the compiler emits a long
+// diagnostic stream (errors, warnings, notes, template backtraces).
+#include <map>
+#include <string>
+#include <vector>
+
+struct Widget { int id; };
+
+int unused_warning(int x) {
+    int y;
+    return x;
+}
+
+int main() {
+    std::vector<Widget> ws;
+    std::map<std::string, Widget> by_name;
+    ws.push_back(42);
+    by_name[1] = ws[0];
+    std::sort(ws.begin(), ws.end());
+    undeclared_call(ws);
+    int z = "text";
+    return ws.size() + missing_var
+}
@@ -0,0 +1,80 @@
+// Benchmark corpus source: a mix of STL containers, templates and loops so the
+// generated assembly exercises demangling, local labels and .loc mapping.
+#include <algorithm>
+#include <map>
+#include <numeric>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+struct Particle {
+    float x, y, z;
+    float vx, vy, vz;
+};
+
+template <typename T>
+T dot(const std::vector<T>& a, const std::vector<T>& b) {
+    T sum{};
+    for (size_t i = 0; i < a.size() && i < b.size(); ++i) {
+        sum += a[i] * b[i];
+    }
+    return sum;
+}
+
+void integrate(std::vector<Particle>& particles, float dt) {
+    for (auto& p : particles) {
+        p.x += p.vx * dt;
+        p.y += p.vy * dt;
+        p.z += p.vz * dt;
+        if (p.y < 0.0f) {
+            p.y = -p.y;
+            p.vy = -p.vy * 0.9f;
+        }
+    }
+}
+
+std::map<std::string, int> word_counts(const std::vector<std::string>& words) {
+    std::map<std::string, int> counts;
+    for (const auto& w : words) {
+        ++counts[w];
+    }
+    return counts;
+}
+
+std::unordered_map<int, std::vector<int>> bucket(const std::vector<int>& values, int buckets) {
+    std::unordered_map<int, std::vector<int>> out;
+    for (int v : values) {
+        out[v % buckets].push_back(v);
+    }
+    return out;
+}
+
+std::vector<int> top_k(std::vector<int> values, size_t k) {
+    std::sort(values.begin(), values.end(), std::greater<int>());
+    if (values.size() > k) values.resize(k);
+    return values;
+}
+
+long checksum(const std::string& s) {
+    return std::accumulate(s.begin(), s.end(), 0L, [](long acc, char c) { return acc * 31 + c; });
+}
+
+int collatz_steps(unsigned long n) {
+    int steps = 0;
+    while (n != 1) {
+        n = (n % 2 == 0) ? n / 2 : 3 * n + 1;
+        ++steps;
+    }
+    return steps;
+}
+
+int main() {
+    std::vector<double> a(64, 1.5), b(64, 2.0);
+    std::vector<Particle> ps(16);
+    integrate(ps, 0.016f);
+    auto counts = word_counts({"a", "b", "a"});
+    auto buckets = bucket({1, 2, 3, 4, 5, 6}, 3);
+    auto best = top_k({5, 1, 9, 3}, 2);
+    return static_cast<int>(dot(a, b)) + counts["a"] + static_cast<int>(buckets.size())
+        + best[0] + static_cast<int>(checksum("localbolt")) + collatz_steps(27);
+}
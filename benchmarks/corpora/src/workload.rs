@@ -0,0 +1,58 @@
+// Benchmark corpus source: iterators, generics and collections so rustc's
+// output exercises v0/legacy demangling and std noise filtering.
+use std::collections::HashMap;
+
+#[derive(Clone, Copy, Default)]
+pub struct Particle {
+    pub pos: [f32; 3],
+    pub vel: [f32; 3],
+}
+
+pub fn dot(a: &[f64], b: &[f64]) -> f64 {
+    a.iter().zip(b).map(|(x, y)| x * y).sum()
+}
+
+pub fn integrate(particles: &mut [Particle], dt: f32) {
+    for p in particles.iter_mut() {
+        for i in 0..3 {
+            p.pos[i] += p.vel[i] * dt;
+        }
+        if p.pos[1] < 0.0 {
+            p.pos[1] = -p.pos[1];
+            p.vel[1] = -p.vel[1] * 0.9;
+        }
+    }
+}
+
+pub fn word_counts(words: &[&str]) -> HashMap<String, usize> {
+    let mut counts = HashMap::new();
+    for w in words {
+        *counts.entry(w.to_string()).or_insert(0) += 1;
+    }
+    counts
+}
+
+pub fn top_k(mut values: Vec<i32>, k: usize) -> Vec<i32> {
+    values.sort_unstable_by(|a, b| b.cmp(a));
+    values.truncate(k);
+    values
+}
+
+pub fn collatz_steps(mut n: u64) -> u32 {
+    let mut steps = 0;
+    while n != 1 {
+        n = if n % 2 == 0 { n / 2 } else { 3 * n + 1 };
+        steps += 1;
+    }
+    steps
+}
+
+fn main() {
+    let a = vec![1.5; 64];
+    let b = vec![2.0; 64];
+    let mut ps = vec![Particle::default(); 16];
+    integrate(&mut ps, 0.016);
+    let counts = word_counts(&["a", "b", "a"]);
+    let best = top_k(vec![5, 1, 9, 3], 2);
+    println!("{} {} {} {}", dot(&a, &b), counts["a"], best[0], collatz_steps(27));
+}
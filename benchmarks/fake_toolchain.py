@@ -0,0 +1,72 @@
+"""
+Deterministic stand-ins for g++/clang++/rustc, llvm-mca and c++filt used by
+bench_refresh.py. install() writes one small launcher per tool into a bin
+directory; each replays a recorded output after an optional delay:
+
+    compiler   writes LOCALBOLT_FAKE_ASM to the '-o' path
+               (and an empty depfile to '-MF' if asked), after LOCALBOLT_FAKE_COMPILE_MS
+    llvm-mca   prints LOCALBOLT_FAKE_MCA, after LOCALBOLT_FAKE_MCA_MS
+    c++filt    copies stdin to stdout
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+COMPILERS = ("g++", "clang++", "rustc")
+TOOLS = COMPILERS + ("llvm-mca", "c++filt")
+
+
+def _delay(var: str) -> None:
+    ms = float(os.environ.get(var, "0") or 0)
+    if ms > 0:
+        time.sleep(ms / 1000.0)
+
+
+def _arg_after(argv: List[str], flag: str) -> str:
+    return argv[argv.index(flag) + 1] if flag in argv[:-1] else ""
+
+
+def _read(path_var: str) -> str:
+    with open(os.environ[path_var], "r") as f:
+        return f.read()
+
+
+def run(tool: str, argv: List[str]) -> int:
+    if tool in COMPILERS:
+        _delay("LOCALBOLT_FAKE_COMPILE_MS")
+        output = _arg_after(argv, "-o")
+        if output:
+            with open(output, "w") as f:
+                f.write(_read("LOCALBOLT_FAKE_ASM"))
+        depfile = _arg_after(argv, "-MF")
+        if depfile:
+            with open(depfile, "w") as f:
+                f.write(f"{output}:\n")
+        return 0
+    if tool == "llvm-mca":
+        sys.stdin.read()
+        _delay("LOCALBOLT_FAKE_MCA_MS")
+        sys.stdout.write(_read("LOCALBOLT_FAKE_MCA"))
+        return 0
+    if tool == "c++filt":
+        sys.stdout.write(sys.stdin.read())
+        return 0
+    print(f"fake_toolchain: unknown tool {tool}", file=sys.stderr)
+    return 1
+
+
+def install(bin_dir: Path) -> None:
+    """Writes an executable launcher for every tool into bin_dir."""
+    here = str(Path(__file__).resolve().parent)
+    for tool in TOOLS:
+        launcher = bin_dir / tool
+        launcher.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"sys.path.insert(0, {here!r})\n"
+            "from fake_toolchain import run\n"
+            f"sys.exit(run({tool!r}, sys.argv[1:]))\n"
+        )
+        launcher.chmod(0o755)
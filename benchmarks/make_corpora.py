@@ -0,0 +1,77 @@
+"""
+Regenerates the recorded benchmark corpora from benchmarks/corpora/src using
+the same drivers the app uses, so the inputs are real toolchain output:
+
+    python benchmarks/make_corpora.py
+
+Writes gzip-compressed files to benchmarks/corpora/:
+    <toolchain>.s.gz        raw assembly (gcc, clang, rustc — whichever are installed)
+    <toolchain>.mca.txt.gz  llvm-mca report for the cleaned, mangled assembly
+    <toolchain>.diag.txt.gz stderr from compiling src/broken.cpp (C++ toolchains)
+
+llvm-mca reports are only kept when llvm-mca succeeded.
+"""
+import gzip
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from localbolt.compiler.driver import CompilerDriver  # noqa: E402
+from localbolt.compiler.rust_driver import RustCompilerDriver  # noqa: E402
+from localbolt.parsing import process_assembly  # noqa: E402
+
+CORPORA = Path(__file__).resolve().parent / "corpora"
+SRC = CORPORA / "src"
+FLAGS = ["-O2"]
+
+
+def _write(name: str, text: str) -> None:
+    with gzip.open(CORPORA / name, "wt") as f:
+        f.write(text)
+    print(f"  {name}: {len(text.splitlines())} lines")
+
+
+def _record(toolchain: str, driver, source: str, language: str) -> None:
+    asm, stderr = driver.compile(source, user_flags=FLAGS)
+    if not asm:
+        print(f"  {toolchain}: compile failed, skipped\n{stderr}")
+        return
+    _write(f"{toolchain}.s.gz", asm)
+    _, _, mangled = process_assembly(asm, str(source), language=language)
+    report = driver.analyze_perf(mangled)
+    if "Instruction Info:" in report:
+        _write(f"{toolchain}.mca.txt.gz", report)
+    else:
+        print(f"  {toolchain}.mca.txt.gz: llvm-mca failed, skipped")
+
+
+def main() -> int:
+    # Relative paths keep the checkout location out of the recorded output
+    os.chdir(SRC)
+    for toolchain, compiler in (("gcc", "g++"), ("clang", "clang++")):
+        if not shutil.which(compiler):
+            print(f"{toolchain}: {compiler} not found, skipped")
+            continue
+        print(toolchain)
+        driver = CompilerDriver()
+        driver.set_compiler(compiler)
+        _record(toolchain, driver, "workload.cpp", "cpp")
+        # Human-readable text: scale_lines repeats lines, which a one-line JSON array does not have
+        text_format = ["-fdiagnostics-format=text"] if driver.json_diagnostics() else []
+        _, stderr = driver.compile("broken.cpp", user_flags=FLAGS + ["-Wall"] + text_format)
+        _write(f"{toolchain}.diag.txt.gz", stderr)
+
+    rust = RustCompilerDriver()
+    if rust.compiler:
+        print("rustc")
+        _record("rustc", rust, "workload.rs", "rust")
+    else:
+        print("rustc: not found, skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
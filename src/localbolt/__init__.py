@@ -1,3 +1,9 @@
-from .parsing import process_assembly
+# process_assembly is resolved on first use so `import localbolt.main` stays cheap
+__all__ = ["process_assembly"]
 
-__all__ = ["process_assembly"]
\ No newline at end of file
+
+def __getattr__(name):
+    if name == "process_assembly":
+        from .parsing import process_assembly
+        return process_assembly
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,174 @@
+"""
+Headless batch analysis: runs the full BoltEngine pipeline (compile, clean,
+demangle, llvm-mca) over many files in a process pool and writes
+per-function results as JSON or CSV.
+
+    localbolt analyze 'src/hot/**/*.cpp' -o report.json
+    localbolt analyze --compile-commands build/compile_commands.json -f csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from .utils.lang import is_supported
+from .utils.state import LocalBoltState
+
+
+@dataclass
+class FunctionReport:
+    name: str
+    instructions: int
+    cycles: int
+    source_line: Optional[int] = None  # first mapped source line
+
+
+@dataclass
+class FileReport:
+    file: str
+    flags: List[str] = field(default_factory=list)
+    functions: List[FunctionReport] = field(default_factory=list)
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def collect_sources(patterns: Iterable[str], compile_db: Optional[str] = None) -> List[str]:
+    """
+    Expands files/globs (recursive '**' supported) and the files of
+    compile_commands.json entries into source paths, keeping only supported
+    languages. The entries' flags are left to the compiler driver.
+    """
+    sources: Dict[str, None] = {}  # ordered set
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for path in sorted(matches):
+            if os.path.isfile(path) and is_supported(path):
+                sources[path] = None
+
+    if compile_db:
+        with open(compile_db, "r") as f:
+            entries = json.load(f)
+        for entry in entries:
+            path = str(Path(entry.get("directory", "."), entry["file"]).resolve())
+            if is_supported(path) and os.path.isfile(path):
+                sources[path] = None
+    return list(sources)
+
+
+def analyze_file(path: str, flags: List[str], compile_db: Optional[str] = None) -> FileReport:
+    """
+    Runs one refresh of the engine (no watcher) and summarises it per
+    function. compile_db replaces the driver's search for compile_commands.json.
+    """
+    # Imported here so clients that only format reports (localbolt query) skip the engine
+    from .engine import BoltEngine
+
+    report = FileReport(file=path, flags=list(flags))
+    try:
+        engine = BoltEngine(os.path.abspath(path))
+        if compile_db:
+            engine.driver.compile_db = Path(compile_db).resolve()
+        engine.user_flags = list(flags)
+        engine.refresh()
+    except Exception as e:
+        report.error = f"Internal Engine Error: {e}"
+        return report
+
+    return summarize_state(report, engine.state)
+
+
+def summarize_state(report: FileReport, state: LocalBoltState) -> FileReport:
+    """Fills report with the per-function summary of an analyzed state (or its error)."""
+    if state.has_errors or not state.asm_content:
+        report.error = state.compiler_output or "Compilation produced no assembly."
+        return report
+
+    for func in state.functions:
+        mapped = [state.asm_mapping[i] for i in range(func.start, func.end) if i in state.asm_mapping]
+        report.functions.append(FunctionReport(
+            name=func.name,
+            instructions=func.instruction_count,
+            cycles=func.total_cycles,
+            source_line=min(mapped) if mapped else None,
+        ))
+    return report
+
+
+def analyze_many(sources: List[str], flags: List[str], jobs: int = 0,
+                 compile_db: Optional[str] = None) -> List[FileReport]:
+    """
+    Analyzes every source with the shared flags across a process pool.
+    jobs=0 uses one worker per CPU; jobs=1 runs in-process.
+    Results are returned in the order of sources.
+    """
+    if jobs == 1 or len(sources) <= 1:
+        return [analyze_file(p, flags, compile_db) for p in sources]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+        return list(pool.map(analyze_file, sources, repeat(flags), repeat(compile_db)))
+
+
+def write_json(reports: List[FileReport], out: TextIO) -> None:
+    json.dump([asdict(r) for r in reports], out, indent=2)
+    out.write("\n")
+
+
+def write_csv(reports: List[FileReport], out: TextIO) -> None:
+    writer = csv.writer(out)
+    writer.writerow(["file", "function", "instructions", "cycles", "source_line", "error"])
+    for report in reports:
+        if not report.ok:
+            writer.writerow([report.file, "", "", "", "", report.error.strip().splitlines()[0] if report.error.strip() else ""])
+            continue
+        for func in report.functions:
+            writer.writerow([report.file, func.name, func.instructions, func.cycles, func.source_line or "", ""])
+
+
+def add_analysis_arguments(parser: argparse.ArgumentParser) -> None:
+    """Source selection and pipeline options shared by 'analyze' and 'check'."""
+    parser.add_argument("sources", nargs="*", help="Source files or globs (quote globs to use '**')")
+    parser.add_argument("--compile-commands", metavar="PATH", help="Analyze every entry of a compile_commands.json")
+    parser.add_argument("--flags", default="", help="Extra compiler flags for every file, e.g. --flags='-O3 -march=native'")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Worker processes (default: one per CPU)")
+
+
+def build_analyze_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="localbolt analyze", description="Analyze many files without the TUI")
+    add_analysis_arguments(parser)
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], help="Output format (default: from extension, else json)")
+    return parser
+
+
+def run_analyze(argv: List[str]) -> int:
+    parser = build_analyze_parser()
+    args = parser.parse_args(argv)
+
+    sources = collect_sources(args.sources, args.compile_commands)
+    if not sources:
+        print("Error: No supported source files matched.", file=sys.stderr)
+        return 1
+
+    reports = analyze_many(sources, args.flags.split(), jobs=args.jobs, compile_db=args.compile_commands)
+
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "json")
+    writer = write_csv if fmt == "csv" else write_json
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer(reports, f)
+    else:
+        writer(reports, sys.stdout)
+
+    failed = [r for r in reports if not r.ok]
+    for r in failed:
+        print(f"Failed: {r.file}", file=sys.stderr)
+    return 1 if failed else 0
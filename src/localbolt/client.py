@@ -0,0 +1,198 @@
+"""
+Thin clients of the `localbolt serve` daemon (see server.py).
+
+BoltClient is the socket connection; RemoteEngine gives the TUI the same
+interface as BoltEngine backed by the daemon; run_query is the headless
+
+    localbolt query src/hot.cpp --flags='-O3' [-o report.json]
+
+which prints the same per-function report as `localbolt analyze`.
+"""
+import argparse
+import itertools
+import os
+import socket
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .batch import FileReport, FunctionReport, write_csv, write_json
+from .parsing.asm_diff import FlagComparison
+from .protocol import decode, decode_comparison, decode_state, decode_timings, default_socket_path, encode
+from .utils.state import LocalBoltState
+from .utils.timing import RefreshTimings
+
+
+class BoltClient:
+    """
+    Connection to the daemon. request() blocks for its reply; pushed events
+    go to on_event on the reader thread.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, on_event: Optional[Callable[[dict], None]] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.on_event = on_event
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError as e:
+            self.sock.close()
+            raise ConnectionError(
+                f"Cannot reach the LocalBolt daemon at {self.socket_path} (start it with 'localbolt serve'): {e}"
+            ) from e
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def request(self, op: str, **params) -> dict:
+        """Sends one request and waits for its reply; raises RuntimeError if the daemon reports an error."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("LocalBolt daemon connection is closed")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        with self._send_lock:
+            self.sock.sendall(encode({"id": request_id, "op": op, **params}))
+        reply = future.result()
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "Request failed"))
+        return reply
+
+    def _read_loop(self):
+        try:
+            with self.sock.makefile("rb") as stream:
+                for line in stream:
+                    message = decode(line)
+                    if "event" in message:
+                        if self.on_event:
+                            self.on_event(message)
+                        continue
+                    with self._lock:
+                        future = self._pending.pop(message.get("id"), None)
+                    if future is not None:
+                        future.set_result(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._closed = True
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError("LocalBolt daemon closed the connection"))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class RemoteEngine:
+    """BoltEngine's interface for the TUI, with the analysis done by the daemon."""
+
+    def __init__(self, source_file: str, socket_path: Optional[str] = None):
+        # The daemon resolves paths the same way, so events can be matched before open() replies
+        self.path = str(Path(source_file).resolve())
+        self.state = LocalBoltState(source_path=self.path)
+        self.on_update_callback: Optional[Callable[[LocalBoltState], None]] = None
+        self.user_flags: list[str] = []
+        self.target_cpus: list[str] = []
+        self.last_timings: Optional[RefreshTimings] = None
+        self.client = BoltClient(socket_path, on_event=self._on_event)
+
+    def start(self):
+        self.client.request("open", file=self.path)
+
+    def stop(self):
+        self.client.close()
+
+    def refresh(self):
+        self.client.request("refresh", file=self.path)
+
+    def set_flags(self, flags: list[str]):
+        self.user_flags = flags
+        self.client.request("set_flags", file=self.path, flags=flags)
+
+    def set_target_cpus(self, cpus: list[str]):
+        self.target_cpus = cpus
+        self.client.request("set_target_cpus", file=self.path, cpus=cpus)
+
+    def compare_flags(self, flags_a: list[str], flags_b: list[str]) -> FlagComparison:
+        return decode_comparison(self.client.request("compare", file=self.path, flags_a=flags_a, flags_b=flags_b)["result"])
+
+    def record_stage(self, name: str, ms: float):
+        # Kept locally for the HUD; the daemon's copy ends at its own stages
+        if self.last_timings is not None:
+            self.last_timings.add(name, ms)
+
+    def _on_event(self, message: dict):
+        if message.get("event") != "state" or message.get("file") != self.path:
+            return
+        self.state = decode_state(message["state"])
+        self.user_flags = self.state.user_flags
+        self.last_timings = decode_timings(message.get("timings"))
+        if self.on_update_callback:
+            self.on_update_callback(self.state)
+
+
+def _report_from_dict(data: dict) -> FileReport:
+    functions = [FunctionReport(**f) for f in data["functions"]]
+    return FileReport(file=data["file"], flags=data["flags"], functions=functions, error=data["error"])
+
+
+def build_query_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="localbolt query", description="Ask the running daemon for per-function results")
+    parser.add_argument("sources", nargs="+", help="Source files")
+    parser.add_argument("--flags", default=None, help="Compiler flags for these files (default: the daemon's current ones)")
+    parser.add_argument("--socket", default=None, metavar="PATH", help="Daemon socket (default: $LOCALBOLT_SOCKET, else per user)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], help="Output format (default: from extension, else json)")
+    return parser
+
+
+def run_query(argv: List[str]) -> int:
+    args = build_query_parser().parse_args(argv)
+    flags = args.flags.split() if args.flags is not None else None
+    try:
+        client = BoltClient(args.socket)
+    except ConnectionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        reports = []
+        for source in args.sources:
+            params = {"file": os.path.abspath(source)}
+            if flags is not None:
+                params["flags"] = flags
+            try:
+                reports.append(_report_from_dict(client.request("query", **params)["report"]))
+            except RuntimeError as e:
+                reports.append(FileReport(file=params["file"], flags=flags or [], error=str(e)))
+    except ConnectionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "json")
+    writer = write_csv if fmt == "csv" else write_json
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer(reports, f)
+    else:
+        writer(reports, sys.stdout)
+
+    failed = [r for r in reports if not r.ok]
+    for r in failed:
+        print(f"Failed: {r.file}", file=sys.stderr)
+    return 1 if failed else 0
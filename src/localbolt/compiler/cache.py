@@ -0,0 +1,76 @@
+"""
+In-memory compile cache shared by engines (workspace mode).
+
+Entries are keyed by (compiler, source, flags) and validated like a
+ccache manifest: a hit requires the source and every dependency from the
+compile's depfile to still hash the same, so an edited header misses.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.watcher import file_digest
+
+CacheKey = Tuple[str, str, Tuple[str, ...]]
+
+
+@dataclass
+class CacheEntry:
+    asm: str
+    stderr: str
+    dependencies: List[str]
+    digests: Dict[str, Optional[bytes]] = field(default_factory=dict)
+
+    def is_current(self) -> bool:
+        return all(file_digest(path) == digest for path, digest in self.digests.items())
+
+
+class CompileCache:
+    """LRU of successful compiles; failures are never cached."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(compiler: str, source: str, flags: List[str]) -> CacheKey:
+        return (compiler or "", source, tuple(flags))
+
+    def lookup(self, compiler: str, source: str, flags: List[str]) -> Optional[CacheEntry]:
+        key = self.key(compiler, source, flags)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.is_current():
+            with self._lock:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, compiler: str, source: str, flags: List[str], asm: str, stderr: str,
+              dependencies: Optional[List[str]], started_ns: int) -> None:
+        """
+        Records a compile that began at started_ns (time.time_ns()). Skipped if
+        any input was modified after that, since the output may predate the edit.
+        """
+        if not asm or dependencies is None:
+            return
+        files = list(dict.fromkeys([source] + dependencies))
+        try:
+            if any(os.stat(path).st_mtime_ns >= started_ns for path in files):
+                return
+        except OSError:
+            return
+        entry = CacheEntry(asm, stderr, list(dependencies), {path: file_digest(path) for path in files})
+        with self._lock:
+            self._entries[self.key(compiler, source, flags)] = entry
+            self._entries.move_to_end(self.key(compiler, source, flags))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
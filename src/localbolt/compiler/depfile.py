@@ -0,0 +1,70 @@
+"""
+Make-style dependency files, as written by `g++ -MMD -MF` and
+`rustc --emit dep-info=`:
+
+    /tmp/out.s: main.cpp include/vec.h \
+      include/util.h
+    include/vec.h:
+"""
+import os
+import re
+from typing import List, Optional
+
+# Rule separator: a colon followed by whitespace or end of line (not "C:\...")
+RE_RULE_COLON = re.compile(r":(?=\s|$)")
+
+
+def _split_words(text: str) -> List[str]:
+    """Splits on whitespace, honouring backslash-escaped spaces and '$$'."""
+    words, current, i = [], [], 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text) and text[i + 1] in " #":
+            current.append(text[i + 1])
+            i += 2
+            continue
+        if ch == "$" and text[i + 1:i + 2] == "$":
+            current.append("$")
+            i += 2
+            continue
+        if ch.isspace():
+            if current:
+                words.append("".join(current))
+                current = []
+        else:
+            current.append(ch)
+        i += 1
+    if current:
+        words.append("".join(current))
+    return words
+
+
+def parse_depfile(text: str, base_dir: Optional[str] = None) -> List[str]:
+    """
+    Returns every prerequisite in the file as an absolute path (relative
+    paths are resolved against base_dir, default the working directory),
+    de-duplicated in first-seen order.
+    """
+    base_dir = base_dir or os.getcwd()
+    joined = re.sub(r"\\\r?\n", " ", text)
+    deps: List[str] = []
+    seen = set()
+    for line in joined.splitlines():
+        match = RE_RULE_COLON.search(line)
+        if not match:
+            continue
+        for word in _split_words(line[match.end():]):
+            path = os.path.normpath(os.path.join(base_dir, word))
+            if path not in seen:
+                seen.add(path)
+                deps.append(path)
+    return deps
+
+
+def read_depfile(path: str) -> Optional[List[str]]:
+    """parse_depfile for a file on disk; None if it was not written."""
+    try:
+        with open(path, "r") as f:
+            return parse_depfile(f.read())
+    except OSError:
+        return None
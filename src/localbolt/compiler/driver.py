@@ -1,11 +1,33 @@
 import subprocess
 import tempfile
+import threading
 import shutil
 import platform
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, List, Optional
 from .analyzer import find_compile_commands, get_flags_from_db
+from .depfile import read_depfile
 from ..utils.config import ConfigManager
+from ..utils.timing import stage
+
+
+@lru_cache(maxsize=None)
+def probe_json_diagnostics(compiler_path: str) -> bool:
+    """
+    Whether the compiler accepts -fdiagnostics-format=json (GCC 9+; Clang
+    has no JSON format). Compiles an empty file, which prints `[]`.
+    Cached per compiler for the process: batch runs create a driver per file.
+    """
+    try:
+        result = subprocess.run(
+            [compiler_path, "-fdiagnostics-format=json", "-fsyntax-only", "-x", "c++", "-"],
+            input="", capture_output=True, text=True, timeout=10, check=False
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0 and result.stderr.strip() == "[]"
+
 
 class CompilerDriver:
     def __init__(self, config_manager: Optional[ConfigManager] = None):
@@ -16,6 +38,12 @@ class CompilerDriver:
         target_compiler = self.config.get("compiler", "g++")
         self.set_compiler(target_compiler)
 
+        # Per thread, so one driver can be shared by engines compiling concurrently
+        self._local = threading.local()
+
+        # Explicit compile_commands.json; None searches upwards from each source
+        self.compile_db: Optional[Path] = None
+
     def set_compiler(self, compiler: str):
         """
         Updates the compiler used by the driver.
@@ -34,6 +62,24 @@ class CompilerDriver:
         self.compiler = compiler
         self.compiler_path = path
 
+    def json_diagnostics(self) -> bool:
+        """
+        Whether to request JSON diagnostics: when the compiler supports them,
+        unless the diagnostics_format config is "text".
+        """
+        if not self.compiler_path or self.config.get("diagnostics_format", "auto") == "text":
+            return False
+        return probe_json_diagnostics(self.compiler_path)
+
+    @property
+    def last_dependencies(self) -> Optional[List[str]]:
+        """Files the calling thread's last compile read, from its depfile; None if none was written."""
+        return getattr(self._local, "dependencies", None)
+
+    @last_dependencies.setter
+    def last_dependencies(self, deps: Optional[List[str]]):
+        self._local.dependencies = deps
+
     @staticmethod
     def discover_compilers() -> List[str]:
         """
@@ -43,14 +89,10 @@ class CompilerDriver:
         found = [c for c in candidates if shutil.which(c)]
         return found
 
-    def compile(self, source_file: str, user_flags: List[str] = []) -> Tuple[str, str]:
+    def _build_command(self, source_file: str, user_flags: List[str]) -> List[str]:
         """
-        Compiles the source file to assembly.
-        Returns: (Assembly String, Error String)
+        Resolves the full compiler command line (without the output file).
         """
-        if not self.compiler_path:
-             return "", f"Compiler '{self.compiler}' not configured or not found."
-
         src_path = Path(source_file)
         
         # --- 1. System Flags (MANDATORY) ---
@@ -70,6 +112,10 @@ class CompilerDriver:
         if any(x in arch for x in ["x86", "amd64", "i386"]):
             command.append("-masm=intel")
 
+        # Structured diagnostics (with ranges and fix-its) where supported; user flags still win
+        if self.json_diagnostics():
+            command.append("-fdiagnostics-format=json")
+
         # --- 3. Config Flags (USER PREFERENCE) ---
         # Optimization Level (default to -O3 if missing)
         opt_level = self.config.get("opt_level", "-O3")
@@ -82,7 +128,7 @@ class CompilerDriver:
             command.extend(extra_conf_flags)
 
         # --- 4. Auto-Discovery (PROJECT CONTEXT) ---
-        db_path = find_compile_commands(src_path.parent)
+        db_path = self.compile_db or find_compile_commands(src_path.parent)
         auto_flags = []
         if db_path:
             auto_flags = get_flags_from_db(source_file, db_path)
@@ -91,14 +137,28 @@ class CompilerDriver:
         # --- 5. Runtime Overrides (HIGHEST PRIORITY) ---
         command.extend(user_flags)
         
-        # Input/Output
+        # Input
         command.append(str(src_path))
-        
+        return command
+
+    def compile(self, source_file: str, user_flags: List[str] = []) -> Tuple[str, str]:
+        """
+        Compiles the source file to assembly.
+        Returns: (Assembly String, Error String)
+        """
+        if not self.compiler_path:
+             return "", f"Compiler '{self.compiler}' not configured or not found."
+
+        with stage("flags"):
+            command = self._build_command(source_file, user_flags)
+
         # Output to a temporary file
         with tempfile.NamedTemporaryFile(suffix=".s", mode="w+", delete=False) as tmp:
             output_file = tmp.name
-            
-        command.extend(["-o", output_file])
+        dep_file = output_file[:-2] + ".d"
+
+        # -MMD lists the user headers (not system ones) as a side effect of this same compile
+        command.extend(["-MMD", "-MF", dep_file, "-o", output_file])
 
         # Run the Compiler
         try:
@@ -118,12 +178,15 @@ class CompilerDriver:
             return asm_content, result.stderr
 
         finally:
-            if Path(output_file).exists():
-                Path(output_file).unlink()
+            self.last_dependencies = read_depfile(dep_file)
+            for path in (output_file, dep_file):
+                if Path(path).exists():
+                    Path(path).unlink()
 
-    def analyze_perf(self, asm_content: str) -> str:
+    def analyze_perf(self, asm_content: str, mcpu: Optional[str] = None) -> str:
         """
         Runs llvm-mca on the generated assembly string.
+        If mcpu is given, llvm-mca models that CPU instead of the host.
         """
         mca_path = shutil.which("llvm-mca")
         
@@ -141,9 +204,13 @@ class CompilerDriver:
         if not mca_path:
             return "Error: llvm-mca not installed."
             
+        command = [mca_path]
+        if mcpu:
+            command.append(f"-mcpu={mcpu}")
+
         try:
             process = subprocess.Popen(
-                [mca_path],
+                command,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -6,10 +6,13 @@ any existing C++ compilation logic.
 import re
 import subprocess
 import shutil
+import threading
 import platform
 import tempfile
 from pathlib import Path
 from typing import Tuple, List, Optional
+from ..utils.timing import stage
+from .depfile import read_depfile
 
 # Patterns for lines that should be stripped before sending to llvm-mca.
 # llvm-mca only understands instructions — labels, directives, and data confuse it.
@@ -26,6 +29,16 @@ class RustCompilerDriver:
     def __init__(self):
         self.compiler: Optional[str] = self._discover_compiler()
         self.compiler_path: Optional[str] = self.compiler  # for interface compat with CompilerDriver
+        self._local = threading.local()  # per-thread last_dependencies (shared drivers)
+
+    @property
+    def last_dependencies(self) -> Optional[List[str]]:
+        """Files the calling thread's last compile read, from its depfile; None if none was written."""
+        return getattr(self._local, "dependencies", None)
+
+    @last_dependencies.setter
+    def last_dependencies(self, deps: Optional[List[str]]):
+        self._local.dependencies = deps
 
     @staticmethod
     def _discover_compiler() -> Optional[str]:
@@ -62,17 +75,8 @@ class RustCompilerDriver:
         else:
             print(f"Warning: Rust compiler '{compiler}' not found.")
 
-    def compile(self, source_file: str, user_flags: List[str] = []) -> Tuple[str, str]:
-        """
-        Compile a .rs file to assembly.
-        Returns: (Assembly String, Error String)
-        """
-        if not self.compiler:
-            return "", "Error: rustc not found. Install via https://rustup.rs/"
-
-        with tempfile.NamedTemporaryFile(suffix=".s", delete=False) as tmp:
-            output_file = tmp.name
-
+    def _build_command(self, user_flags: List[str]) -> List[str]:
+        """Resolves the rustc command line (without output file and source)."""
         # Base command: emit assembly with debug info for source mapping
         command = [
             self.compiler,
@@ -101,7 +105,28 @@ class RustCompilerDriver:
         if not has_opt:
             command.extend(["-C", "opt-level=0"])
 
-        command.extend(["-o", output_file])
+        # One JSON diagnostic per line (with spans and children), unless the user chose a format;
+        # rustc rejects the option given twice
+        if not any(flag.startswith("--error-format") for flag in user_flags):
+            command.append("--error-format=json")
+        return command
+
+    def compile(self, source_file: str, user_flags: List[str] = []) -> Tuple[str, str]:
+        """
+        Compile a .rs file to assembly.
+        Returns: (Assembly String, Error String)
+        """
+        if not self.compiler:
+            return "", "Error: rustc not found. Install via https://rustup.rs/"
+
+        with stage("flags"):
+            command = self._build_command(user_flags)
+
+        with tempfile.NamedTemporaryFile(suffix=".s", delete=False) as tmp:
+            output_file = tmp.name
+        dep_file = output_file[:-2] + ".d"
+
+        command.extend(["--emit", f"dep-info={dep_file}", "-o", output_file])
         command.append(str(Path(source_file).resolve()))
 
         try:
@@ -119,12 +144,14 @@ class RustCompilerDriver:
             return "", f"Rust compilation error: {e}"
 
         finally:
-            if Path(output_file).exists():
-                Path(output_file).unlink()
+            self.last_dependencies = read_depfile(dep_file)
+            for path in (output_file, dep_file):
+                if Path(path).exists():
+                    Path(path).unlink()
 
-    def analyze_perf(self, asm_content: str) -> str:
+    def analyze_perf(self, asm_content: str, mcpu: Optional[str] = None) -> str:
         """
-        Runs llvm-mca on the generated assembly.
+        Runs llvm-mca on the generated assembly, modelling mcpu if given.
         Rust assembly needs sanitization: strip labels, directives, and data
         that llvm-mca cannot process (it only understands instructions).
         """
@@ -158,9 +185,13 @@ class RustCompilerDriver:
         if not mca_path:
             return "Error: llvm-mca not installed."
 
+        command = [mca_path, "--skip-unsupported-instructions=parse-failure"]
+        if mcpu:
+            command.append(f"-mcpu={mcpu}")
+
         try:
             process = subprocess.Popen(
-                [mca_path, "--skip-unsupported-instructions=parse-failure"],
+                command,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -1,30 +1,62 @@
 from typing import Callable, Optional
 from .compiler.driver import CompilerDriver
 from .compiler.rust_driver import RustCompilerDriver
-from .parsing import process_assembly, parse_mca_output, parse_diagnostics, InstructionStats
+from .compiler.cache import CompileCache
+from .parsing import (
+    process_assembly, parse_mca_output, parse_mca_outputs, parse_compiler_output, InstructionStats,
+    line_cycle_counts, mca_instruction_lines, split_functions, line_costs, rank_hotspots, source_costs, compare_listings, diff_listings,
+    FlagComparison,
+)
 from .utils.state import LocalBoltState
-from .utils.watcher import FileWatcher
+from .utils.watcher import FileWatcher, DEFAULT_QUIET_PERIOD
+from .utils.config import ConfigManager
 from .utils.lang import detect_language, Language
-import time
+from .utils.timing import RefreshTimings, recording, stage
+from .utils.logger import get_logger
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import shutil
+import threading
+import time
 import os
 
 class BoltEngine:
-    def __init__(self, source_file: str):
+    def __init__(self, source_file: str, driver=None, watcher: Optional[FileWatcher] = None,
+                 compile_cache: Optional[CompileCache] = None):
+        """
+        driver, watcher and compile_cache are normally created per engine;
+        workspace mode passes shared ones.
+        """
         self.state = LocalBoltState(source_path=source_file)
         self.language = detect_language(source_file)
-        if self.language == Language.RUST:
+        if driver is not None:
+            self.driver = driver
+        elif self.language == Language.RUST:
             self.driver = RustCompilerDriver()
         else:
             self.driver = CompilerDriver()
-        self.watcher = FileWatcher()
+        if watcher is None:
+            # Quiet period after the last file event before recompiling (config: watch_quiet_ms)
+            quiet_ms = ConfigManager().get("watch_quiet_ms", DEFAULT_QUIET_PERIOD * 1000)
+            watcher = FileWatcher(quiet_period=quiet_ms / 1000.0)
+        self.watcher = watcher
+        # Keep only this file's warnings (errors from headers always stay) (config: diagnostics_source_only)
+        self.diagnostics_source_only = bool(ConfigManager().get("diagnostics_source_only", False))
+        # Keep code inlined from headers in the listing, costed on the line it was inlined into
+        # (config: keep_inlined_code)
+        self.keep_inlined = bool(ConfigManager().get("keep_inlined_code", True))
+        self.compile_cache = compile_cache
         self.on_update_callback: Optional[Callable[[LocalBoltState], None]] = None
-        self.log_file = "/tmp/localbolt_engine.log"
+        self.log = get_logger("engine")
         self.user_flags: list[str] = []
-
-    def _log(self, msg: str):
-        with open(self.log_file, "a") as f:
-            f.write(f"[{time.time()}] {msg}\n")
+        self.target_cpus: list[str] = []
+        # Per-refresh stage timings; LOCALBOLT_TRACE=<file> appends each one as a JSON line
+        self.last_timings: Optional[RefreshTimings] = None
+        self.timing_history: deque[RefreshTimings] = deque(maxlen=100)
+        self.trace_path: Optional[str] = os.environ.get("LOCALBOLT_TRACE")
+        # Saves (watcher thread), UI workers and daemon requests can all refresh; one pipeline at a time
+        self._refresh_lock = threading.Lock()
 
     def start(self):
         self.refresh()
@@ -32,6 +64,7 @@ class BoltEngine:
 
     def stop(self):
         self.watcher.stop_watching()
+        self._append_trace()
 
     def _on_file_saved(self, path: str):
         self.refresh()
@@ -40,45 +73,198 @@ class BoltEngine:
         self.user_flags = flags
         self.refresh()
 
+    def set_target_cpus(self, cpus: list[str]):
+        """Compare llvm-mca estimates across these CPUs (empty list disables)."""
+        self.target_cpus = cpus
+        self.refresh()
+
+    def _analyze_perf_all(self, mangled_asm: str) -> tuple[str, dict[str, str]]:
+        """
+        Runs the host llvm-mca analysis plus one per target CPU, concurrently.
+        Returns: (host report, {cpu: report})
+        """
+        if not self.target_cpus:
+            return self.driver.analyze_perf(mangled_asm), {}
+
+        with ThreadPoolExecutor(max_workers=len(self.target_cpus) + 1) as pool:
+            host = pool.submit(self.driver.analyze_perf, mangled_asm)
+            per_cpu = {
+                cpu: pool.submit(self.driver.analyze_perf, mangled_asm, mcpu=cpu)
+                for cpu in self.target_cpus
+            }
+            return host.result(), {cpu: f.result() for cpu, f in per_cpu.items()}
+
+    def _analyze_with_flags(self, flags: list[str]) -> tuple[str, dict[int, int], dict[int, int], str]:
+        """
+        Runs compile -> clean -> mca for one flag set without touching self.state.
+        Returns: (clean_asm, mapping, line cycle counts, error output)
+        """
+        asm_raw, stderr, _ = self._compile(flags)
+        if not asm_raw:
+            return "", {}, {}, parse_compiler_output(stderr)[1] or "Compilation produced no assembly."
+        lang_str = "rust" if self.language == Language.RUST else "cpp"
+        clean_asm, mapping, mangled_asm = process_assembly(
+            asm_raw, self.state.source_path, language=lang_str, keep_inlined=self.keep_inlined
+        )
+        mca_raw = self.driver.analyze_perf(mangled_asm)
+        stats = parse_mca_output(mca_raw) if mca_raw and "Instruction Info:" in mca_raw else {}
+        return clean_asm, mapping, line_cycle_counts(clean_asm.splitlines(), stats), ""
+
+    def analyze_flags(self, flags: list[str]) -> LocalBoltState:
+        """
+        Analyzes the source with flags into a new state holding the listing,
+        its mapping and per-function totals. Does not change the active flags
+        or the displayed state.
+        """
+        clean_asm, mapping, cycles, error = self._analyze_with_flags(flags)
+        return LocalBoltState(
+            source_path=self.state.source_path, asm_content=clean_asm, asm_mapping=mapping,
+            functions=split_functions(clean_asm.splitlines(), cycles), compiler_output=error,
+            user_flags=list(flags),
+        )
+
+    def compare_flags(self, flags_a: list[str], flags_b: list[str]) -> FlagComparison:
+        """
+        Compiles the source with two flag sets in parallel and compares the
+        listings per function (instruction count, estimated cycles, structural diff).
+        Does not change the active flags or the displayed state.
+        """
+        self.log.info("Comparing flags %s vs %s", flags_a, flags_b)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            fut_a = pool.submit(self._analyze_with_flags, flags_a)
+            fut_b = pool.submit(self._analyze_with_flags, flags_b)
+            asm_a, map_a, cyc_a, err_a = fut_a.result()
+            asm_b, map_b, cyc_b, err_b = fut_b.result()
+
+        result = FlagComparison(flags_a=flags_a, flags_b=flags_b, errors_a=err_a, errors_b=err_b)
+        if result.ok:
+            result.functions = compare_listings(asm_a, cyc_a, map_a, asm_b, cyc_b, map_b)
+        return result
+
+    def _update_diff(self, prev_asm: str, prev_stats: dict[int, InstructionStats], cycles: dict[int, int]):
+        """cycles: line cycle counts of the current listing."""
+        self.state.previous_asm_content = prev_asm
+        self.state.previous_perf_stats = prev_stats
+        if not prev_asm:
+            self.state.asm_diff = None
+            return
+        self.state.asm_diff = diff_listings(
+            prev_asm, line_cycle_counts(prev_asm.splitlines(), prev_stats),
+            self.state.asm_content, cycles,
+        )
+        self.log.debug("Diff: %d function(s) changed", len(self.state.asm_diff.changed))
+
+    def record_stage(self, name: str, ms: float):
+        """Attach a stage measured outside the engine (e.g. UI populate) to the last refresh."""
+        if self.last_timings is not None:
+            self.last_timings.add(name, ms)
+
+    def export_trace(self, path: str):
+        """Write the recent refresh timings as JSON lines."""
+        with open(path, "w") as f:
+            for timings in self.timing_history:
+                f.write(timings.to_json() + "\n")
+
+    def _append_trace(self):
+        # Written one refresh late so stages recorded by the UI are included
+        if self.trace_path and self.last_timings is not None:
+            with open(self.trace_path, "a") as f:
+                f.write(self.last_timings.to_json() + "\n")
+
     def refresh(self):
-        self._log(f"Refreshing {self.state.source_path} with flags {self.user_flags}")
-        try:
+        with self._refresh_lock:
+            self._append_trace()
+            timings = RefreshTimings(source_path=self.state.source_path)
+            self.last_timings = timings
+            self.timing_history.append(timings)
+            self.log.info("Refreshing %s with flags %s", self.state.source_path, self.user_flags)
+            try:
+                with recording(timings), timings.stage("refresh"):
+                    self._run_pipeline()
+
+                if self.on_update_callback:
+                    self.on_update_callback(self.state)
+
+            except Exception as e:
+                self.log.exception("Refresh error")
+                self.state.compiler_output = f"Internal Engine Error: {str(e)}"
+                if self.on_update_callback:
+                    self.on_update_callback(self.state)
+
+    def _compile(self, flags: list[str]) -> tuple[str, str, Optional[list[str]]]:
+        """driver.compile through the shared compile cache, if any. Returns: (asm, stderr, dependencies)"""
+        source = self.state.source_path
+        if self.compile_cache is not None:
+            entry = self.compile_cache.lookup(self.driver.compiler, source, flags)
+            if entry is not None:
+                self.log.debug("Compile cache hit for %s", source)
+                return entry.asm, entry.stderr, entry.dependencies
+        started_ns = time.time_ns()
+        asm_raw, stderr = self.driver.compile(source, user_flags=flags)
+        dependencies = self.driver.last_dependencies
+        if self.compile_cache is not None:
+            self.compile_cache.store(self.driver.compiler, source, flags, asm_raw, stderr, dependencies, started_ns)
+        return asm_raw, stderr, dependencies
+
+    def _run_pipeline(self):
+        with stage("read"):
             with open(self.state.source_path, "r") as f:
                 content = f.read()
                 self.state.source_code = content
                 self.state.source_lines = content.splitlines()
 
-            asm_raw, stderr = self.driver.compile(self.state.source_path, user_flags=self.user_flags)
-            self.state.compiler_output = stderr
-            self.state.user_flags = self.user_flags
-            self.state.diagnostics = parse_diagnostics(stderr)
+        with stage("compile"):
+            asm_raw, stderr, dependencies = self._compile(self.user_flags)
+        self.state.user_flags = self.user_flags
+        # Watch the headers this compile read, so saving one triggers a refresh
+        if dependencies is not None:
+            self.watcher.update_dependencies(dependencies)
+        with stage("diagnostics"):
+            # JSON diagnostics come back rendered as text for the error view
+            self.state.diagnostics, self.state.compiler_output = parse_compiler_output(
+                stderr, source_path=self.state.source_path if self.diagnostics_source_only else None
+            )
 
-            if asm_raw:
-                # 1. Get both demangled and mangled cleaned versions
-                lang_str = "rust" if self.language == Language.RUST else "cpp"
-                clean_asm, mapping, mangled_asm = process_assembly(
-                    asm_raw, self.state.source_path, language=lang_str
-                )
-                self.state.update_asm(clean_asm, mapping)
+        if asm_raw:
+            # 1. Get both demangled and mangled cleaned versions
+            lang_str = "rust" if self.language == Language.RUST else "cpp"
+            clean_asm, mapping, mangled_asm, locations = process_assembly(
+                asm_raw, self.state.source_path, language=lang_str,
+                keep_inlined=self.keep_inlined, with_locations=True,
+            )
+            prev_asm, prev_stats = self.state.asm_content, self.state.perf_stats
+            self.state.update_asm(clean_asm, mapping)
+            self.state.source_locations = locations
 
-                # 2. Run performance analysis on the MANGLED code
-                self._log("Running analyze_perf on mangled ASM...")
-                mca_raw = self.driver.analyze_perf(mangled_asm)
-                self._log(f"MCA Raw Length: {len(mca_raw) if mca_raw else 0}")
+            # 2. Run performance analysis on the MANGLED code
+            with stage("mca"):
+                mca_raw, mca_by_cpu = self._analyze_perf_all(mangled_asm)
+            self.log.debug("MCA report length: %d", len(mca_raw) if mca_raw else 0)
 
+            with stage("parse"):
+                self.state.update_cpu_perf(parse_mca_outputs(mca_by_cpu))
                 if mca_raw and "Instruction Info:" in mca_raw:
                     perf_stats = parse_mca_output(mca_raw)
-                    self._log(f"Parsed Stats Count: {len(perf_stats)}")
+                    self.log.debug("Parsed stats count: %d", len(perf_stats))
                     self.state.update_perf(perf_stats, mca_raw)
                 else:
-                    self._log(f"MCA failed. Sample: {mca_raw[:100] if mca_raw else 'None'}")
+                    self.log.warning("llvm-mca produced no instruction info")
+                    if self.log.isEnabledFor(logging.DEBUG):
+                        self.log.debug("MCA output sample: %s", mca_raw[:100] if mca_raw else "None")
                     self.state.update_perf({}, mca_raw or "")
 
-            if self.on_update_callback:
-                self.on_update_callback(self.state)
+            # 3. Index the functions (for jump-to-symbol) and rank where the estimated cycles go
+            with stage("outline"):
+                asm_lines = clean_asm.splitlines()
+                instr_lines = mca_instruction_lines(asm_lines)
+                cycles = line_cycle_counts(asm_lines, self.state.perf_stats, instr_lines)
+                self.state.functions = split_functions(asm_lines, cycles)
+                costs = line_costs(len(asm_lines), instr_lines, self.state.perf_stats)
+                self.state.hot_lines, self.state.hot_functions = rank_hotspots(
+                    costs, instr_lines, self.state.perf_stats, mapping, self.state.functions
+                )
+                self.state.source_costs = source_costs(costs[0], instr_lines, mapping)
 
-        except Exception as e:
-            self._log(f"Refresh Error: {str(e)}")
-            self.state.compiler_output = f"Internal Engine Error: {str(e)}"
-            if self.on_update_callback:
-                self.on_update_callback(self.state)
+            # 4. Diff against the previous listing so the view can mark what changed
+            with stage("diff"):
+                self._update_diff(prev_asm, prev_stats, cycles)
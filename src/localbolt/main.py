@@ -1,20 +1,73 @@
+"""
+CLI entry point. Only argparse and language detection are imported up
+front; the TUI (Textual), the engine and the subcommands are imported on
+the path that needs them, so `--help`, argument errors and `localbolt
+query` start fast (see benchmarks/bench_startup.py).
+"""
 import sys
 import os
 import argparse
-from .ui.app import run_tui
-from .utils.asm_help import display_asm_help
+from importlib import import_module
 from .utils.lang import is_supported
 
 
+def run_tui(source_file: str):
+    from .ui.app import run_tui
+    run_tui(source_file)
+
+
+def run_workspace_tui(source_files: list[str]):
+    from .ui.app import run_workspace_tui
+    run_workspace_tui(source_files)
+
+
+def run_remote_tui(source_file: str, socket_path: str | None = None):
+    from .ui.app import run_remote_tui
+    run_remote_tui(source_file, socket_path)
+
+
+def display_asm_help():
+    from .utils.asm_help import display_asm_help
+    display_asm_help()
+
+
+def _lazy_command(module: str, name: str):
+    """A subcommand entry point that imports its module when run."""
+    def command(argv):
+        return getattr(import_module(module, __package__), name)(argv)
+    return command
+
+
+# Subcommands dispatched before the TUI argument parser sees argv
+_SUBCOMMANDS = {
+    "analyze": _lazy_command(".batch", "run_analyze"),
+    "check": _lazy_command(".regression", "run_check"),
+    "serve": _lazy_command(".server", "run_serve"),
+    "query": _lazy_command(".client", "run_query"),
+}
+
+
 def _build_parser() -> argparse.ArgumentParser:
     """Build and return the CLI argument parser."""
-    parser = argparse.ArgumentParser(description="LocalBolt: Offline Compiler Explorer")
+    parser = argparse.ArgumentParser(
+        description="LocalBolt: Offline Compiler Explorer",
+        epilog="Headless mode: localbolt analyze <files|globs> [-o report.json] | "
+               "localbolt check <files|globs> --baseline baseline.json | "
+               "Daemon: localbolt serve, then localbolt query <files> or localbolt --connect <file>",
+    )
     parser.add_argument("file", nargs="?", help="C++ or Rust source file to watch")
+    parser.add_argument("more_files", nargs="*", metavar="FILE", help="Further files to open as tabs (workspace mode)")
+    parser.add_argument("--connect", action="store_true", help="Use the running 'localbolt serve' daemon instead of analyzing in-process")
+    parser.add_argument("--socket", default=None, metavar="PATH", help="Daemon socket for --connect (default: $LOCALBOLT_SOCKET, else per user)")
     parser.add_argument("--assemblyhelp", action="store_true", help="Display help for popular assembly instructions")
     return parser
 
 
 def run():
+    argv = sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        sys.exit(_SUBCOMMANDS[argv[0]](argv[1:]))
+
     parser = _build_parser()
     args = parser.parse_args()
 
@@ -27,19 +80,29 @@ def run():
         print("Usage: localbolt <filename.cpp|filename.rs>")
         sys.exit(1)
 
-    # Resolve to absolute path immediately
-    abs_path = os.path.abspath(args.file)
+    # Resolve to absolute paths immediately
+    abs_paths = [os.path.abspath(f) for f in [args.file] + args.more_files]
 
-    if not os.path.exists(abs_path):
-        print(f"Error: File not found: {abs_path}")
-        sys.exit(1)
+    for abs_path in abs_paths:
+        if not os.path.exists(abs_path):
+            print(f"Error: File not found: {abs_path}")
+            sys.exit(1)
+
+        if not is_supported(abs_path):
+            print(f"Error: Unsupported file type. Use .cpp, .cc, .c, .cxx, or .rs")
+            sys.exit(1)
 
-    if not is_supported(abs_path):
-        print(f"Error: Unsupported file type. Use .cpp, .cc, .c, .cxx, or .rs")
+    if args.connect and len(abs_paths) > 1:
+        print("Error: --connect opens a single file.")
         sys.exit(1)
 
     try:
-        run_tui(abs_path)
+        if args.connect:
+            run_remote_tui(abs_paths[0], args.socket)
+        elif len(abs_paths) > 1:
+            run_workspace_tui(abs_paths)
+        else:
+            run_tui(abs_paths[0])
     except KeyboardInterrupt:
         pass
     except Exception as e:
@@ -1,10 +1,15 @@
 import re
-from .lexer import clean_assembly_with_mapping
+from .lexer import clean_assembly_with_mapping, clean_assembly_with_locations
+from .locations import SourceLocations, SourceLocation
 from .mapper import demangle_stream
 from .rust_demangle import demangle_rust, simplify_rust_symbols
-from .perf_parser import parse_mca_output, InstructionStats
-from .diagnostics import parse_diagnostics, Diagnostic
+from .perf_parser import parse_mca_output, parse_mca_outputs, line_cycle_counts, mca_instruction_lines, InstructionStats
+from .diagnostics import parse_diagnostics, parse_compiler_output, Diagnostic
+from .functions import split_functions, line_anchors, FunctionInfo
+from .hotspots import line_costs, rank_hotspots, source_costs, HotSpot, SourceCost
+from .asm_diff import compare_listings, diff_listings, FunctionComparison, FlagComparison, FunctionDiff, ListingDiff
 from typing import Dict, Tuple, List, Optional
+from ..utils.timing import stage
 
 # --- AESTHETIC CLEANUP PATTERNS ---
 RE_STL_VERSIONING = re.compile(r"std::__[1-9]::")
@@ -15,18 +20,25 @@ def simplify_symbols(text: str) -> str:
     text = RE_ABI_TAGS.sub("", text)
     return text
 
-def process_assembly(raw_asm: str, source_filename: str = None, language: str = "cpp") -> Tuple[str, Dict[int, int], str]:
+def process_assembly(raw_asm: str, source_filename: str = None, language: str = "cpp",
+                     keep_inlined: bool = False, with_locations: bool = False):
     """
-    Returns: (demangled_asm, mapping, mangled_cleaned_asm)
+    Returns: (demangled_asm, mapping, mangled_cleaned_asm), plus the
+    SourceLocations of the listing as a fourth item if with_locations.
     The language parameter defaults to "cpp" so all existing callers are unaffected.
+    keep_inlined keeps code inlined from headers (see clean_assembly_with_locations).
     """
-    cleaned_mangled, mapping = clean_assembly_with_mapping(raw_asm, source_filename)
+    with stage("lex"):
+        cleaned_mangled, mapping, locations = clean_assembly_with_locations(raw_asm, source_filename, keep_inlined)
 
-    if language == "rust":
-        demangled = demangle_rust(cleaned_mangled)
-        final_asm = simplify_rust_symbols(demangled)
-    else:
-        demangled = demangle_stream(cleaned_mangled)
-        final_asm = simplify_symbols(demangled)
+    with stage("demangle"):
+        if language == "rust":
+            demangled = demangle_rust(cleaned_mangled)
+            final_asm = simplify_rust_symbols(demangled)
+        else:
+            demangled = demangle_stream(cleaned_mangled)
+            final_asm = simplify_symbols(demangled)
 
-    return final_asm, mapping, cleaned_mangled
\ No newline at end of file
+    if with_locations:
+        return final_asm, mapping, cleaned_mangled, locations
+    return final_asm, mapping, cleaned_mangled
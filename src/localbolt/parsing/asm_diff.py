@@ -0,0 +1,292 @@
+"""
+Structural diffing of cleaned assembly listings.
+Instructions are normalised (verbose-asm comments stripped, whitespace
+collapsed, local labels renamed in order of appearance) so that only real
+codegen changes show up as added/removed lines.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .functions import FunctionInfo, is_instruction_line, split_functions
+
+RE_LOCAL_LABEL_REF = re.compile(r"(?<![\w$.])(\.L[\w$.]+|L(?:BB|tmp)[\w$]+)")
+RE_WHITESPACE = re.compile(r"\s+")
+
+# Edit-script cap for function bodies: Myers is O(ND) in time and keeps O(D^2)
+# of trace, so bodies further apart than this are reported as entirely replaced
+MAX_DIFF_EDITS = 400
+
+
+def _normalize(line: str, labels: Dict[str, str]) -> str:
+    def rename(match: re.Match) -> str:
+        name = match.group(0)
+        if name not in labels:
+            labels[name] = f".L{len(labels)}"
+        return labels[name]
+
+    code = line.split("#", 1)[0].split(";", 1)[0].strip()
+    code = RE_WHITESPACE.sub(" ", code)
+    return RE_LOCAL_LABEL_REF.sub(rename, code)
+
+
+def instruction_lines(lines: List[str], start: int = 0, end: Optional[int] = None) -> Tuple[List[int], List[str]]:
+    """
+    Returns (line indices, normalised text) for the instructions in lines[start:end].
+    Local labels are renamed .L0, .L1, ... by first use, so renumbering
+    between two compiles does not register as a change.
+    """
+    labels: Dict[str, str] = {}
+    indices, normalized = [], []
+    for idx in range(start, len(lines) if end is None else end):
+        if is_instruction_line(lines[idx]):
+            indices.append(idx)
+            normalized.append(_normalize(lines[idx], labels))
+    return indices, normalized
+
+
+def normalize_instructions(lines: List[str]) -> List[str]:
+    """Returns the instruction lines of a block in canonical form."""
+    return instruction_lines(lines)[1]
+
+
+def myers_matches(a: Sequence[Hashable], b: Sequence[Hashable],
+                  max_edits: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+    """
+    Matched index pairs (i, j) of a shortest edit script from a to b
+    (Myers' O(ND) algorithm). Common prefix/suffix are matched up front,
+    so the usual one-line edit costs O(N). Returns None when the script
+    needs more than max_edits insertions and deletions.
+    """
+    n, m = len(a), len(b)
+    head = 0
+    while head < n and head < m and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < n - head and tail < m - head and a[n - 1 - tail] == b[m - 1 - tail]:
+        tail += 1
+
+    prefix = [(i, i) for i in range(head)]
+    suffix = [(n - tail + i, m - tail + i) for i in range(tail)]
+    a_mid, b_mid = a[head:n - tail], b[head:m - tail]
+    n_mid, m_mid = len(a_mid), len(b_mid)
+    if not n_mid or not m_mid:
+        return prefix + suffix
+
+    v = {1: 0}
+    trace = []
+    for d in range(n_mid + m_mid + 1):
+        if max_edits is not None and d > max_edits:
+            return None
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n_mid and y < m_mid and a_mid[x] == b_mid[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n_mid and y >= m_mid:
+                break
+        else:
+            continue
+        break
+
+    # Walk the trace backwards collecting the diagonal (matching) moves
+    middle = []
+    x, y = n_mid, m_mid
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        prev_k = k + 1 if k == -d or (k != d and v[k - 1] < v[k + 1]) else k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            middle.append((head + x, head + y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        middle.append((head + x, head + y))
+    middle.reverse()
+    return prefix + middle + suffix
+
+
+def _intern(a: List[str], b: List[str]) -> Tuple[List[int], List[int]]:
+    """Replace lines by small ints so the diff compares integers, not strings."""
+    table: Dict[str, int] = {}
+    a_ids = [table.setdefault(line, len(table)) for line in a]
+    b_ids = [table.setdefault(line, len(table)) for line in b]
+    return a_ids, b_ids
+
+
+def line_matches(a: List[str], b: List[str], max_edits: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+    """myers_matches over two lists of lines (compared as interned ints)."""
+    return myers_matches(*_intern(a, b), max_edits=max_edits)
+
+
+def diff_counts(a: List[str], b: List[str]) -> Tuple[int, int]:
+    """
+    Returns (added, removed) line counts to turn a into b; past
+    MAX_DIFF_EDITS every line counts as replaced.
+    """
+    if a == b:
+        return 0, 0
+    matches = line_matches(a, b, max_edits=MAX_DIFF_EDITS)
+    matched = len(matches) if matches is not None else 0
+    return len(b) - matched, len(a) - matched
+
+
+@dataclass
+class FunctionComparison:
+    name: str
+    instructions_a: int = 0
+    instructions_b: int = 0
+    cycles_a: int = 0
+    cycles_b: int = 0
+    added: int = 0
+    removed: int = 0
+    # source line -> (instructions in a, instructions in b), only for lines that differ
+    line_deltas: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def only_in(self) -> Optional[str]:
+        """'a' or 'b' if the function exists in just one listing (e.g. fully inlined)."""
+        if self.instructions_b == 0 and self.instructions_a:
+            return "a"
+        if self.instructions_a == 0 and self.instructions_b:
+            return "b"
+        return None
+
+
+def _source_line_counts(func: FunctionInfo, asm_lines: List[str], mapping: Dict[int, int]) -> Counter:
+    counts = Counter()
+    for idx in range(func.start, func.end):
+        if idx in mapping and is_instruction_line(asm_lines[idx]):
+            counts[mapping[idx]] += 1
+    return counts
+
+
+def compare_listings(
+    asm_a: str, cycles_a: Dict[int, int], mapping_a: Dict[int, int],
+    asm_b: str, cycles_b: Dict[int, int], mapping_b: Dict[int, int],
+) -> List[FunctionComparison]:
+    """
+    Aligns two cleaned listings by function name and, within each function,
+    by source line. Functions are returned in the order of listing a, with
+    functions that only exist in b appended.
+    """
+    lines_a, lines_b = asm_a.splitlines(), asm_b.splitlines()
+    funcs_a = {f.name: f for f in split_functions(lines_a, cycles_a)}
+    funcs_b = {f.name: f for f in split_functions(lines_b, cycles_b)}
+
+    results = []
+    for name in list(funcs_a) + [n for n in funcs_b if n not in funcs_a]:
+        fa, fb = funcs_a.get(name), funcs_b.get(name)
+        cmp = FunctionComparison(name=name)
+        body_a = lines_a[fa.start:fa.end] if fa else []
+        body_b = lines_b[fb.start:fb.end] if fb else []
+        if fa:
+            cmp.instructions_a, cmp.cycles_a = fa.instruction_count, fa.total_cycles
+        if fb:
+            cmp.instructions_b, cmp.cycles_b = fb.instruction_count, fb.total_cycles
+        cmp.added, cmp.removed = diff_counts(normalize_instructions(body_a), normalize_instructions(body_b))
+
+        src_a = _source_line_counts(fa, lines_a, mapping_a) if fa else Counter()
+        src_b = _source_line_counts(fb, lines_b, mapping_b) if fb else Counter()
+        for line in sorted(set(src_a) | set(src_b)):
+            if src_a[line] != src_b[line]:
+                cmp.line_deltas[line] = (src_a[line], src_b[line])
+        results.append(cmp)
+    return results
+
+
+@dataclass
+class FlagComparison:
+    flags_a: List[str]
+    flags_b: List[str]
+    functions: List[FunctionComparison] = field(default_factory=list)
+    errors_a: str = ""
+    errors_b: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors_a and not self.errors_b
+
+
+@dataclass
+class FunctionDiff:
+    name: str
+    status: str  # "added", "removed", "changed", "replaced" (too different to diff) or "unchanged"
+    added_lines: List[int] = field(default_factory=list)     # 0-based lines in the new listing
+    removed_lines: List[str] = field(default_factory=list)   # normalised instructions that went away
+    cycles_before: int = 0
+    cycles_after: int = 0
+    label_line: Optional[int] = None  # label line in the new listing (None if removed)
+
+
+@dataclass
+class ListingDiff:
+    functions: List[FunctionDiff] = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[FunctionDiff]:
+        return [f for f in self.functions if f.status != "unchanged"]
+
+    @property
+    def added_lines(self) -> set:
+        return {idx for f in self.functions for idx in f.added_lines}
+
+
+def diff_listings(
+    old_asm: str, old_cycles: Dict[int, int], new_asm: str, new_cycles: Dict[int, int],
+) -> ListingDiff:
+    """
+    Per-function diff between two cleaned listings (e.g. consecutive saves).
+    Functions whose normalised body is unchanged are skipped without diffing;
+    those more than MAX_DIFF_EDITS apart are marked replaced, every
+    instruction added and removed.
+    """
+    old_lines, new_lines = old_asm.splitlines(), new_asm.splitlines()
+    old_funcs = {f.name: f for f in split_functions(old_lines, old_cycles)}
+    new_funcs = split_functions(new_lines, new_cycles)
+
+    result = ListingDiff()
+    for func in new_funcs:
+        new_idx, new_norm = instruction_lines(new_lines, func.start, func.end)
+        before = old_funcs.pop(func.name, None)
+        if before is None:
+            result.functions.append(FunctionDiff(
+                func.name, "added", added_lines=new_idx,
+                cycles_after=func.total_cycles, label_line=func.start,
+            ))
+            continue
+
+        _, old_norm = instruction_lines(old_lines, before.start, before.end)
+        entry = FunctionDiff(
+            func.name, "unchanged",
+            cycles_before=before.total_cycles, cycles_after=func.total_cycles, label_line=func.start,
+        )
+        if old_norm != new_norm:
+            matches = line_matches(old_norm, new_norm, max_edits=MAX_DIFF_EDITS)
+            entry.status = "changed" if matches is not None else "replaced"
+            kept_old = {i for i, _ in matches or ()}
+            kept_new = {j for _, j in matches or ()}
+            entry.added_lines = [new_idx[j] for j in range(len(new_norm)) if j not in kept_new]
+            entry.removed_lines = [old_norm[i] for i in range(len(old_norm)) if i not in kept_old]
+        elif entry.cycles_before != entry.cycles_after:
+            entry.status = "changed"
+        result.functions.append(entry)
+
+    for func in old_funcs.values():
+        _, old_norm = instruction_lines(old_lines, func.start, func.end)
+        result.functions.append(FunctionDiff(
+            func.name, "removed", removed_lines=old_norm, cycles_before=func.total_cycles,
+        ))
+    return result
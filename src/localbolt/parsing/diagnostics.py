@@ -1,29 +1,416 @@
+"""
+Compiler diagnostics from GCC/Clang and rustc stderr.
+
+DiagnosticParser consumes stderr one line at a time and keeps only what
+the error list shows: each error/warning with its notes (GCC/Clang
+`note:` lines, template `required from` backtraces, `In file included
+from` chains, rustc `note:`/`help:` children), de-duplicated and capped,
+so a multi-megabyte template error costs one pass and bounded memory.
+
+    hello.cpp:10:5: error: expected ';'
+    error[E0308]: mismatched types
+     --> src/main.rs:5:10
+
+The drivers ask for machine-readable output where the toolchain has it
+(GCC's -fdiagnostics-format=json array, one rustc --error-format=json
+object per line). Those lines are decoded directly, with source ranges,
+children and fix-its; any other line goes through the text patterns.
+"""
+import gc
+import json
+import os
 import re
-from dataclasses import dataclass
-from typing import List
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+MAX_DIAGNOSTICS = 500
+MAX_NOTES = 20           # per diagnostic; template backtraces can run to thousands
+MAX_MESSAGE_CHARS = 500  # instantiated template names can be kilobytes long
+
+# One pattern per kind of line that matters, combined so each line is classified by a
+# single match (Match.lastgroup names the kind); source excerpts and carets match nothing.
+RE_DIAGNOSTIC_LINE = re.compile(
+    r"^(?:"
+    # file:line:col: severity: message (column optional; no severity = backtrace such as "required from here")
+    r"(?P<file>[^\s:][^:\n]*):(?P<line>\d+):(?:(?P<col>\d+):)?[ \t]+"
+    r"(?:(?P<severity>fatal error|error|warning|note):[ \t]+)?(?P<message>.*)"
+    # In file included from a.h:3,\n                 from a.cpp:1:
+    r"|(?:In file included|[ \t]+) from (?P<inc_file>[^\n]+?):(?P<inc_line>\d+)(?::\d+)?[:,][ \t]*"
+    # rustc: error[E0308]: mismatched types
+    r"|(?P<rust_severity>error|warning|note|help)(?:\[(?P<rust_code>\w+)\])?:[ \t]+(?P<rust_message>.*)"
+    # rustc:  --> src/main.rs:5:10
+    r"|[ \t]*-->[ \t]+(?P<span_file>[^\n]+?):(?P<span_line>\d+):(?P<span_col>\d+)[ \t]*"
+    r")$",
+    re.MULTILINE,
+)
+RE_JSON_START = re.compile(r"\s*[\[{]")
+
 
 @dataclass
 class Diagnostic:
     line: int
     column: int
-    severity: str # 'error' or 'warning'
+    severity: str # 'error', 'warning' or 'note'
     message: str
+    file: str = ""
+    code: str = ""  # rustc error code (E0308) or GCC warning option (-Wunused-variable)
+    notes: List["Diagnostic"] = field(default_factory=list)
+    end_line: int = 0    # last character of the highlighted range, inclusive (0: unknown)
+    end_column: int = 0
+
+
+def _clip(message: str) -> str:
+    message = message.strip()
+    return message if len(message) <= MAX_MESSAGE_CHARS else message[:MAX_MESSAGE_CHARS - 1] + "…"
+
+
+def _severity(kind: str) -> str:
+    # GCC also reports "fatal error", "sorry, unimplemented" and ICEs; rustc has "help" and "failure-note"
+    if kind in ("warning", "note"):
+        return kind
+    return "error" if "error" in kind or kind in ("sorry", "ice") else "note"
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+@contextmanager
+def _gc_paused():
+    # Decoded JSON trees are acyclic and dropped right after parsing; without the pause the
+    # cycle collector's passes over their containers dominate multi-MB GCC arrays
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def format_diagnostic(d: Diagnostic, indent: str = "") -> str:
+    """GCC-style text for one diagnostic and its notes."""
+    location = f"{d.file}:{d.line}:{d.column}: " if d.file else ""
+    code = f" [{d.code}]" if d.code else ""
+    return f"{indent}{location}{d.severity}: {d.message}{code}\n" + "".join(
+        format_diagnostic(note, indent + "  ") for note in d.notes)
+
+
+class DiagnosticParser:
+    """
+    Feed stderr lines with feed(), then call finish() for the diagnostics.
+
+    With source_path set, warnings located in other files (headers) are
+    dropped; errors are always kept since they fail the build.
+    """
+
+    def __init__(self, source_path: Optional[str] = None, max_diagnostics: int = MAX_DIAGNOSTICS,
+                 max_notes: int = MAX_NOTES):
+        self.source_path = os.path.abspath(source_path) if source_path else None
+        self.max_diagnostics = max_diagnostics
+        self.max_notes = max_notes
+        self.diagnostics: List[Diagnostic] = []
+        self.dropped = 0  # duplicates and diagnostics over the cap (parse_diagnostics stops once saturated)
+        self._seen = set()
+        self._has_error = False
+        self.saturated = False  # at the cap with an error kept: later lines cannot change the result
+        self._current: Optional[Diagnostic] = None  # last accepted diagnostic; notes attach here
+        self._dropping = False                       # last diagnostic was dropped; skip its notes
+        self._context: List[Diagnostic] = []         # backtrace/include lines waiting for their diagnostic
+        self._pending_rust: Optional[Diagnostic] = None  # rustc header waiting for its --> span
+        self._awaiting_span: Optional[Diagnostic] = None
+        self._abs_paths: Dict[str, str] = {}
+        self.output: Optional[List[str]] = None  # set to a list to collect readable text for JSON input
+
+    def feed(self, line: str) -> None:
+        start = RE_JSON_START.match(line)
+        if start and self._feed_json_at(line, start.end() - 1) >= 0:
+            return
+        if self.output is not None:
+            self.output.append(line if line.endswith("\n") else line + "\n")
+        match = RE_DIAGNOSTIC_LINE.match(line.rstrip("\r\n"))
+        if match:
+            self.feed_match(match)
+
+    def feed_text(self, stderr: str) -> None:
+        """
+        Feeds a whole stderr text. JSON values are decoded in place, without
+        splitting the text into lines; other lines go through the text patterns.
+        """
+        if not is_json_output(stderr):
+            for match in RE_DIAGNOSTIC_LINE.finditer(stderr):
+                self.feed_match(match)
+                if self.saturated:
+                    return
+            return
+        pos, end = 0, len(stderr)
+        while pos < end and not self.saturated:
+            start = RE_JSON_START.match(stderr, pos)
+            stop = self._feed_json_at(stderr, start.end() - 1) if start else -1
+            if stop >= 0:
+                pos = stop
+                continue
+            stop = stderr.find("\n", pos)
+            stop = end if stop < 0 else stop
+            if stderr[pos:stop].strip():
+                self.feed(stderr[pos:stop])
+            pos = stop + 1
+
+    def _feed_json_at(self, text: str, index: int) -> int:
+        """Decodes and feeds the JSON value at text[index]; returns where it ends, or -1 if it is not JSON."""
+        with _gc_paused():
+            try:
+                data, end = _JSON_DECODER.raw_decode(text, index)
+            except ValueError:
+                return -1
+            # A GCC array of diagnostics or one rustc object
+            self._feed_value(data)
+            del data  # freed while collection is still paused
+        return end
+
+    def _feed_value(self, data) -> None:
+        for entry in data if isinstance(data, list) else (data,):
+            if isinstance(entry, dict):
+                self.feed_json(entry)
+            if self.saturated:
+                break
+
+    def feed_match(self, match: re.Match) -> None:
+        """Handles a RE_DIAGNOSTIC_LINE match (lets callers scan whole texts with finditer)."""
+        kind = match.lastgroup
+        if kind == "message":
+            self._located(*match.group("file", "line", "col", "severity", "message"))
+        elif kind == "inc_line":
+            self._included(*match.group("inc_file", "inc_line"))
+        elif kind == "rust_message":
+            self._rust_header(*match.group("rust_severity", "rust_code", "rust_message"))
+        else:
+            self._rust_span(*match.group("span_file", "span_line", "span_col"))
+
+    def feed_json(self, entry: dict) -> None:
+        """Handles one decoded GCC or rustc JSON diagnostic."""
+        if "message" not in entry:
+            return  # other rustc messages, e.g. artifact notifications
+        self._pending_rust = self._awaiting_span = None
+        rust = "kind" not in entry
+        build = self._rust_json if rust else self._gcc_json
+        # Notes are only built once the diagnostic is admitted: huge outputs are mostly duplicates
+        head = build(entry, 0)
+        if rust and head.line == 0 and (head.severity != "error" or self._has_error):
+            # Spanless summaries ("aborting due to 2 previous errors", "1 warning emitted");
+            # a spanless error is kept when it is the only one (e.g. a bad -C option)
+            self._context = []
+            self._render(entry, head)
+            return
+        if head.severity == "note":
+            # A top-level note explains the previous diagnostic
+            if not self._dropping and self._current is not None:
+                note = build(entry, self.max_notes)
+                if self._add_note(note):
+                    self._render(entry, note)
+            return
+        if self._admit((head.file, head.line, head.column, head.severity, head.message)):
+            diagnostic = build(entry, self.max_notes)
+            self._keep(diagnostic)
+            self._render(entry, diagnostic)
+
+    def _render(self, entry: dict, diagnostic: Diagnostic) -> None:
+        if self.output is not None:
+            self.output.append(entry.get("rendered") or format_diagnostic(diagnostic))
+
+    def finish(self) -> List[Diagnostic]:
+        self._pending_rust = self._awaiting_span = None
+        self._context = []
+        return self.diagnostics
+
+    # --- GCC / Clang ---
+
+    def _located(self, file: str, line: str, col: Optional[str], severity: Optional[str], message: str) -> None:
+        self._pending_rust = self._awaiting_span = None
+        if severity is None or severity == "note":
+            if self._dropping:
+                return
+            if severity is None or self._current is None:
+                # "required from here" / "in instantiation of" precede the error they explain
+                if len(self._context) < self.max_notes:
+                    self._context.append(Diagnostic(int(line), int(col or 0), "note", _clip(message), file))
+            else:
+                # An include chain before a note only locates that note's header
+                self._context = []
+                if len(self._current.notes) < self.max_notes:
+                    self._current.notes.append(Diagnostic(int(line), int(col or 0), "note", _clip(message), file))
+            return
+        severity = "error" if severity == "fatal error" else severity
+        # Checked before building anything: repeated template errors are mostly duplicates
+        context = self._context
+        if not self._admit((file, line, col, severity, message)):
+            return
+        entry = Diagnostic(int(line), int(col or 0), severity, _clip(message), file, notes=context)
+        self._keep(entry)
+
+    def _included(self, file: str, line: str) -> None:
+        if len(self._context) < self.max_notes:
+            self._context.append(Diagnostic(int(line), 0, "note", "in file included from here", file))
+
+    # --- rustc ---
+
+    def _rust_header(self, severity: str, code: Optional[str], message: str) -> None:
+        entry = Diagnostic(0, 0, severity if severity in ("error", "warning") else "note", _clip(message), code=code or "")
+        if entry.severity == "note":
+            # Child of the current diagnostic; its own --> span may follow
+            self._pending_rust = None
+            if self._current is not None and self._add_note(entry):
+                self._awaiting_span = entry
+            return
+        # Summaries such as "aborting due to previous error" never get a span and are dropped
+        self._pending_rust = self._awaiting_span = entry
+        self._current = None
+
+    def _rust_span(self, file: str, line: str, col: str) -> None:
+        target = self._awaiting_span
+        if target is None:
+            return
+        self._awaiting_span = None
+        target.file, target.line, target.column = file, int(line), int(col)
+        if target is self._pending_rust:
+            self._pending_rust = None
+            if self._admit((file, line, col, target.severity, target.message)):
+                self._keep(target)
+
+    # --- JSON ---
+
+    @staticmethod
+    def _gcc_json(entry: dict, max_notes: int) -> Diagnostic:
+        """The diagnostic with up to max_notes children and fix-its."""
+        # locations: [{"caret": {...}, "start": {...}, "finish": {...}}]; children are notes
+        locations = entry.get("locations") or [{}]
+        caret = locations[0].get("caret") or {}
+        finish = locations[0].get("finish") or caret
+        diagnostic = Diagnostic(
+            caret.get("line", 0), caret.get("column", 0), _severity(entry.get("kind", "")),
+            _clip(entry.get("message", "")), caret.get("file", ""), entry.get("option", ""),
+            end_line=finish.get("line", 0), end_column=finish.get("column", 0),
+        )
+        for child in entry.get("children") or ():
+            if len(diagnostic.notes) >= max_notes:
+                break
+            diagnostic.notes.append(DiagnosticParser._gcc_json(child, max_notes))
+        for fixit in entry.get("fixits") or ():
+            if len(diagnostic.notes) >= max_notes:
+                break
+            start, replacement = fixit.get("start") or {}, fixit.get("string", "")
+            if not replacement:
+                message = "fix-it: remove this"
+            elif start == fixit.get("next"):
+                message = f"fix-it: insert '{replacement}'"
+            else:
+                message = f"fix-it: replace with '{replacement}'"
+            diagnostic.notes.append(Diagnostic(start.get("line", 0), start.get("column", 0), "note", _clip(message),
+                                               start.get("file", "")))
+        return diagnostic
+
+    @staticmethod
+    def _rust_json(entry: dict, max_notes: int) -> Diagnostic:
+        """The diagnostic with up to max_notes labelled spans and children."""
+        # spans carry 1-based columns with an exclusive end; labelled spans become notes
+        spans = entry.get("spans") or []
+        primary = next((span for span in spans if span.get("is_primary")), spans[0] if spans else {})
+        code = entry.get("code") or {}
+        diagnostic = Diagnostic(0, 0, _severity(entry.get("level", "")), _clip(entry.get("message", "")),
+                                code=code.get("code", "") if isinstance(code, dict) else "")
+        if primary:
+            _set_rust_span(diagnostic, primary)
+            if primary.get("suggested_replacement") is not None:
+                # "help: prefix it with an underscore" + the suggested text, as in the rendered output
+                diagnostic.message = _clip(f"{diagnostic.message}: `{primary['suggested_replacement']}`")
+        for span in spans:
+            if span.get("label") and len(diagnostic.notes) < max_notes:
+                note = Diagnostic(0, 0, "note", _clip(span["label"]))
+                _set_rust_span(note, span)
+                diagnostic.notes.append(note)
+        for child in entry.get("children") or ():
+            if len(diagnostic.notes) >= max_notes:
+                break
+            note = DiagnosticParser._rust_json(child, max_notes)
+            note.severity = "note"
+            diagnostic.notes.append(note)
+        return diagnostic
+
+    # --- shared ---
+
+    def _add_note(self, note: Diagnostic) -> bool:
+        if self._current is None or len(self._current.notes) >= self.max_notes:
+            return False
+        self._current.notes.append(note)
+        return True
+
+    def _in_source(self, path: str) -> bool:
+        if path not in self._abs_paths:
+            self._abs_paths[path] = os.path.abspath(path)
+        return self._abs_paths[path] == self.source_path
+
+    def _admit(self, key: tuple) -> bool:
+        """Filter, de-duplicate and cap a diagnostic by (file, line, column, severity, message)."""
+        file, severity = key[0], key[3]
+        self._current, self._dropping = None, True  # notes of a dropped diagnostic go with it
+        self._context = []
+        if self.source_path and severity != "error" and not self._in_source(file):
+            return False
+        if key in self._seen:
+            self.dropped += 1
+            return False
+        # Past the cap, still keep the first error so has_errors stays right
+        if len(self.diagnostics) >= self.max_diagnostics and (self._has_error or severity != "error"):
+            self.dropped += 1
+            return False
+        self._seen.add(key)
+        return True
+
+    def _keep(self, entry: Diagnostic) -> None:
+        self._has_error = self._has_error or entry.severity == "error"
+        self.diagnostics.append(entry)
+        self._current, self._dropping = entry, False
+        self.saturated = self._has_error and len(self.diagnostics) >= self.max_diagnostics
+
+
+def _set_rust_span(diagnostic: Diagnostic, span: dict) -> None:
+    diagnostic.file = span.get("file_name", "")
+    diagnostic.line, diagnostic.column = span.get("line_start", 0), span.get("column_start", 0)
+    diagnostic.end_line, diagnostic.end_column = span.get("line_end", diagnostic.line), span.get("column_end", 1) - 1
+    if diagnostic.end_line == diagnostic.line and diagnostic.end_column < diagnostic.column:
+        diagnostic.end_column = diagnostic.column  # empty span, e.g. an insertion point
+
+
+def is_json_output(stderr: str) -> bool:
+    """Whether stderr starts with JSON diagnostics rather than compiler text."""
+    return RE_JSON_START.match(stderr) is not None
+
+
+def parse_compiler_output(stderr: str, source_path: Optional[str] = None) -> Tuple[List[Diagnostic], str]:
+    """
+    Returns (diagnostics, readable text). The text is stderr itself, except
+    for JSON output, which is rendered (rustc's own rendering, GCC-style
+    lines for GCC) so the error view never shows raw JSON.
+    """
+    if not is_json_output(stderr):
+        return parse_diagnostics(stderr, source_path), stderr
+    parser = DiagnosticParser(source_path)
+    parser.output = []
+    parser.feed_text(stderr)
+    return parser.finish(), "".join(parser.output)
+
 
-def parse_diagnostics(stderr: str) -> List[Diagnostic]:
+def parse_diagnostics(stderr: Union[str, Iterable[str]], source_path: Optional[str] = None) -> List[Diagnostic]:
     """
-    Parses GCC/Clang error output into structured objects.
-    Example: hello.cpp:10:5: error: expected ';'
+    Parses GCC/Clang or rustc error output into structured objects.
+    stderr may be the whole text or any iterable of lines.
     """
-    diagnostics = []
-    # Pattern: filename:line:col: severity: message
-    pattern = re.compile(r"^.*:(\d+):(\d+):\s+(error|warning):\s+(.*)$", re.MULTILINE)
-    
-    for match in pattern.finditer(stderr):
-        diagnostics.append(Diagnostic(
-            line=int(match.group(1)),
-            column=int(match.group(2)),
-            severity=match.group(3),
-            message=match.group(4).strip()
-        ))
-    
-    return diagnostics
+    parser = DiagnosticParser(source_path)
+    if isinstance(stderr, str):
+        parser.feed_text(stderr)
+    else:
+        for line in stderr:
+            parser.feed(line)
+            if parser.saturated:
+                break
+    return parser.finish()
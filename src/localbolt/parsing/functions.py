@@ -0,0 +1,77 @@
+"""
+Function-level view of a cleaned assembly listing.
+Splits the output of clean_assembly_with_mapping into one block per
+function label so listings can be compared and summarised per function.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .lexer import MACHO_LOCAL_LABEL
+
+# Function labels are flush-left; local labels (.LBB2:, LBB0_2: on macOS) and comments are not functions.
+RE_FUNCTION_LABEL = re.compile(rf"^(?!{MACHO_LOCAL_LABEL})[^\s.#;].*:$")
+RE_INSTRUCTION_LINE = re.compile(r"^\s+[^\s.#;]")
+
+
+@dataclass
+class FunctionInfo:
+    name: str
+    start: int  # 0-based index of the label line
+    end: int    # exclusive
+    instruction_count: int = 0
+    total_cycles: int = 0
+
+
+def is_instruction_line(line: str) -> bool:
+    """True for indented instruction lines (not labels, directives or comments)."""
+    return bool(RE_INSTRUCTION_LINE.match(line)) and not line.rstrip().endswith(":")
+
+
+def split_functions(asm_lines: List[str], cycle_counts: Dict[int, int] = None) -> List[FunctionInfo]:
+    """
+    Returns one FunctionInfo per function label, in listing order.
+    cycle_counts uses the same 1-based line numbers as line_cycle_counts.
+    Lines before the first function label (compiler banner comments) are skipped.
+    """
+    cycle_counts = cycle_counts or {}
+    functions: List[FunctionInfo] = []
+    current = None
+
+    for idx, line in enumerate(asm_lines):
+        if RE_FUNCTION_LABEL.match(line):
+            if current:
+                current.end = idx
+            current = FunctionInfo(name=line[:-1].strip(), start=idx, end=len(asm_lines))
+            functions.append(current)
+            continue
+        if current and is_instruction_line(line):
+            current.instruction_count += 1
+            current.total_cycles += cycle_counts.get(idx + 1, 0)
+
+    # Trim the trailing blank separator that the lexer puts between functions
+    for func in functions:
+        while func.end > func.start + 1 and not asm_lines[func.end - 1].strip():
+            func.end -= 1
+    return functions
+
+
+def line_anchors(asm_lines: List[str], mapping: Dict[int, int]) -> List[Tuple[str, int, int]]:
+    """
+    A stable identity for every listing line: (enclosing function label,
+    mapped source line or 0, ordinal among the function's lines with that
+    source line). Unlike the index, it survives edits elsewhere in the file.
+    mapping is the 0-based asm index -> source line map of the listing.
+    """
+    anchors: List[Tuple[str, int, int]] = []
+    function = ""
+    seen: Dict[int, int] = {}
+    for idx, line in enumerate(asm_lines):
+        if RE_FUNCTION_LABEL.match(line):
+            function = line[:-1].strip()
+            seen = {}
+        src = mapping.get(idx, 0)
+        ordinal = seen.get(src, 0)
+        seen[src] = ordinal + 1
+        anchors.append((function, src, ordinal))
+    return anchors
@@ -0,0 +1,127 @@
+"""
+Hot-spot ranking: the llvm-mca estimates of a listing summed per source
+line and per function, most expensive first, and per source line in
+source order (with the source -> asm reverse index).
+Costs are first spread into per-asm-line arrays (latency, reciprocal
+throughput) so each function is a slice sum/max instead of a walk over
+its instructions.
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .functions import FunctionInfo
+from .perf_parser import InstructionStats
+
+
+@dataclass
+class HotSpot:
+    """Aggregated cost of one source line (source_line > 0) or one whole function (source_line == 0)."""
+    function: str
+    source_line: int
+    asm_line: int  # 0-based listing index to jump to: the line's first instruction, or the function label
+    instructions: int = 0
+    total_latency: int = 0
+    max_throughput: float = 0.0  # the worst reciprocal throughput among its instructions
+
+
+@dataclass
+class SourceCost:
+    """Everything one source line compiled to, across all functions."""
+    asm_lines: List[int]  # 0-based listing indices mapped to the line, in listing order
+    instructions: int = 0
+    cycles: int = 0  # summed latency
+
+
+def line_costs(line_count: int, instr_lines: array,
+               perf_stats: Dict[int, InstructionStats]) -> Tuple[array, array]:
+    """(latency, reciprocal throughput) per asm line; 0 on lines llvm-mca has no estimate for."""
+    latency = array("l", [0]) * line_count
+    throughput = array("d", [0.0]) * line_count
+    count = len(instr_lines)
+    for idx, stats in perf_stats.items():
+        if 0 <= idx < count:
+            line = instr_lines[idx]
+            latency[line] = stats.latency
+            throughput[line] = stats.throughput
+    return latency, throughput
+
+
+def rank_hotspots(
+    costs: Tuple[array, array],
+    instr_lines: array,
+    perf_stats: Dict[int, InstructionStats],
+    mapping: Dict[int, int],
+    functions: List[FunctionInfo],
+) -> Tuple[List[HotSpot], List[HotSpot]]:
+    """
+    Returns (source lines, functions), each sorted by total latency and then
+    by throughput pressure, descending. Entries without any estimate are left
+    out, as are lines before the first function label.
+    costs is line_costs of the listing, instr_lines its mca_instruction_lines
+    and mapping its 0-based asm index -> source line map.
+    """
+    latency, throughput = costs
+    estimated = bytearray(len(latency))
+    for idx in perf_stats:
+        if 0 <= idx < len(instr_lines):
+            estimated[instr_lines[idx]] = 1
+
+    hot_lines: List[HotSpot] = []
+    hot_functions: List[HotSpot] = []
+    for func in functions:
+        total = sum(latency[func.start:func.end])
+        if not total:
+            continue
+        hot_functions.append(HotSpot(
+            func.name, 0, func.start, func.instruction_count, total, max(throughput[func.start:func.end]),
+        ))
+        # source line -> [first asm line, instructions, latency, max throughput]
+        by_source: Dict[int, list] = {}
+        start, end = func.start, func.end
+        for asm, est, cost, pressure in zip(range(start, end), estimated[start:end],
+                                            latency[start:end], throughput[start:end]):
+            src = est and mapping.get(asm)
+            if not src:
+                continue
+            entry = by_source.get(src)
+            if entry is None:
+                by_source[src] = [asm, 1, cost, pressure]
+                continue
+            entry[1] += 1
+            entry[2] += cost
+            if pressure > entry[3]:
+                entry[3] = pressure
+        hot_lines.extend(
+            HotSpot(func.name, src, first, count, cost, worst)
+            for src, (first, count, cost, worst) in by_source.items() if cost
+        )
+
+    hot_lines.sort(key=_cost_order)
+    hot_functions.sort(key=_cost_order)
+    return hot_lines, hot_functions
+
+
+def source_costs(latency: array, instr_lines: array, mapping: Dict[int, int]) -> Dict[int, SourceCost]:
+    """
+    Source line -> SourceCost: the reverse index of mapping with the
+    instruction count and summed latency of each line's asm.
+    """
+    is_instruction = bytearray(len(latency))
+    for line in instr_lines:
+        is_instruction[line] = 1
+    costs: Dict[int, SourceCost] = {}
+    for asm in sorted(mapping):
+        src = mapping[asm]
+        cost = costs.get(src)
+        if cost is None:
+            cost = costs[src] = SourceCost([])
+        cost.asm_lines.append(asm)
+        if asm < len(latency) and is_instruction[asm]:
+            cost.instructions += 1
+            cost.cycles += latency[asm]
+    return costs
+
+
+def _cost_order(spot: HotSpot) -> Tuple[int, float, int]:
+    return -spot.total_latency, -spot.max_throughput, spot.asm_line
@@ -1,6 +1,7 @@
 import re
 import os
 from typing import List, Dict, Tuple, Set, Optional
+from .locations import SourceLocations
 
 # --- UNIVERSAL REGEX REGISTRY ---
 
@@ -23,27 +24,57 @@ RE_CODE_SECTION = re.compile(r"^\s*\.(section\s+.*(__TEXT|text)|text)", re.IGNOR
 # 4. DIRECTIVES
 RE_DIRECTIVE = re.compile(r"^\s*\.[a-zA-Z0-9_]+")
 RE_DATA_DIRECTIVE = re.compile(r"^\s*\.(asciz|string)")
+RE_LOCAL_LABEL = re.compile(r"^\s*\.L")
+# Mach-O assembler-local labels have no dot and are kept flush-left: LBB0_2, Ltmp3, LCPI0_0, LJTI0_0, Lloh0
+MACHO_LOCAL_LABEL = r"L(?:BB|tmp|CPI|JTI|loh)\d"
+RE_MACHO_LOCAL_LABEL = re.compile(rf"^\s*{MACHO_LOCAL_LABEL}")
+
+def is_local_label(label: str) -> bool:
+    """Block and temporary labels (.LBB2, .LVL0; LBB0_2 on macOS): inside a function, never its start."""
+    return bool(RE_LOCAL_LABEL.match(label) or RE_MACHO_LOCAL_LABEL.match(label))
 
 # 5. DWARF / Mapping
 # Matches both GCC/Clang format:  .file 1 "test.cpp"
 # and LLVM/Rust 3-part format:    .file 8 "/tmp" "test_rust.rs"
 RE_FILE = re.compile(r'^\s*\.file\s+(\d+)\s+"([^"]+)"(?:\s+"([^"]+)")?')
-RE_LOC = re.compile(r"^\s*\.loc\s+(\d+)\s+(\d+)")
+# .loc FILE LINE [COLUMN] [is_stmt N] [discriminator N] [view .LVU3]
+RE_LOC = re.compile(r"^\s*\.loc\s+(\d+)\s+(\d+)(?:\s+(\d+))?")
+RE_LOC_DISCRIMINATOR = re.compile(r"\bdiscriminator\s+(\d+)")
 
 class LexerContext:
     def __init__(self, source_filename: Optional[str]):
         self.main_file_id = 1
         self.source_basename = os.path.basename(source_filename) if source_filename else None
         self.current_source_line = None
+        self.current_column = 0
+        self.current_discriminator = 0
         self.active_file_id = None
+        # Last main-file line of the current function: where header code after it was inlined
+        self.main_source_line = None
+        self.files: Dict[int, str] = {}
         self.is_macos = os.uname().sysname.lower() == "darwin"
 
 def clean_assembly_with_mapping(raw_asm: str, source_filename: str = None) -> Tuple[str, Dict[int, int]]:
+    """Main-file code only: instructions whose .loc is in another file (inlined header code) are dropped."""
+    cleaned, line_map, _ = clean_assembly_with_locations(raw_asm, source_filename, keep_inlined=False)
+    return cleaned, line_map
+
+def clean_assembly_with_locations(raw_asm: str, source_filename: str = None,
+                                  keep_inlined: bool = True) -> Tuple[str, Dict[int, int], SourceLocations]:
+    """
+    Returns: (cleaned asm, asm index -> main-file line, SourceLocations)
+    With keep_inlined, code inlined from headers stays in the listing; the
+    mapping attributes it to the main-file line it was inlined into and the
+    locations record its own file and line.
+    """
     ctx = LexerContext(source_filename)
     lines = raw_asm.splitlines()
     
-    # 1. Identify File ID
+    # 1. Identify File ID (and collect every file for the multi-file locations)
+    main_found = False
     for line in lines:
+        if ".file" not in line:
+            continue
         match = RE_FILE.match(line)
         if match:
             fid = int(match.group(1))
@@ -54,9 +85,11 @@ def clean_assembly_with_mapping(raw_asm: str, source_filename: str = None) -> Tu
             # 3-part format (LLVM/Rust): .file 8 "/dir" "file.rs" — group(3) is the filename
             # 2-part format (GCC/Clang): .file 1 "file.cpp" — group(2) is the full path
             path = match.group(3) if match.group(3) else match.group(2)
-            if ctx.source_basename and os.path.basename(path) == ctx.source_basename:
+            ctx.files.setdefault(fid, os.path.join(match.group(2), path) if match.group(3) else path)
+            if not main_found and ctx.source_basename and os.path.basename(path) == ctx.source_basename:
                 ctx.main_file_id = fid
-                break
+                main_found = True
+    locations = SourceLocations(files=ctx.files, main_file=ctx.main_file_id)
 
     clean_lines = []
     line_map = {}
@@ -84,6 +117,11 @@ def clean_assembly_with_mapping(raw_asm: str, source_filename: str = None) -> Tu
         if loc_match:
             ctx.active_file_id = int(loc_match.group(1))
             ctx.current_source_line = int(loc_match.group(2))
+            ctx.current_column = int(loc_match.group(3) or 0)
+            discriminator = RE_LOC_DISCRIMINATOR.search(line_content, loc_match.end())
+            ctx.current_discriminator = int(discriminator.group(1)) if discriminator else 0
+            if ctx.active_file_id == ctx.main_file_id:
+                ctx.main_source_line = ctx.current_source_line
             continue
 
         # --- STAGE 3: BLOCK FILTER ---
@@ -99,13 +137,20 @@ def clean_assembly_with_mapping(raw_asm: str, source_filename: str = None) -> Tu
             
             # User Label
             in_user_block = True
+            if not is_local_label(stripped):
+                ctx.main_source_line = None
+            # GCC emits local labels (.LVL0, .LBB2) between a function label and its
+            # first instruction; don't let them replace the function name.
+            if pending_label and is_local_label(stripped) and not is_local_label(pending_label):
+                continue
             pending_label = line_content
             continue
 
         if not in_user_block: continue
 
         # --- STAGE 4: FILE FILTER ---
-        if ctx.active_file_id is not None and ctx.active_file_id != ctx.main_file_id:
+        inlined = ctx.active_file_id is not None and ctx.active_file_id != ctx.main_file_id
+        if inlined and not keep_inlined:
             continue
 
         # --- STAGE 5: INSTRUCTION FILTER ---
@@ -134,8 +179,15 @@ def clean_assembly_with_mapping(raw_asm: str, source_filename: str = None) -> Tu
             content = re.sub(r"\b_([a-zA-Z0-9_$]+)", r"\1", content)
         
         asm_line_idx = len(clean_lines)
-        if ctx.current_source_line is not None:
+        if inlined:
+            if ctx.main_source_line is not None:
+                line_map[asm_line_idx] = ctx.main_source_line
+            locations.append(asm_line_idx, ctx.active_file_id, ctx.current_source_line,
+                             ctx.current_column, ctx.current_discriminator, ctx.main_source_line or 0)
+        elif ctx.current_source_line is not None:
             line_map[asm_line_idx] = ctx.current_source_line
+            locations.append(asm_line_idx, ctx.active_file_id, ctx.current_source_line,
+                             ctx.current_column, ctx.current_discriminator)
         clean_lines.append(content)
 
-    return "\n".join(clean_lines), line_map
+    return "\n".join(clean_lines), line_map, locations
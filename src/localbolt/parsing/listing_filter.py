@@ -0,0 +1,118 @@
+"""
+Listing filters: which lines of a cleaned assembly listing to show, as a
+view over the stored listing (nothing is recompiled).
+A filter keeps the functions whose name matches, the asm of a source line
+range and/or the basic blocks whose estimated cost reaches a threshold.
+"""
+import fnmatch
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .functions import FunctionInfo, RE_INSTRUCTION_LINE
+
+
+@dataclass(frozen=True)
+class ListingFilter:
+    functions: Tuple[str, ...] = ()  # name patterns: substrings, or globs if they contain * ? [
+    source_range: Optional[Tuple[int, int]] = None  # inclusive 1-based source lines
+    min_cycles: int = 0  # blocks whose summed cycles are below this are hidden
+
+    @property
+    def active(self) -> bool:
+        return bool(self.functions or self.source_range or self.min_cycles)
+
+    def describe(self) -> str:
+        """The filter in the syntax parse_filter accepts."""
+        terms = list(self.functions)
+        if self.source_range:
+            terms.append(f"line:{self.source_range[0]}-{self.source_range[1]}")
+        if self.min_cycles:
+            terms.append(f"min:{self.min_cycles}")
+        return " ".join(terms)
+
+
+def parse_filter(text: str) -> ListingFilter:
+    """
+    Parses whitespace-separated terms: `line:A-B` (or `line:N`) for a source
+    range, `min:N` for a cost threshold, anything else a function name
+    pattern (a function matching any of them is kept).
+    Raises ValueError on a malformed term.
+    """
+    functions: List[str] = []
+    source_range = None
+    min_cycles = 0
+    for term in text.split():
+        key, _, value = term.partition(":")
+        if key == "line" and value:
+            first, _, last = value.partition("-")
+            try:
+                source_range = (int(first), int(last or first))
+            except ValueError:
+                raise ValueError(f"bad source range '{value}' (expected line:A-B)") from None
+            if source_range[0] > source_range[1]:
+                source_range = (source_range[1], source_range[0])
+        elif key == "min" and value:
+            if not value.isdigit():
+                raise ValueError(f"bad cycle threshold '{value}' (expected min:N)")
+            min_cycles = int(value)
+        else:
+            functions.append(term)
+    return ListingFilter(tuple(functions), source_range, min_cycles)
+
+
+def name_matches(pattern: str, name: str) -> bool:
+    pattern, name = pattern.lower(), name.lower()
+    if any(ch in pattern for ch in "*?["):
+        return fnmatch.fnmatchcase(name, pattern)
+    return pattern in name
+
+
+def visible_lines(
+    asm_lines: List[str],
+    functions: List[FunctionInfo],
+    mapping: Dict[int, int],
+    cycle_counts: Dict[int, int],
+    listing_filter: ListingFilter,
+) -> bytearray:
+    """
+    1 per shown line, 0 per hidden one. A function's label is shown while
+    any of its lines is; lines outside functions (banner comments) only
+    without function or range terms. cycle_counts uses the 1-based line
+    numbers of line_cycle_counts; mapping the 0-based asm indices.
+    """
+    count = len(asm_lines)
+    if not listing_filter.active:
+        return bytearray(b"\x01") * count
+    by_name = listing_filter.functions
+    source_range = listing_filter.source_range
+    visible = bytearray(count) if by_name or source_range else bytearray(b"\x01") * count
+
+    for func in functions:
+        body = range(func.start + 1, func.end)
+        if by_name and not any(name_matches(pattern, func.name) for pattern in by_name):
+            continue
+        if source_range:
+            lo, hi = source_range
+            for idx in body:
+                visible[idx] = lo <= mapping.get(idx, 0) <= hi
+        else:
+            visible[func.start + 1:func.end] = b"\x01" * len(body)
+        if listing_filter.min_cycles:
+            _hide_cold_blocks(asm_lines, body, cycle_counts, listing_filter.min_cycles, visible)
+        visible[func.start] = any(visible[func.start + 1:func.end])
+    return visible
+
+
+def _hide_cold_blocks(asm_lines: List[str], body: range, cycle_counts: Dict[int, int],
+                      min_cycles: int, visible: bytearray) -> None:
+    """Blocks run from one label to the next; a block summing fewer than min_cycles is hidden."""
+    block_start, cost = body.start, 0
+    for idx in body:
+        line = asm_lines[idx]
+        if line.rstrip().endswith(":") and not RE_INSTRUCTION_LINE.match(line):
+            if cost < min_cycles:
+                visible[block_start:idx] = bytes(idx - block_start)
+            block_start, cost = idx, 0
+        cost += cycle_counts.get(idx + 1, 0)
+    if cost < min_cycles:
+        visible[block_start:body.stop] = bytes(body.stop - block_start)
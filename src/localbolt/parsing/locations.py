@@ -0,0 +1,58 @@
+"""
+Multi-file source locations of a cleaned listing, from the `.loc`
+directives: which file, line and column (and discriminator) each asm line
+came from, including code inlined from headers, and the main-file line it
+was inlined into.
+Stored as parallel int32 arrays (one entry per located asm line) rather
+than one object per line.
+"""
+import bisect
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, NamedTuple, Optional
+
+# Typecode of every column array: 4 bytes per value
+TYPECODE = "i"
+
+
+class SourceLocation(NamedTuple):
+    file_id: int
+    line: int
+    column: int  # 1-based; 0 if the compiler gave none
+    discriminator: int  # tells apart blocks sharing a line and column (loop condition vs. body)
+    inlined_at: int  # main-file line the code was inlined into; 0 for main-file code
+
+
+@dataclass
+class SourceLocations:
+    files: Dict[int, str] = field(default_factory=dict)  # .file id -> path as the compiler wrote it
+    main_file: int = 1
+    asm_lines: array = field(default_factory=lambda: array(TYPECODE))  # 0-based listing index, ascending
+    file_ids: array = field(default_factory=lambda: array(TYPECODE))
+    lines: array = field(default_factory=lambda: array(TYPECODE))
+    columns: array = field(default_factory=lambda: array(TYPECODE))
+    discriminators: array = field(default_factory=lambda: array(TYPECODE))
+    inlined_at: array = field(default_factory=lambda: array(TYPECODE))
+
+    def __len__(self) -> int:
+        return len(self.asm_lines)
+
+    def append(self, asm_line: int, file_id: int, line: int, column: int = 0, discriminator: int = 0,
+               inlined_at: int = 0) -> None:
+        self.asm_lines.append(asm_line)
+        self.file_ids.append(file_id)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.discriminators.append(discriminator)
+        self.inlined_at.append(inlined_at)
+
+    def lookup(self, asm_line: int) -> Optional[SourceLocation]:
+        """The location of listing line asm_line, or None if it has none."""
+        i = bisect.bisect_left(self.asm_lines, asm_line)
+        if i == len(self.asm_lines) or self.asm_lines[i] != asm_line:
+            return None
+        return SourceLocation(self.file_ids[i], self.lines[i], self.columns[i], self.discriminators[i],
+                              self.inlined_at[i])
+
+    def is_inlined(self, location: SourceLocation) -> bool:
+        return location.file_id != self.main_file
@@ -1,5 +1,7 @@
 import re
-from typing import Dict, List, NamedTuple
+from array import array
+from typing import Dict, List, NamedTuple, Optional
+from ..utils.asm_syntax import INSTRUCTIONS
 
 class InstructionStats(NamedTuple):
     latency: int
@@ -64,4 +66,36 @@ def parse_mca_output(mca_text: str) -> Dict[int, InstructionStats]:
                     stats_map[current_idx] = InstructionStats(latency, float(uops), tput)
                     current_idx += 1
 
-    return stats_map
\ No newline at end of file
+    return stats_map
+
+def parse_mca_outputs(mca_by_cpu: Dict[str, str]) -> Dict[str, Dict[int, InstructionStats]]:
+    """
+    Parses one llvm-mca report per target CPU.
+    CPUs whose report has no 'Instruction Info' section map to an empty dict.
+    """
+    return {cpu: parse_mca_output(text or "") for cpu, text in mca_by_cpu.items()}
+
+
+def mca_instruction_lines(asm_lines: List[str]) -> array:
+    """
+    The 0-based asm line of each llvm-mca instruction index. Labels and
+    lines without a recognised mnemonic don't consume an index.
+    """
+    lines = array("l")
+    for line_idx, line in enumerate(asm_lines):
+        stripped = line.strip()
+        if stripped and not stripped.endswith(":") and INSTRUCTIONS.search(stripped):
+            lines.append(line_idx)
+    return lines
+
+
+def line_cycle_counts(asm_lines: List[str], perf_stats: Dict[int, InstructionStats],
+                      instr_lines: Optional[array] = None) -> Dict[int, int]:
+    """
+    Maps llvm-mca instruction indices onto 1-based asm line numbers (latency per line).
+    instr_lines is mca_instruction_lines(asm_lines), when the caller already has it.
+    """
+    if instr_lines is None:
+        instr_lines = mca_instruction_lines(asm_lines)
+    count = len(instr_lines)
+    return {instr_lines[idx] + 1: stats.latency for idx, stats in perf_stats.items() if 0 <= idx < count}
@@ -0,0 +1,164 @@
+"""
+Wire format between the `localbolt serve` daemon and its clients.
+
+Newline-delimited JSON over a local Unix socket. Every request carries an
+id and an op and gets exactly one reply with the same id; state updates
+for the files a client has opened are pushed as events:
+
+    -> {"id": 1, "op": "open", "file": "/src/a.cpp"}
+    <- {"id": 1, "ok": true, "file": "/src/a.cpp"}
+    <- {"event": "state", "file": "/src/a.cpp", "state": {...}, "timings": {...}}
+
+States are sent compactly: dicts keyed by line index become lists of rows,
+and the raw llvm-mca report (unused by frontends) and the previous listing
+and its stats (the diff against them, asm_diff, is sent instead) are left out.
+"""
+import json
+import os
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .parsing.asm_diff import FlagComparison, FunctionComparison, FunctionDiff, ListingDiff
+from .parsing.diagnostics import Diagnostic
+from .parsing.functions import FunctionInfo
+from .parsing.hotspots import HotSpot, SourceCost
+from .parsing.locations import SourceLocations, TYPECODE as LOCATION_TYPECODE
+from .parsing.perf_parser import InstructionStats
+from .utils.state import LocalBoltState
+from .utils.timing import RefreshTimings
+
+PROTOCOL_VERSION = 8
+
+
+def default_socket_path() -> str:
+    """$LOCALBOLT_SOCKET, else a per-user socket in $XDG_RUNTIME_DIR or ~/.localbolt."""
+    if os.environ.get("LOCALBOLT_SOCKET"):
+        return os.environ["LOCALBOLT_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "localbolt.sock")
+    return str(Path.home() / ".localbolt" / f"localbolt-{os.getuid()}.sock")
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    return json.loads(line)
+
+
+def _encode_stats(stats: Dict[int, InstructionStats]) -> List[list]:
+    return [[idx, s.latency, s.uops, s.throughput] for idx, s in stats.items()]
+
+
+def _decode_stats(rows: List[list]) -> Dict[int, InstructionStats]:
+    return {idx: InstructionStats(lat, uops, tp) for idx, lat, uops, tp in rows}
+
+
+def _encode_diagnostic(d: Diagnostic) -> list:
+    return [d.line, d.column, d.severity, d.message, d.file, d.code, [_encode_diagnostic(n) for n in d.notes],
+            d.end_line, d.end_column]
+
+
+def _decode_diagnostic(row: list) -> Diagnostic:
+    line, column, severity, message, file, code, notes, end_line, end_column = row
+    return Diagnostic(line, column, severity, message, file, code, [_decode_diagnostic(n) for n in notes],
+                      end_line, end_column)
+
+
+def _encode_hotspot(h: HotSpot) -> list:
+    return [h.function, h.source_line, h.asm_line, h.instructions, h.total_latency, h.max_throughput]
+
+
+# The parallel arrays of SourceLocations, sent as plain lists
+_LOCATION_COLUMNS = ("asm_lines", "file_ids", "lines", "columns", "discriminators", "inlined_at")
+
+
+def _encode_locations(locations: SourceLocations) -> dict:
+    data = {name: getattr(locations, name).tolist() for name in _LOCATION_COLUMNS}
+    data["files"] = list(locations.files.items())
+    data["main_file"] = locations.main_file
+    return data
+
+
+def _decode_locations(data: dict) -> SourceLocations:
+    return SourceLocations(
+        files={fid: path for fid, path in data["files"]}, main_file=data["main_file"],
+        **{name: array(LOCATION_TYPECODE, data[name]) for name in _LOCATION_COLUMNS},
+    )
+
+
+def encode_state(state: LocalBoltState) -> dict:
+    return {
+        "source_path": state.source_path,
+        "source_code": state.source_code,
+        "asm_content": state.asm_content,
+        "asm_mapping": list(state.asm_mapping.items()),
+        "source_locations": _encode_locations(state.source_locations),
+        "perf_stats": _encode_stats(state.perf_stats),
+        "cpu_perf_stats": {cpu: _encode_stats(stats) for cpu, stats in state.cpu_perf_stats.items()},
+        "functions": [[f.name, f.start, f.end, f.instruction_count, f.total_cycles] for f in state.functions],
+        "hot_lines": [_encode_hotspot(h) for h in state.hot_lines],
+        "hot_functions": [_encode_hotspot(h) for h in state.hot_functions],
+        "source_costs": [[src, c.instructions, c.cycles, c.asm_lines] for src, c in state.source_costs.items()],
+        "asm_diff": [asdict(f) for f in state.asm_diff.functions] if state.asm_diff is not None else None,
+        "compiler_output": state.compiler_output,
+        "user_flags": state.user_flags,
+        "diagnostics": [_encode_diagnostic(d) for d in state.diagnostics],
+        "last_update": state.last_update,
+    }
+
+
+def decode_state(data: dict) -> LocalBoltState:
+    cpu_perf = {cpu: _decode_stats(rows) for cpu, rows in data["cpu_perf_stats"].items()}
+    diff = data["asm_diff"]
+    return LocalBoltState(
+        source_path=data["source_path"],
+        source_code=data["source_code"],
+        source_lines=data["source_code"].splitlines(),
+        asm_content=data["asm_content"],
+        asm_mapping={idx: line for idx, line in data["asm_mapping"]},
+        source_locations=_decode_locations(data["source_locations"]),
+        perf_stats=_decode_stats(data["perf_stats"]),
+        target_cpus=list(cpu_perf),
+        cpu_perf_stats=cpu_perf,
+        functions=[FunctionInfo(*row) for row in data["functions"]],
+        hot_lines=[HotSpot(*row) for row in data["hot_lines"]],
+        hot_functions=[HotSpot(*row) for row in data["hot_functions"]],
+        source_costs={src: SourceCost(asm_lines, instructions, cycles)
+                      for src, instructions, cycles, asm_lines in data["source_costs"]},
+        asm_diff=ListingDiff([FunctionDiff(**f) for f in diff]) if diff is not None else None,
+        compiler_output=data["compiler_output"],
+        user_flags=data["user_flags"],
+        diagnostics=[_decode_diagnostic(row) for row in data["diagnostics"]],
+        last_update=data["last_update"],
+    )
+
+
+def decode_timings(data: Optional[dict]) -> Optional[RefreshTimings]:
+    if data is None:
+        return None
+    return RefreshTimings(source_path=data["source"], started_at=data["started_at"],
+                          stages=list(data["stages"].items()))
+
+
+def encode_comparison(result: FlagComparison) -> dict:
+    data = asdict(result)
+    for func in data["functions"]:
+        func["line_deltas"] = [[line, a, b] for line, (a, b) in func["line_deltas"].items()]
+    return data
+
+
+def decode_comparison(data: dict) -> FlagComparison:
+    functions = []
+    for func in data["functions"]:
+        fields = {key: value for key, value in func.items() if key != "line_deltas"}
+        deltas = {line: (a, b) for line, a, b in func["line_deltas"]}
+        functions.append(FunctionComparison(**fields, line_deltas=deltas))
+    return FlagComparison(
+        flags_a=data["flags_a"], flags_b=data["flags_b"], functions=functions,
+        errors_a=data["errors_a"], errors_b=data["errors_b"],
+    )
@@ -0,0 +1,159 @@
+"""
+Performance regression gate: compares per-function instruction counts and
+llvm-mca cycle estimates against a recorded baseline.
+
+    localbolt check 'src/hot/*.cpp' --baseline perf_baseline.json --update
+    localbolt check 'src/hot/*.cpp' --baseline perf_baseline.json --threshold 5
+
+The baseline is JSON with one function per line, keys sorted, so it
+diffs cleanly in code review:
+
+    {"version": 1, "functions": {
+    "src/hot/a.cpp::sq(int)": [3, 15],
+    ...
+    }}
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, TextIO, Tuple
+
+from .batch import FileReport, add_analysis_arguments, analyze_many, collect_sources
+
+BASELINE_VERSION = 1
+
+# "file::function" -> (instructions, cycles)
+Baseline = Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str  # "instructions" or "cycles"
+    before: int
+    after: int
+
+    @property
+    def percent(self) -> float:
+        if self.before == 0:
+            return float("inf")
+        return (self.after - self.before) * 100.0 / self.before
+
+
+def _portable_path(path: str) -> str:
+    """Paths under the working directory are stored relative so baselines move between checkouts."""
+    rel = os.path.relpath(path)
+    return path if rel.startswith("..") else rel
+
+
+def baseline_from_reports(reports: List[FileReport]) -> Baseline:
+    entries: Baseline = {}
+    for report in reports:
+        if not report.ok:
+            continue
+        file = _portable_path(report.file)
+        for func in report.functions:
+            entries[f"{file}::{func.name}"] = (func.instructions, func.cycles)
+    return entries
+
+
+def write_baseline(entries: Baseline, out: TextIO) -> None:
+    out.write(f'{{"version": {BASELINE_VERSION}, "functions": {{\n')
+    items = sorted(entries.items())
+    for i, (key, (instructions, cycles)) in enumerate(items):
+        sep = "," if i < len(items) - 1 else ""
+        out.write(f"{json.dumps(key)}: [{instructions}, {cycles}]{sep}\n")
+    out.write("}}\n")
+
+
+def load_baseline(path: str) -> Baseline:
+    """Raises ValueError if the file is not a baseline of this version (OSError if unreadable)."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Malformed baseline {path}: expected a JSON object")
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version: {data.get('version')}")
+    functions = data.get("functions", {})
+    if not isinstance(functions, dict):
+        raise ValueError(f"Malformed baseline {path}: 'functions' must be an object")
+    entries: Baseline = {}
+    for key, value in functions.items():
+        try:
+            instructions, cycles = value
+            entries[key] = (int(instructions), int(cycles))
+        except (TypeError, ValueError):
+            raise ValueError(f"Malformed baseline {path}: bad entry for {key!r}: {value!r}") from None
+    return entries
+
+
+def compare_to_baseline(baseline: Baseline, current: Baseline, threshold: float = 5.0) -> List[Regression]:
+    """
+    Returns every metric that grew by more than threshold percent.
+    Functions that are new or gone are not regressions (see new_and_missing).
+    """
+    limit = 1.0 + threshold / 100.0
+    regressions = []
+    for key, (instructions, cycles) in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for metric, old, new in (("instructions", before[0], instructions), ("cycles", before[1], cycles)):
+            if new > old * limit:
+                regressions.append(Regression(key, metric, old, new))
+    return regressions
+
+
+def new_and_missing(baseline: Baseline, current: Baseline) -> Tuple[List[str], List[str]]:
+    return sorted(current.keys() - baseline.keys()), sorted(baseline.keys() - current.keys())
+
+
+def build_check_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="localbolt check", description="Fail when functions regress against a baseline")
+    add_analysis_arguments(parser)
+    parser.add_argument("--baseline", required=True, metavar="PATH", help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Allowed growth in percent (default: 5)")
+    parser.add_argument("--update", action="store_true", help="Record the current results as the new baseline")
+    return parser
+
+
+def run_check(argv: List[str]) -> int:
+    parser = build_check_parser()
+    args = parser.parse_args(argv)
+
+    sources = collect_sources(args.sources, args.compile_commands)
+    if not sources:
+        print("Error: No supported source files matched.", file=sys.stderr)
+        return 1
+
+    reports = analyze_many(sources, args.flags.split(), jobs=args.jobs, compile_db=args.compile_commands)
+    failed = [r for r in reports if not r.ok]
+    for r in failed:
+        print(f"Failed: {r.file}", file=sys.stderr)
+    current = baseline_from_reports(reports)
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            write_baseline(current, f)
+        print(f"Recorded {len(current)} function(s) to {args.baseline}")
+        return 1 if failed else 0
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read baseline: {e}", file=sys.stderr)
+        return 1
+
+    regressions = compare_to_baseline(baseline, current, args.threshold)
+    added, missing = new_and_missing(baseline, current)
+    for reg in regressions:
+        pct = "new cost" if reg.before == 0 else f"+{reg.percent:.1f}%"
+        print(f"REGRESSION {reg.key}: {reg.metric} {reg.before} -> {reg.after} ({pct})")
+    for key in added:
+        print(f"new      {key}")
+    for key in missing:
+        print(f"missing  {key}")
+    print(f"{len(current)} function(s) checked, {len(regressions)} regression(s) over {args.threshold:g}%")
+    return 1 if regressions or failed else 0
@@ -0,0 +1,283 @@
+"""
+`localbolt serve`: a long-running daemon that owns the engines, compile
+cache, watchers and toolchains, so frontends connect to warm state
+instead of paying startup and a cold compile every time.
+
+    localbolt serve &
+    localbolt query src/hot.cpp --flags='-O3'
+    localbolt --connect src/hot.cpp
+
+Clients talk newline-delimited JSON over a Unix socket that only the
+current user can open (see protocol.py). Files stay open, watched and
+analyzed after their last client disconnects; saves to files nobody is
+viewing only mark them stale, so reopening one is instant unless it
+changed. Flags are per file and shared by every client viewing it.
+"""
+import argparse
+import os
+import socket
+import socketserver
+import sys
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from .batch import FileReport, summarize_state
+from .protocol import (
+    PROTOCOL_VERSION, decode, default_socket_path, encode, encode_comparison, encode_state,
+)
+from .utils.lang import is_supported
+from .utils.logger import get_logger
+from .utils.state import LocalBoltState
+from .workspace import Workspace
+
+
+class ServerWorkspace(Workspace):
+    """Workspace whose visible files are the ones some client has open."""
+
+    def __init__(self, max_workers: int = 0):
+        super().__init__([], max_workers=max_workers)
+        self.subscribers: Dict[str, Set["ClientConnection"]] = {}
+
+    def _is_visible(self, path: str) -> bool:
+        return bool(self.subscribers.get(path))
+
+    def _on_engine_update(self, path: str, state: LocalBoltState):
+        with self._lock:
+            connections = list(self.subscribers.get(path, ()))
+        self._publish(path, connections)
+
+    def _publish(self, path: str, connections: List["ClientConnection"]):
+        if not connections:
+            return
+        engine = self.engines[path]
+        timings = engine.last_timings.to_dict() if engine.last_timings is not None else None
+        data = encode({"event": "state", "file": path, "state": encode_state(engine.state), "timings": timings})
+        for connection in connections:
+            connection.send_raw(data)
+
+    def open(self, connection: "ClientConnection", source: str) -> str:
+        """Subscribe connection to source; it gets the current state now if that is up to date."""
+        path = self.add(source)
+        with self._lock:
+            self.subscribers.setdefault(path, set()).add(connection)
+            stale = path in self._stale
+        if stale:
+            self._submit(path)
+        else:
+            with self._refresh_locks[path]:
+                self._publish(path, [connection])
+        return path
+
+    def close(self, connection: "ClientConnection", path: Optional[str] = None):
+        """Unsubscribe connection from path (default: from every file)."""
+        with self._lock:
+            for watched, connections in self.subscribers.items():
+                if path is None or watched == path:
+                    connections.discard(connection)
+
+    def update(self, path: str, **settings):
+        """Change engine settings (user_flags, target_cpus) and re-analyze."""
+        for name, value in settings.items():
+            setattr(self.engines[path], name, value)
+        self._submit(path)
+
+    def report(self, path: str, flags: Optional[List[str]] = None) -> FileReport:
+        """
+        Per-function summary of path, analyzing it first if it is stale. Other
+        flags than the engine's are analyzed separately: the shared engine
+        (and every frontend showing it) keeps its own.
+        """
+        engine = self.engines[path]
+        if flags is not None and flags != engine.user_flags:
+            return summarize_state(FileReport(file=path, flags=list(flags)), engine.analyze_flags(flags))
+        with self._lock:
+            stale = path in self._stale
+        if stale:
+            self._submit(path).result()
+        with self._refresh_locks[path]:
+            return summarize_state(FileReport(file=path, flags=list(engine.state.user_flags)), engine.state)
+
+
+class ClientConnection(socketserver.StreamRequestHandler):
+    """One connected frontend: replies to its requests and receives pushed state events."""
+
+    def setup(self):
+        super().setup()
+        self._send_lock = threading.Lock()
+
+    def send(self, message: dict):
+        self.send_raw(encode(message))
+
+    def send_raw(self, data: bytes):
+        with self._send_lock:
+            try:
+                self.wfile.write(data)
+            except OSError:
+                pass  # client went away; finish() unsubscribes it
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = decode(line)
+            except ValueError:
+                self.send({"id": None, "ok": False, "error": "Malformed request"})
+                continue
+            self.send(self.server.dispatch(self, request))
+
+    def finish(self):
+        self.server.workspace.close(self)
+        super().finish()
+
+
+class BoltServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, max_workers: int = 0):
+        self.socket_path = socket_path
+        self.log = get_logger("server")
+        _claim_socket_path(socket_path)
+        # Created 0600: a chmod after bind() would leave it open to other users until then
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, ClientConnection)
+        finally:
+            os.umask(umask)
+        self.workspace = ServerWorkspace(max_workers=max_workers)
+        self.workspace.start()
+        self._ops: Dict[str, Callable[[ClientConnection, dict], dict]] = {
+            "ping": self._op_ping,
+            "open": self._op_open,
+            "close": self._op_close,
+            "refresh": self._op_refresh,
+            "set_flags": self._op_set_flags,
+            "set_target_cpus": self._op_set_target_cpus,
+            "compare": self._op_compare,
+            "query": self._op_query,
+            "shutdown": self._op_shutdown,
+        }
+
+    def dispatch(self, connection: ClientConnection, request: dict) -> dict:
+        reply = {"id": request.get("id")}
+        op = self._ops.get(request.get("op"))
+        if op is None:
+            return {**reply, "ok": False, "error": f"Unknown op: {request.get('op')}"}
+        try:
+            return {**reply, "ok": True, **op(connection, request)}
+        except Exception as e:
+            self.log.exception("Request %s failed", request.get("op"))
+            return {**reply, "ok": False, "error": str(e)}
+
+    def _source(self, request: dict) -> str:
+        path = request["file"]
+        if not os.path.isabs(path):
+            raise ValueError(f"Paths must be absolute (the daemon has its own working directory): {path}")
+        if not os.path.exists(path):
+            raise ValueError(f"File not found: {path}")
+        if not is_supported(path):
+            raise ValueError("Unsupported file type. Use .cpp, .cc, .c, .cxx, or .rs")
+        return path
+
+    def _open_path(self, request: dict) -> str:
+        """The resolved path of an already opened file (ops other than open/query)."""
+        path = str(Path(request["file"]).resolve())
+        if path not in self.workspace.engines:
+            raise ValueError(f"File is not open: {path}")
+        return path
+
+    def _op_ping(self, connection, request):
+        return {"version": PROTOCOL_VERSION, "files": list(self.workspace.paths)}
+
+    def _op_open(self, connection, request):
+        return {"file": self.workspace.open(connection, self._source(request))}
+
+    def _op_close(self, connection, request):
+        self.workspace.close(connection, self._open_path(request))
+        return {}
+
+    def _op_refresh(self, connection, request):
+        self.workspace.refresh(self._open_path(request))
+        return {}
+
+    def _op_set_flags(self, connection, request):
+        self.workspace.update(self._open_path(request), user_flags=list(request["flags"]))
+        return {}
+
+    def _op_set_target_cpus(self, connection, request):
+        self.workspace.update(self._open_path(request), target_cpus=list(request["cpus"]))
+        return {}
+
+    def _op_compare(self, connection, request):
+        engine = self.workspace.engines[self._open_path(request)]
+        return {"result": encode_comparison(engine.compare_flags(request["flags_a"], request["flags_b"]))}
+
+    def _op_query(self, connection, request):
+        path = self.workspace.add(self._source(request))
+        flags = request.get("flags")
+        return {"report": asdict(self.workspace.report(path, list(flags) if flags is not None else None))}
+
+    def _op_shutdown(self, connection, request):
+        # shutdown() waits for serve_forever to return, so it cannot run on a handler thread's behalf
+        threading.Thread(target=self.shutdown, daemon=True).start()
+        return {}
+
+    def server_close(self):
+        super().server_close()
+        self.workspace.stop()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def _claim_socket_path(socket_path: str):
+    """
+    Makes the socket's directory private to this user (0700), removes a
+    leftover socket from a dead daemon, and refuses if one is still listening.
+    """
+    directory = Path(socket_path).parent
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.stat()
+    if info.st_uid != os.getuid():
+        raise RuntimeError(f"Socket directory {directory} is not owned by the current user")
+    if info.st_mode & 0o077:
+        directory.chmod(0o700)
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A LocalBolt daemon is already listening on {socket_path}")
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="localbolt serve", description="Run the LocalBolt daemon for fast clients")
+    parser.add_argument("--socket", default=None, metavar="PATH", help="Unix socket path (default: $LOCALBOLT_SOCKET, else per user)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Concurrent analyses (default: min(4, CPUs))")
+    return parser
+
+
+def run_serve(argv: List[str]) -> int:
+    args = build_serve_parser().parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+    try:
+        server = BoltServer(socket_path, max_workers=args.jobs)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"LocalBolt daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
@@ -1,24 +1,43 @@
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, Static, TextArea
+from textual.widgets import Header, Footer, Static, TextArea, Tabs, Tab, Input
 from textual.containers import VerticalScroll, Horizontal, Vertical, Container
-from textual.scrollbar import ScrollBar
 from textual.binding import Binding
-from textual.events import Resize
 from textual.message import Message
 from rich.text import Text
-from rich.cells import cell_len
 from ..engine import BoltEngine
 from ..utils.state import LocalBoltState
-from ..utils.highlighter import build_gutter, highlight_asm_line, severity_styles, INSTRUCTIONS
+from ..utils.highlighter import build_gutter, highlight_asm_line, severity_styles
+from ..parsing.perf_parser import line_cycle_counts
+from ..parsing.functions import line_anchors
+from ..parsing.asm_diff import line_matches
+from ..parsing.listing_filter import ListingFilter, visible_lines
 from .source_peek import SourcePeekPanel
 from .instruction_help import InstructionHelpPanel
-from .flags_palette import FlagsPopup
+from .flags_palette import FlagsPopup, CpuTargetsPopup
+from .compare_view import FlagComparePopup, ComparisonPanel
+from .symbol_picker import SymbolPicker
+from .hotspot_view import HotSpotPanel
+from .source_costs import SourceCostPane
+from .filter_palette import FilterPopup
+from .listing_view import FilteredListing
 from pathlib import Path
+from array import array
+import bisect
+import itertools
+import os
 import sys
+import time
 
 _ERR_FILE = Path(__file__).resolve().parent / "err.txt"
 # Minimum cells between right edge of gutter numbers and the scrollbar (keeps gap when window is narrow)
 _GUTTER_RIGHT_MARGIN = 8
+# Huge template errors would stall the error TextArea; the rest of the output is summarised
+_MAX_ERROR_VIEW_LINES = 2000
+# Diagnostics listed above a stale listing, and the longest inline message
+_MAX_DIAGNOSTIC_BAR_LINES = 3
+_MAX_INLINE_MESSAGE = 80
+# Past this many changed lines a refresh rebuilds the listing rather than diffing it for reusable widgets
+_MAX_RECONCILE_EDITS = 500
 
 # User Palette
 C_BG = "#EBEEEE"
@@ -34,6 +53,39 @@ def _severity_class(cycles: int | None) -> str:
     if cycles <= 4: return "sev-med"
     return "sev-high"
 
+_SEVERITY_CLASSES = ("sev-low", "sev-med", "sev-high")
+# Row backgrounds per severity class; the filtered listing paints them itself
+_SEVERITY_BACKGROUNDS = {"sev-low": "#d1e7dd", "sev-med": "#fff3cd", "sev-high": "#f8d7da"}
+
+def _cpu_column_width(cpu: str) -> int:
+    return max(len(cpu), 4) + 2
+
+class GutterRow:
+    """
+    A listing row: the line text, then the cycle gutter right-aligned at
+    paint time. The padding depends only on the width the row is painted
+    at, so a resize reflows the rows without rebuilding them.
+    """
+
+    def __init__(self, text: Text, gutter: Text | None = None):
+        text.expand_tabs(8)
+        self.text = text
+        self.gutter = gutter
+
+    @property
+    def plain(self) -> str:
+        return self.text.plain if self.gutter is None else f"{self.text.plain} {self.gutter.plain}"
+
+    def __rich_console__(self, console, options):
+        if self.gutter is None:
+            yield self.text
+            return
+        padding = max(1, options.max_width - self.text.cell_len - self.gutter.cell_len - _GUTTER_RIGHT_MARGIN)
+        row = self.text.copy()
+        row.append(" " * padding)
+        row.append_text(self.gutter)
+        yield row
+
 class AsmLine(Static): pass
 class AsmScroll(VerticalScroll): BINDINGS = []
 
@@ -58,9 +110,10 @@ class LocalBoltApp(App):
         layer: base;
     }}
 
+    #listing-row {{ height: 1fr; }}
     #asm-container-outer {{ 
         height: 1fr; 
-        width: 100%; 
+        width: 1fr; 
         border: solid {C_ACCENT2};
         background: {C_BG};
         margin: 1 1;
@@ -73,13 +126,19 @@ class LocalBoltApp(App):
         padding: 0 2;
     }}
     #asm-column-header.perf-hidden {{ display: none; }}
-    #asm-container {{ height: 1fr; width: 1fr; }}
+    #asm-views {{ height: 1fr; width: 1fr; layers: full filtered; }}
+    #asm-container {{ height: 1fr; width: 1fr; layer: full; }}
+    #asm-container-outer.stale {{ border: solid #a80000; }}
+    #asm-container-outer.stale AsmLine {{ text-opacity: 70%; }}
     
     #error-view {{ color: #a80000; display: none; margin: 1 2; }}
+    #diagnostics-bar {{ color: #a80000; padding: 0 2; display: none; }}
+    #perf-hud {{ height: 1; padding: 0 2; color: {C_TEXT}; background: {C_ACCENT2}; display: none; }}
+    #file-tabs {{ color: {C_TEXT}; }}
     
     SourcePeekPanel {{ layer: popups; }}
     InstructionHelpPanel {{ layer: popups; }}
-    FlagsPopup {{ 
+    FlagsPopup, CpuTargetsPopup, FlagComparePopup {{ 
         display: none;
         layer: popups;
         margin: 1 1;
@@ -87,9 +146,9 @@ class LocalBoltApp(App):
     }}
     
     AsmLine {{ width: 100%; height: 1; }}
-    AsmLine.sev-low  {{ background: #d1e7dd; }}
-    AsmLine.sev-med  {{ background: #fff3cd; }}
-    AsmLine.sev-high {{ background: #f8d7da; }}
+    AsmLine.sev-low  {{ background: {_SEVERITY_BACKGROUNDS["sev-low"]}; }}
+    AsmLine.sev-med  {{ background: {_SEVERITY_BACKGROUNDS["sev-med"]}; }}
+    AsmLine.sev-high {{ background: {_SEVERITY_BACKGROUNDS["sev-high"]}; }}
     AsmLine.cursor   {{ background: {C_ACCENT2}; }}
     
     Footer {{ background: {C_TEXT}; color: {C_ACCENT1}; }}
@@ -100,6 +159,17 @@ class LocalBoltApp(App):
         Binding("r", "refresh", "Recompile", show=True),
         Binding("o", "toggle_flags", "Flags", show=True),
         Binding("f", "toggle_performance", "Perf", show=True),
+        Binding("c", "toggle_cpus", "CPUs", show=True),
+        Binding("x", "compare_flags", "Compare", show=True),
+        Binding("s", "pick_symbol", "Symbols", show=True),
+        Binding("h", "show_hotspots", "Hot spots", show=True),
+        Binding("v", "toggle_source_costs", "Source", show=True),
+        Binding("slash", "filter_listing", "Filter", show=True),
+        Binding("d", "toggle_diff", "Diff", show=True),
+        Binding("t", "toggle_hud", "Timings", show=True),
+        Binding("e", "toggle_errors", "Errors", show=True),
+        Binding("]", "next_file", "Next file", show=False),
+        Binding("[", "previous_file", "Previous file", show=False),
         Binding("up", "cursor_up", "Up", show=False, priority=True),
         Binding("down", "cursor_down", "Down", show=False, priority=True),
         Binding("k", "cursor_up", show=False, priority=True),
@@ -111,51 +181,84 @@ class LocalBoltApp(App):
             super().__init__()
             self.state = state
 
-    def __init__(self, source_file: str):
+    def __init__(self, source_file: str, workspace=None, engine=None):
         super().__init__()
-        self.engine = BoltEngine(source_file)
-        self.engine.on_update_callback = lambda state: self.post_message(self.StateUpdated(state))
+        # Workspace mode: one tab per file; self.engine is the active file's engine.
+        # engine: a BoltEngine stand-in such as the daemon-backed RemoteEngine.
+        self.workspace = workspace
+        if workspace is not None:
+            self.engine = workspace.engines[workspace.active]
+            workspace.on_update_callback = lambda state: self.post_message(self.StateUpdated(state))
+        else:
+            self.engine = engine if engine is not None else BoltEngine(source_file)
+            self.engine.on_update_callback = lambda state: self.post_message(self.StateUpdated(state))
         self._cursor = 0
         self._asm_lines: list[str] = []
         self._cycle_counts: dict[int, int] = {}
+        self._cpu_cycles: dict[str, dict[int, int]] = {}  # cpu -> asm line number -> cycles
         self._asm_mapping: dict[int, int] = {}  # asm_line_idx -> source_line_number
         self._sibling_lines: set[int] = set()   # asm indices sharing the same C++ line as cursor
         self._show_performance = True  # toggle with "f" to show/hide cycle column
+        self._show_diff = True  # toggle with "d" to mark changes since the previous save
+        self._diff_added: set[int] = set()       # asm indices added since the previous save
+        self._diff_labels: dict[int, object] = {}  # label line idx -> FunctionDiff
+        # On a failed compile the last good listing stays up, marked stale, with the diagnostics
+        # overlaid; when the fix compiles to the same listing, only the marked lines re-render
+        self._stale = False
+        self._show_error_output = False  # toggle with "e" to see the full compiler output instead
+        self._diag_marks: dict[int, str] = {}    # asm idx -> severity of a diagnostic on its source line
+        self._diag_notes: dict[int, object] = {}  # first asm idx of each marked source line -> Diagnostic
+        # Refreshes keep the widgets of unchanged lines and re-render only lines whose content or
+        # decoration changed; the cursor follows its anchor (function, source line, ordinal)
+        self._line_widgets: list[AsmLine] = []
+        self._line_keys: list[tuple] = []       # what each widget was last rendered from
+        self._shown_lines: list[str] = []       # the asm lines the widgets were built for
+        self._anchors: list[tuple[str, int, int]] = []
+        self._listing_source: list[str] = []    # source lines the shown listing was compiled from
+        self._functions: list = []  # FunctionInfo per label of the shown listing (jump-to-symbol)
+        self._hotspots: tuple[list, list] = ([], [])  # (hot functions, hot source lines) of the shown listing
+        self._source_costs: dict = {}  # source line -> SourceCost: its asm lines (reverse index) and their cost
+        # "/" filters the shown listing without recompiling: the kept lines are drawn by a virtualized
+        # FilteredListing in place of the line widgets, which stay mounted (and updated) underneath
+        self._filter = ListingFilter()
+        self._visible: bytearray | None = None  # per asm line, 1 if the filter shows it; None = no filter
 
     def compose(self) -> ComposeResult:
         yield Header()
+        if self.workspace is not None and len(self.workspace.paths) > 1:
+            yield Tabs(*[Tab(Path(p).name, id=f"file-tab-{i}") for i, p in enumerate(self.workspace.paths)], id="file-tabs")
         with Vertical(id="main-layout"):
             yield TextArea(id="error-view", read_only=True)
-            with Vertical(id="asm-container-outer"):
-                yield Static("Performance (⏰ Cycles)", id="asm-column-header")
-                yield AsmScroll(id="asm-container")
+            yield Static(id="diagnostics-bar")
+            with Horizontal(id="listing-row"):
+                with Vertical(id="asm-container-outer"):
+                    yield Static("Performance (⏰ Cycles)", id="asm-column-header")
+                    with Container(id="asm-views"):
+                        yield AsmScroll(id="asm-container")
+                        yield FilteredListing(self._render_line, self._row_background, id="asm-filtered")
+                yield SourceCostPane(id="source-costs")
+            yield Static(id="perf-hud")
         # Dual Floating Popups
         yield SourcePeekPanel(id="source-peek")
         yield InstructionHelpPanel(id="instr-help")
         yield FlagsPopup(id="flags-palette")
+        yield CpuTargetsPopup(id="cpus-palette")
+        yield FlagComparePopup(id="compare-palette")
+        yield SymbolPicker(id="symbol-palette")
+        yield HotSpotPanel(id="hotspot-panel")
+        yield FilterPopup(id="filter-palette")
+        yield ComparisonPanel(id="compare-panel")
         yield Footer()
 
     def on_mount(self) -> None:
-        self.engine.start()
+        (self.workspace or self.engine).start()
 
-    def on_resize(self, _event: Resize) -> None:
-        if self._asm_lines:
-            self._populate_asm_lines()
-    
-    def _render_line(self, idx: int) -> Text:
-        if idx >= len(self._asm_lines): return Text("")
+    def _render_line(self, idx: int) -> GutterRow:
+        if idx >= len(self._asm_lines): return GutterRow(Text(""))
         line = self._asm_lines[idx]
         line_num = idx + 1
         cycles = self._cycle_counts.get(line_num)
         fg, _ = severity_styles(cycles)
-        try:
-            scroll = self.query_one("#asm-container", AsmScroll)
-            width = scroll.size.width
-            scrollbar = scroll.query_one(ScrollBar)
-            offset = scrollbar.size.width + _GUTTER_RIGHT_MARGIN
-        except Exception:
-            width = self.size.width
-            offset = 1 + _GUTTER_RIGHT_MARGIN
         row = Text()
         # Gutter indicator: cursor ▶, sibling │, or blank (measure in cells for alignment)
         gutter_prefix = "▶ " if idx == self._cursor else ("│ " if idx in self._sibling_lines else "  ")
@@ -163,74 +266,268 @@ class LocalBoltApp(App):
             row.append(gutter_prefix, style=f"bold {C_ACCENT4}")
         elif idx in self._sibling_lines:
             row.append(gutter_prefix, style=f"bold {C_ACCENT1}")
+        elif idx in self._diag_marks:
+            row.append("✗ ", style=_diagnostic_style(self._diag_marks[idx]))
+        elif self._show_diff and idx in self._diff_added:
+            row.append("+ ", style=f"bold {C_ACCENT3}")
         else:
             row.append(gutter_prefix)
         
         rendered_line = highlight_asm_line(line, "")
         row.append_text(rendered_line)
+        if self._show_diff and idx in self._diff_labels:
+            row.append_text(self._render_diff_summary(self._diff_labels[idx]))
+        if idx in self._diag_notes:
+            note = self._diag_notes[idx]
+            message = note.message if len(note.message) <= _MAX_INLINE_MESSAGE else note.message[:_MAX_INLINE_MESSAGE - 1] + "…"
+            row.append(f"   {note.severity}: {message}", style=_diagnostic_style(note.severity))
         if not self._show_performance:
-            return row
-        gutter_text = f"{cycles}" if cycles is not None else ""
-        left_plain = row.plain.expandtabs(8)
-        used_cells = cell_len(left_plain) + cell_len(gutter_text)
-        padding = max(1, width - used_cells - offset)
-        row.append(" " * padding)
-        row.append(gutter_text, style=fg)
-        return row
+            return GutterRow(row)
+        gutter = self._render_cpu_gutter(line_num) if self._cpu_cycles else Text(f"{cycles}" if cycles is not None else "", style=fg)
+        return GutterRow(row, gutter)
+
+    def _line_key(self, idx: int) -> tuple:
+        """Everything a line's rendering and classes depend on; equal keys need no re-render."""
+        line_num = idx + 1
+        note = self._diag_notes.get(idx)
+        return (
+            self._asm_lines[idx], self._cycle_counts.get(line_num),
+            tuple((cpu, cycles.get(line_num)) for cpu, cycles in self._cpu_cycles.items()),
+            idx == self._cursor, idx in self._sibling_lines, self._diag_marks.get(idx),
+            (note.severity, note.message) if note is not None else None,
+            self._show_diff and idx in self._diff_added, self._diff_labels.get(idx) if self._show_diff else None,
+            self._show_performance,
+        )
+
+    def _render_diff_summary(self, diff) -> Text:
+        """Inline note after a function label: instructions added/removed and cycle change."""
+        note = Text("   ")
+        if diff.status == "added":
+            note.append("new", style=f"bold {C_ACCENT3}")
+            return note
+        if diff.status == "replaced":
+            note.append("rewritten ", style=f"bold {C_ACCENT4}")
+        if diff.added_lines or diff.removed_lines:
+            note.append(f"+{len(diff.added_lines)}", style=f"bold {C_ACCENT3}")
+            note.append(f" -{len(diff.removed_lines)}", style=f"bold {C_ACCENT4}")
+        if diff.cycles_before != diff.cycles_after:
+            style = f"bold {C_ACCENT4}" if diff.cycles_after > diff.cycles_before else f"bold {C_ACCENT3}"
+            note.append(f"  {diff.cycles_before}→{diff.cycles_after} cycles", style=style)
+        return note
+
+    def _render_cpu_gutter(self, line_num: int) -> Text:
+        """One cycle column per target CPU; values that differ from the first CPU are highlighted."""
+        gutter = Text()
+        reference = None
+        for col, cpu in enumerate(self._cpu_cycles):
+            cycles = self._cpu_cycles[cpu].get(line_num)
+            if col == 0:
+                reference = cycles
+            style = C_TEXT
+            if col > 0 and cycles is not None and reference is not None and cycles != reference:
+                style = f"bold {C_ACCENT4}" if cycles > reference else f"bold {C_ACCENT3}"
+            gutter.append(f"{'' if cycles is None else cycles:>{_cpu_column_width(cpu)}}", style=style)
+        return gutter
+
+    def _line_cycles(self, perf_stats: dict) -> dict[int, int]:
+        """Map llvm-mca instruction indices onto 1-based asm line numbers."""
+        return line_cycle_counts(self._asm_lines, perf_stats)
 
     def _populate_asm_lines(self) -> None:
+        """
+        Brings the mounted lines up to date with _asm_lines. Lines the diff
+        against the shown listing matches keep their widget (re-rendered only
+        if their key changed); the rest are removed or mounted in place.
+        """
         scroll = self.query_one("#asm-container", AsmScroll)
-        scroll.query(AsmLine).remove()
-        self._generation = getattr(self, "_generation", 0) + 1
-        widgets = []
-        for i in range(len(self._asm_lines)):
-            widget = AsmLine(self._render_line(i), id=f"asm-line-{self._generation}-{i}")
-            sev = _severity_class(self._cycle_counts.get(i + 1))
-            if sev: widget.add_class(sev)
-            if i == self._cursor: widget.add_class("cursor")
+        self._cursor = min(self._cursor, max(len(self._asm_lines) - 1, 0))
+        matches = line_matches(self._shown_lines, self._asm_lines, max_edits=_MAX_RECONCILE_EDITS) or []
+        kept = {j: i for i, j in matches}
+        kept_old = set(kept.values())
+        removed = [w for i, w in enumerate(self._line_widgets) if i not in kept_old]
+        if removed: scroll.remove_children(removed)
+
+        widgets: list[AsmLine] = []
+        keys: list[tuple] = []
+        pending: list[AsmLine] = []  # new widgets waiting to be mounted before the next kept one
+        for j in range(len(self._asm_lines)):
+            key = self._line_key(j)
+            if j in kept:
+                i = kept[j]
+                widget = self._line_widgets[i]
+                if pending:
+                    scroll.mount(*pending, before=widget)
+                    pending = []
+                if key != self._line_keys[i]:
+                    self._apply_line(widget, j)
+            else:
+                widget = AsmLine(self._render_line(j))
+                self._apply_classes(widget, j)
+                pending.append(widget)
             widgets.append(widget)
-        if widgets: scroll.mount(*widgets)
+            keys.append(key)
+        if pending: scroll.mount(*pending)
+        self._line_widgets, self._line_keys, self._shown_lines = widgets, keys, self._asm_lines
+
+    def _apply_line(self, widget: AsmLine, idx: int) -> None:
+        # Lines are one row at full width, so new content never changes the layout
+        self._apply_classes(widget, idx)
+        widget.update(self._render_line(idx), layout=False)
+
+    def _apply_classes(self, widget: AsmLine, idx: int) -> None:
+        sev = _severity_class(self._cycle_counts.get(idx + 1))
+        for name in _SEVERITY_CLASSES:
+            widget.set_class(name == sev, name)
+        widget.set_class(idx == self._cursor, "cursor")
 
     def _compute_siblings(self) -> set[int]:
         """Find all asm line indices that map to the same C++ source line as the cursor."""
-        cursor_src = self._asm_mapping.get(self._cursor)
-        if cursor_src is None:
+        cost = self._source_costs.get(self._asm_mapping.get(self._cursor))
+        if cost is None:
             return set()
-        return {
-            idx for idx, src in self._asm_mapping.items()
-            if src == cursor_src and idx != self._cursor
-        }
+        return set(cost.asm_lines) - {self._cursor}
 
     def _move_cursor(self, new: int) -> None:
         if new < 0 or new >= len(self._asm_lines): return
         old, self._cursor = self._cursor, new
-        gen = getattr(self, "_generation", 0)
 
         # Collect lines that need re-rendering: old siblings, old cursor, new siblings, new cursor
         old_siblings = self._sibling_lines
         self._sibling_lines = self._compute_siblings()
         dirty = {old} | old_siblings | {new} | self._sibling_lines
 
-        for idx in dirty:
-            try:
-                w = self.query_one(f"#asm-line-{gen}-{idx}", AsmLine)
-                if idx == new:
-                    w.add_class("cursor")
-                else:
-                    w.remove_class("cursor")
-                w.update(self._render_line(idx))
-                if idx == new:
-                    w.scroll_visible()
-            except Exception:
-                pass
+        self._rerender_lines(dirty)
+        if self._visible is not None:
+            self.query_one("#asm-filtered", FilteredListing).scroll_to_line(new)
+        elif new < len(self._line_widgets):
+            self._line_widgets[new].scroll_visible()
 
         self._sync_peek()
 
-    def action_cursor_up(self) -> None: self._move_cursor(self._cursor - 1)
-    def action_cursor_down(self) -> None: self._move_cursor(self._cursor + 1)
+    def _rerender_lines(self, indices) -> None:
+        """Updates the given mounted lines in place if their key changed (cursor class and content)."""
+        # After a tab switch _asm_lines is empty until the next populate
+        count = min(len(self._line_widgets), len(self._asm_lines))
+        for idx in indices:
+            if not 0 <= idx < count:
+                continue
+            key = self._line_key(idx)
+            if key != self._line_keys[idx]:
+                self._line_keys[idx] = key
+                self._apply_line(self._line_widgets[idx], idx)
+        if self._visible is not None:
+            self.query_one("#asm-filtered", FilteredListing).refresh()
+
+    def check_action(self, action: str, parameters: tuple) -> bool | None:
+        # While a shown palette's input or the hot-spot list has focus, j/k and the arrows belong to it
+        # (closing a popup only hides it, so focus can linger on a hidden widget)
+        focused = self.focused
+        if action in ("cursor_up", "cursor_down") and isinstance(focused, (Input, HotSpotPanel)):
+            return not all(node.display for node in focused.ancestors_with_self if node is not self)
+        return True
+
+    def action_cursor_up(self) -> None: self._move_cursor(self._next_visible(self._cursor, -1))
+    def action_cursor_down(self) -> None: self._move_cursor(self._next_visible(self._cursor, 1))
+
+    def _is_visible(self, idx: int) -> bool:
+        return self._visible is None or bool(self._visible[idx])
+
+    def _row_of(self, idx: int) -> int:
+        """The scroll row of asm line idx in whichever listing view is shown."""
+        return idx if self._visible is None else self.query_one("#asm-filtered", FilteredListing).row_of(idx)
+
+    def _listing_scroll(self) -> AsmScroll | FilteredListing:
+        return self.query_one("#asm-filtered" if self._visible is not None else "#asm-container")
+
+    def _row_background(self, idx: int) -> str | None:
+        if idx == self._cursor:
+            return C_ACCENT2
+        return _SEVERITY_BACKGROUNDS.get(_severity_class(self._cycle_counts.get(idx + 1)))
+
+    def _next_visible(self, idx: int, step: int) -> int:
+        """The next line the filter shows from idx in direction step; out of range if there is none."""
+        idx += step
+        while 0 <= idx < len(self._asm_lines) and not self._is_visible(idx):
+            idx += step
+        return idx
+
+    def _nearest_visible(self, idx: int) -> int:
+        if idx >= len(self._asm_lines) or self._is_visible(idx):
+            return idx
+        after = self._next_visible(idx, 1)
+        if after < len(self._asm_lines):
+            return after
+        before = self._next_visible(idx, -1)
+        return before if before >= 0 else idx
+
+    def action_filter_listing(self) -> None:
+        self.query_one("#filter-palette", FilterPopup).show(self._filter.describe())
+
+    def on_filter_popup_filter_changed(self, message: FilterPopup.FilterChanged) -> None:
+        self._set_filter(message.listing_filter)
+
+    def _set_filter(self, listing_filter: ListingFilter) -> None:
+        self._filter = listing_filter
+        self._visible = self._compute_visible()
+        self._apply_visibility()
+        # The view that was not shown did not follow the cursor
+        if self._visible is not None:
+            self.call_after_refresh(self.query_one("#asm-filtered", FilteredListing).scroll_to_line, self._cursor)
+        elif self._cursor < len(self._line_widgets):
+            self.call_after_refresh(self._line_widgets[self._cursor].scroll_visible, animate=False)
+
+    def _compute_visible(self) -> bytearray | None:
+        if not self._filter.active:
+            return None
+        return visible_lines(self._asm_lines, self._functions, self._asm_mapping, self._cycle_counts, self._filter)
+
+    def _apply_visibility(self) -> None:
+        """Swaps between the full and the filtered listing view and keeps the cursor on a shown line."""
+        outer = self.query_one("#asm-container-outer")
+        if self._visible is None:
+            outer.border_title = None
+        else:
+            rows = array("l", itertools.compress(range(len(self._visible)), self._visible))
+            self.query_one("#asm-filtered", FilteredListing).show_rows(rows)
+            outer.border_title = f"filter: {self._filter.describe()} ({len(rows)} of {len(self._asm_lines)} lines)"
+        self._update_error_display()
+        nearest = self._nearest_visible(self._cursor)
+        if nearest != self._cursor:
+            self._move_cursor(nearest)
 
     def action_refresh(self) -> None:
-        self.engine.refresh()
+        self._refresh_engine()
+
+    def _refresh_engine(self) -> None:
+        """
+        Recompiles the active file off the UI thread: through the workspace's
+        refresh pool (which never runs two refreshes of a file at once), else
+        in a worker thread.
+        """
+        if self.workspace is not None:
+            self.workspace.refresh()
+        else:
+            self.run_worker(self.engine.refresh, thread=True, group="refresh")
+
+    def on_tabs_tab_activated(self, event: Tabs.TabActivated) -> None:
+        if self.workspace is None or event.tab is None:
+            return
+        path = self.workspace.paths[int(event.tab.id.rsplit("-", 1)[1])]
+        if self.workspace.engines[path] is self.engine:
+            return
+        self.engine = self.workspace.engines[path]
+        self._cursor = 0
+        self._asm_lines = []  # another file's listing must not be shown as this one's stale listing
+        self._anchors = []    # nor its cursor anchor followed
+        self.workspace.activate(path)
+
+    def action_next_file(self) -> None:
+        if self.workspace is not None and len(self.workspace.paths) > 1:
+            self.query_one("#file-tabs", Tabs).action_next_tab()
+
+    def action_previous_file(self) -> None:
+        if self.workspace is not None and len(self.workspace.paths) > 1:
+            self.query_one("#file-tabs", Tabs).action_previous_tab()
 
     def action_toggle_flags(self) -> None:
         current = " ".join(self.engine.user_flags)
@@ -241,38 +538,273 @@ class LocalBoltApp(App):
         self.query_one("#asm-column-header").set_class(not self._show_performance, "perf-hidden")
         self._populate_asm_lines()
 
+    def _apply_diff(self, diff) -> None:
+        self._diff_added = diff.added_lines if diff else set()
+        self._diff_labels = {
+            f.label_line: f for f in (diff.changed if diff else []) if f.label_line is not None
+        }
+
+    def action_toggle_diff(self) -> None:
+        self._show_diff = not self._show_diff
+        self._populate_asm_lines()
+
+    def action_toggle_cpus(self) -> None:
+        current = " ".join(self.engine.target_cpus)
+        self.query_one("#cpus-palette", CpuTargetsPopup).show(current)
+
+    def on_cpu_targets_popup_targets_changed(self, message: CpuTargetsPopup.TargetsChanged) -> None:
+        if self.workspace is not None:
+            self.engine.target_cpus = message.cpus
+            self._refresh_engine()
+        else:
+            # set_target_cpus, not the attribute: a RemoteEngine has to tell the daemon
+            engine, cpus = self.engine, message.cpus
+            self.run_worker(lambda: engine.set_target_cpus(cpus), thread=True, group="refresh")
+
+    def action_compare_flags(self) -> None:
+        current = " ".join(self.engine.user_flags)
+        self.query_one("#compare-palette", FlagComparePopup).show(current)
+
+    def action_pick_symbol(self) -> None:
+        self.query_one("#symbol-palette", SymbolPicker).show(self._functions)
+
+    def on_symbol_picker_symbol_chosen(self, message: SymbolPicker.SymbolChosen) -> None:
+        # The outline gives the label's index directly: no walking the listing
+        self._jump_to(message.function.start)
+
+    def action_show_hotspots(self) -> None:
+        hot_functions, hot_lines = self._hotspots
+        self.query_one("#hotspot-panel", HotSpotPanel).show(hot_functions, hot_lines, self._listing_source)
+
+    def action_toggle_source_costs(self) -> None:
+        pane = self.query_one("#source-costs", SourceCostPane)
+        pane.display = not pane.display
+        if pane.display:
+            self.call_after_refresh(pane.center_current)
+
+    def on_hot_spot_panel_hot_spot_chosen(self, message: HotSpotPanel.HotSpotChosen) -> None:
+        self._jump_to(message.spot.asm_line)
+
+    def _jump_to(self, idx: int) -> None:
+        """Moves the cursor to listing line idx and scrolls it to the top; a filter hiding it is cleared."""
+        if idx < len(self._line_widgets):
+            if not self._is_visible(idx):
+                self._set_filter(ListingFilter())
+            self._move_cursor(idx)
+            self._listing_scroll().scroll_to(y=self._row_of(idx), animate=False)
+
+    def on_flag_compare_popup_compare_requested(self, message: FlagComparePopup.CompareRequested) -> None:
+        self.query_one("#compare-panel", ComparisonPanel).show_pending(message.flags_a, message.flags_b)
+        flags_a, flags_b = message.flags_a, message.flags_b
+        self.run_worker(lambda: self._run_comparison(flags_a, flags_b), thread=True, group="compare", exclusive=True)
+
+    def _run_comparison(self, flags_a: list[str], flags_b: list[str]) -> None:
+        result = self.engine.compare_flags(flags_a, flags_b)
+        self.call_from_thread(self.query_one("#compare-panel", ComparisonPanel).show_comparison, result)
+
+    def _update_column_header(self) -> None:
+        header = self.query_one("#asm-column-header", Static)
+        if self._cpu_cycles:
+            header.update("Cycles " + "".join(f"{cpu:>{_cpu_column_width(cpu)}}" for cpu in self._cpu_cycles))
+        else:
+            header.update("Performance (⏰ Cycles)")
+
     def on_flags_popup_flags_changed(self, message: FlagsPopup.FlagsChanged) -> None:
-        new_flags = message.flags.split()
-        self.engine.set_flags(new_flags)
+        if self.workspace is not None:
+            self.engine.user_flags = message.flags.split()
+            self._refresh_engine()
+        else:
+            # set_flags, not the attribute: a RemoteEngine has to tell the daemon
+            engine, flags = self.engine, message.flags.split()
+            self.run_worker(lambda: engine.set_flags(flags), thread=True, group="refresh")
 
     def on_local_bolt_app_state_updated(self, message: StateUpdated) -> None:
+        ui_start = time.perf_counter()
         state = message.state
-        error_view, scroll = self.query_one("#error-view", TextArea), self.query_one("#asm-container", AsmScroll)
+        if state is not self.engine.state:
+            return  # a file that is no longer the active tab
+        error_view = self.query_one("#error-view", TextArea)
         if state.has_errors:
-            scroll.display, error_view.display = False, True
-            error_view.text = state.compiler_output
+            error_view.text = _error_view_text(state.compiler_output)
+        if state.has_errors and not self._asm_lines:
+            # Nothing has compiled yet: the compiler output is all there is to show
+            self._stale = False
+            self._show_error_output = True
+        elif state.has_errors:
+            # Keep the last good listing and its stats; only the lines that gain or lose a mark change
+            self._stale = True
+            self._update_diagnostics(state)
         else:
-            scroll.display, error_view.display = True, False
-            self._asm_lines = state.asm_content.splitlines()
-            self._cycle_counts = {}
-            instr_idx = 0
-            for line_idx, line in enumerate(self._asm_lines):
-                stripped = line.strip()
-                if stripped and not stripped.endswith(":") and INSTRUCTIONS.search(stripped):
-                    if instr_idx in state.perf_stats:
-                        self._cycle_counts[line_idx + 1] = state.perf_stats[instr_idx].latency
-                    instr_idx += 1
-            self._populate_asm_lines()
+            self._stale = self._show_error_output = False
+            error_view.text = ""
+            self._show_listing(state)
+        self._update_error_display()
         
+        self.query_one("#source-peek", SourcePeekPanel).update_context(
+            state.source_lines, state.asm_mapping, state.source_path, state.source_costs, state.source_locations
+        )
+        self._sync_peek()
+        # Measured up to the first screen refresh after the new lines are mounted
+        self.call_after_refresh(self._finish_ui_timing, ui_start)
+
+    def _show_listing(self, state: LocalBoltState) -> None:
+        asm_lines = state.asm_content.splitlines()
+        previous = (self._asm_lines, self._cycle_counts, self._cpu_cycles, self._diff_added, self._diff_labels)
+        anchor = self._anchors[self._cursor] if self._cursor < len(self._anchors) else None
+        old_source, old_siblings = self._listing_source, self._sibling_lines
+        self._asm_lines = asm_lines
+        self._cycle_counts = self._line_cycles(state.perf_stats)
+        self._cpu_cycles = {cpu: self._line_cycles(stats) for cpu, stats in state.cpu_perf_stats.items()}
+        self._update_column_header()
+        self._apply_diff(state.asm_diff)
         self._asm_mapping = state.asm_mapping
+        self._anchors = line_anchors(asm_lines, state.asm_mapping)
+        self._listing_source = state.source_lines
+        self._functions = state.functions
+        self._hotspots = (state.hot_functions, state.hot_lines)
+        self._source_costs = state.source_costs
+        self.query_one("#source-costs", SourceCostPane).update_costs(state.source_lines, state.source_costs)
+        if previous[:3] != (self._asm_lines, self._cycle_counts, self._cpu_cycles):
+            scroll = self._listing_scroll()
+            screen_row = self._row_of(self._cursor) - round(scroll.scroll_y)
+            if anchor is not None:
+                self._cursor = self._find_anchor(anchor, old_source, state.source_lines)
+            self._visible = self._compute_visible()
+            self._cursor = self._nearest_visible(self._cursor)
+            self._sibling_lines = self._compute_siblings()
+            self._diag_marks, self._diag_notes = self._diagnostic_marks(state)
+            self._populate_asm_lines()
+            self._apply_visibility()
+            scroll = self._listing_scroll()
+            if anchor is not None and 0 <= screen_row < scroll.size.height:
+                # Keep the cursor's instruction on the same screen row once the new lines are laid out
+                self.call_after_refresh(scroll.scroll_to, y=max(self._row_of(self._cursor) - screen_row, 0), animate=False)
+            return
+        # Same listing as on screen (typically a fixed typo): re-render only what is decorated differently
+        old_diff_added, old_diff_labels = previous[3:]
+        dirty = set(self._diag_marks) | old_diff_added | set(old_diff_labels) | old_siblings
         self._sibling_lines = self._compute_siblings()
-        self.query_one("#source-peek", SourcePeekPanel).update_context(state.source_lines, state.asm_mapping, state.source_path)
-        self._sync_peek()
+        self._update_diagnostics(state)
+        self._rerender_lines(dirty | self._diff_added | set(self._diff_labels) | self._sibling_lines)
+        # The mapping can move without the listing changing (a line inserted above a function)
+        self._visible = self._compute_visible()
+        self._apply_visibility()
+
+    def _find_anchor(self, anchor: tuple[str, int, int], old_source: list[str], new_source: list[str]) -> int:
+        """
+        Index of the anchored instruction in the new listing. Its source line
+        is first moved past edits above it; if the instruction is gone, the
+        cursor falls back to the nearest source line in the same function,
+        then to the function's label, then to the old index.
+        """
+        function, src, ordinal = anchor
+        if src and old_source != new_source:
+            src = _follow_source_line(old_source, new_source, src)
+        index = {a: i for i, a in enumerate(self._anchors)}
+        if (function, src, ordinal) in index:
+            return index[(function, src, ordinal)]
+        nearest = min(
+            (a for a in index if a[0] == function and a[1] and a[2] == 0),
+            key=lambda a: abs(a[1] - src), default=None,
+        ) if src else None
+        if nearest is not None:
+            return index[nearest]
+        if (function, 0, 0) in index:
+            return index[(function, 0, 0)]
+        return min(self._cursor, max(len(self._asm_lines) - 1, 0))
+
+    def _update_diagnostics(self, state: LocalBoltState) -> None:
+        """Marks the listing lines of each diagnostic's source line and lists the diagnostics above a stale listing."""
+        dirty = set(self._diag_marks)
+        self._diag_marks, self._diag_notes = self._diagnostic_marks(state)
+        self._rerender_lines(dirty | set(self._diag_marks))
+
+        bar = self.query_one("#diagnostics-bar", Static)
+        errors = [d for d in state.diagnostics if d.severity == "error"]
+        if not self._stale or not errors:
+            bar.update("")
+            return
+        text = Text(f"Build failed; showing the last good listing ({len(errors)} error{'s' * (len(errors) != 1)}, e: output)",
+                    style="bold")
+        for d in errors[:_MAX_DIAGNOSTIC_BAR_LINES]:
+            text.append(f"\n✗ {d.line}:{d.column} {d.message}")
+        if len(errors) > _MAX_DIAGNOSTIC_BAR_LINES:
+            text.append(f"\n… {len(errors) - _MAX_DIAGNOSTIC_BAR_LINES} more")
+        bar.update(text)
+
+    def _diagnostic_marks(self, state: LocalBoltState) -> tuple[dict[int, str], dict[int, object]]:
+        """(asm idx -> worst severity, first asm idx -> diagnostic) for diagnostics in the edited file."""
+        source = os.path.abspath(state.source_path) if state.source_path else ""
+        by_line: dict[int, object] = {}
+        for d in state.diagnostics:
+            if d.severity not in ("error", "warning") or d.line <= 0:
+                continue
+            file = getattr(d, "file", "")
+            if file and os.path.abspath(file) != source:
+                continue
+            if d.line not in by_line or (d.severity == "error" and by_line[d.line].severity != "error"):
+                by_line[d.line] = d
+        marks: dict[int, str] = {}
+        notes: dict[int, object] = {}
+        if not by_line:
+            return marks, notes
+        noted: set[int] = set()
+        for idx in sorted(state.asm_mapping):
+            line = state.asm_mapping[idx]
+            d = by_line.get(line)
+            if d is None:
+                continue
+            marks[idx] = d.severity
+            if line not in noted:
+                noted.add(line)
+                notes[idx] = d
+        return marks, notes
+
+    def _update_error_display(self) -> None:
+        error_view, scroll = self.query_one("#error-view", TextArea), self.query_one("#asm-container", AsmScroll)
+        error_view.display = bool(error_view.text) and (self._show_error_output or not self._asm_lines)
+        scroll.display = not error_view.display
+        # The filtered view covers the full one rather than replacing it: swapping them with display
+        # would re-lay out every line widget, while a visibility change only repaints
+        self.query_one("#asm-filtered", FilteredListing).visible = scroll.display and self._visible is not None
+        self.query_one("#asm-container-outer").set_class(self._stale, "stale")
+        self.query_one("#diagnostics-bar", Static).display = self._stale and not error_view.display
+
+    def action_toggle_errors(self) -> None:
+        if self._stale:
+            self._show_error_output = not self._show_error_output
+            self._update_error_display()
+
+    def _finish_ui_timing(self, ui_start: float) -> None:
+        self.engine.record_stage("ui", (time.perf_counter() - ui_start) * 1000.0)
+        self._update_hud()
+
+    def action_toggle_hud(self) -> None:
+        hud = self.query_one("#perf-hud", Static)
+        hud.display = not hud.display
+        self._update_hud()
+
+    def _update_hud(self) -> None:
+        hud = self.query_one("#perf-hud", Static)
+        timings = self.engine.last_timings
+        if not hud.display or timings is None:
+            return
+        stages = timings.by_stage()
+        stages.pop("refresh", None)
+        slowest = max(stages, key=stages.get) if stages else None
+        text = Text()
+        for name, ms in stages.items():
+            if text: text.append(" │ ", style="dim")
+            text.append(f"{name} ", style="dim")
+            text.append(f"{ms:.1f}ms", style=f"bold {C_ACCENT4}" if name == slowest else f"bold {C_TEXT}")
+        text.append(f"   total {timings.total_ms:.1f}ms", style=f"bold {C_ACCENT1}")
+        hud.update(text)
 
     def _sync_peek(self) -> None:
         try:
             # Sync Source Peek
             self.query_one("#source-peek", SourcePeekPanel).show_for_asm_line(self._cursor)
+            self.query_one("#source-costs", SourceCostPane).show_line(self._asm_mapping.get(self._cursor))
             
             # Sync Instruction Help
             instr_help = self.query_one("#instr-help", InstructionHelpPanel)
@@ -280,8 +812,37 @@ class LocalBoltApp(App):
                 instr_help.show_for_asm_line(self._asm_lines[self._cursor])
         except Exception: pass
 
-    def on_unmount(self) -> None: self.engine.stop()
+    def on_unmount(self) -> None: (self.workspace or self.engine).stop()
+
+def _follow_source_line(old: list[str], new: list[str], line: int) -> int:
+    """Where 1-based source line `line` of old is in new; a deleted line maps to the line before it."""
+    matches = line_matches(old, new, max_edits=_MAX_RECONCILE_EDITS)
+    if matches is None:
+        return line
+    i = bisect.bisect_right(matches, (line - 1, len(new))) - 1
+    return matches[i][1] + 1 if i >= 0 else 1
+
+def _diagnostic_style(severity: str) -> str:
+    return "bold #a80000" if severity == "error" else f"bold {C_ACCENT4}"
+
+def _error_view_text(output: str) -> str:
+    lines = output.split("\n", _MAX_ERROR_VIEW_LINES)
+    if len(lines) <= _MAX_ERROR_VIEW_LINES:
+        return output
+    rest = lines.pop()
+    return "\n".join(lines) + f"\n… {rest.count(chr(10)) + 1} more lines"
 
 def run_tui(source_file: str):
     app = LocalBoltApp(source_file)
     app.run()
+
+def run_workspace_tui(source_files: list[str]):
+    from ..workspace import Workspace
+    app = LocalBoltApp(source_files[0], workspace=Workspace(source_files))
+    app.run()
+
+def run_remote_tui(source_file: str, socket_path: str | None = None):
+    """TUI for one file analyzed by a running `localbolt serve` daemon."""
+    from ..client import RemoteEngine
+    app = LocalBoltApp(source_file, engine=RemoteEngine(source_file, socket_path))
+    app.run()
@@ -0,0 +1,136 @@
+"""
+Flag-set comparison: an input palette for two flag sets and a floating
+panel that shows the per-function results of BoltEngine.compare_flags.
+"""
+
+from __future__ import annotations
+from rich.table import Table
+from rich.text import Text
+from textual.message import Message
+from textual.widgets import Static, Input
+from .flags_palette import FlagsPopup
+
+# User Palette
+C_BG = "#EBEEEE"
+C_TEXT = "#191A1A"
+C_ACCENT1 = "#007b9a" # Strong Cyan
+C_ACCENT2 = "#9FBFC5" # Muted Blue-Grey
+C_ACCENT3 = "#00796b" # Strong Teal
+C_ACCENT4 = "#af5f00" # Strong Orange
+
+
+def parse_flag_pair(text: str) -> tuple[list[str], list[str]]:
+    """Split 'A flags | B flags' into two flag lists."""
+    left, _, right = text.partition("|")
+    return left.split(), right.split()
+
+
+class FlagComparePopup(FlagsPopup):
+    """Palette asking for two flag sets separated by '|'."""
+
+    class CompareRequested(Message):
+        def __init__(self, flags_a: list[str], flags_b: list[str]) -> None:
+            super().__init__()
+            self.flags_a = flags_a
+            self.flags_b = flags_b
+
+    def compose(self):
+        yield Static("Compare Flags (A | B)", classes="title")
+        yield Input(placeholder="-O2 | -O3 -march=native", id="compare-input")
+
+    def on_input_submitted(self, event: Input.Submitted):
+        event.prevent_default()
+        flags_a, flags_b = parse_flag_pair(event.value)
+        self.post_message(self.CompareRequested(flags_a, flags_b))
+        self.display = False
+
+    def show(self, current_flags: str):
+        self.display = True
+        input_widget = self.query_one("#compare-input", Input)
+        input_widget.value = f"{current_flags} | "
+        input_widget.cursor_position = len(input_widget.value)
+        input_widget.focus()
+
+
+def _delta_style(a: int, b: int) -> str:
+    if b > a: return f"bold {C_ACCENT4}"
+    if b < a: return f"bold {C_ACCENT3}"
+    return C_TEXT
+
+
+class ComparisonPanel(Static, can_focus=True):
+    """
+    Floating table of per-function instruction counts, cycle estimates
+    and structural diff size for two flag sets.
+    """
+
+    DEFAULT_CSS = f"""
+    ComparisonPanel {{
+        layer: popups;
+        dock: top;
+        margin: 2 4;
+        width: 100%;
+        height: auto;
+        max-height: 80%;
+        overflow-y: auto;
+        background: {C_BG};
+        color: {C_TEXT};
+        border: solid {C_ACCENT1};
+        padding: 0 1;
+        display: none;
+    }}
+    """
+
+    def show_pending(self, flags_a: list[str], flags_b: list[str]) -> None:
+        text = Text()
+        text.append(" FLAG COMPARISON ", style=f"bold {C_BG} on {C_ACCENT1}")
+        text.append(f"  compiling A: {' '.join(flags_a) or '(none)'}  B: {' '.join(flags_b) or '(none)'} ...", style="dim")
+        self.update(text)
+        self.display = True
+
+    def show_comparison(self, result) -> None:
+        header = Text()
+        header.append(" FLAG COMPARISON ", style=f"bold {C_BG} on {C_ACCENT1}")
+        header.append(f"  A: {' '.join(result.flags_a) or '(none)'}", style=f"bold {C_TEXT}")
+        header.append(f"  B: {' '.join(result.flags_b) or '(none)'}", style=f"bold {C_TEXT}")
+
+        if not result.ok:
+            for label, err in (("A", result.errors_a), ("B", result.errors_b)):
+                if err:
+                    header.append(f"\n{label} failed: ", style=f"bold {C_ACCENT4}")
+                    header.append(err.strip().splitlines()[0] if err.strip() else "")
+            self.update(header)
+            self.display = True
+            return
+
+        table = Table(box=None, expand=True, header_style=f"bold {C_ACCENT1}")
+        table.add_column("Function", ratio=1, no_wrap=True, overflow="ellipsis")
+        table.add_column("Instr A→B", justify="right")
+        table.add_column("Cycles A→B", justify="right")
+        table.add_column("Diff", justify="right")
+        table.add_column("Src lines", justify="right")
+
+        total_a = total_b = 0
+        for func in result.functions:
+            total_a += func.cycles_a
+            total_b += func.cycles_b
+            instr = Text(f"{func.instructions_a}→{func.instructions_b}", style=_delta_style(func.instructions_a, func.instructions_b))
+            cycles = Text(f"{func.cycles_a}→{func.cycles_b}", style=_delta_style(func.cycles_a, func.cycles_b))
+            if func.only_in:
+                diff = Text(f"only in {func.only_in.upper()}", style="dim")
+            else:
+                diff = Text(f"+{func.added} -{func.removed}", style="dim" if not (func.added or func.removed) else C_TEXT)
+            table.add_row(func.name, instr, cycles, diff, str(len(func.line_deltas)) if func.line_deltas else "")
+
+        footer = Text(f"Total cycles {total_a}→{total_b}   (esc to close)", style=_delta_style(total_a, total_b))
+        grid = Table.grid(expand=True)
+        grid.add_row(header)
+        grid.add_row(table)
+        grid.add_row(footer)
+        self.update(grid)
+        self.display = True
+        self.focus()
+
+    def on_key(self, event):
+        if event.key == "escape":
+            self.display = False
@@ -0,0 +1,51 @@
+"""
+Listing filter palette: edit the filter applied over the shown listing
+(see parsing.listing_filter); an empty filter shows every line again.
+"""
+
+from __future__ import annotations
+from textual.message import Message
+from textual.widgets import Static, Input
+from ..parsing.listing_filter import ListingFilter, parse_filter
+from .flags_palette import FlagsPopup
+
+
+class FilterPopup(FlagsPopup):
+    """Palette for the listing filter; a malformed term keeps it open with the reason."""
+
+    DEFAULT_CSS = """
+    FilterPopup #filter-error {
+        color: #a80000;
+        display: none;
+    }
+    """
+
+    class FilterChanged(Message):
+        def __init__(self, listing_filter: ListingFilter) -> None:
+            super().__init__()
+            self.listing_filter = listing_filter
+
+    def compose(self):
+        yield Static("Filter Listing  (name  line:A-B  min:CYCLES)", classes="title")
+        yield Input(placeholder="kernel line:40-80 min:4", id="filter-input")
+        yield Static(id="filter-error")
+
+    def on_input_submitted(self, event: Input.Submitted):
+        event.prevent_default()
+        error = self.query_one("#filter-error", Static)
+        try:
+            listing_filter = parse_filter(event.value)
+        except ValueError as exc:
+            error.update(str(exc))
+            error.display = True
+            return
+        error.display = False
+        self.post_message(self.FilterChanged(listing_filter))
+        self.display = False
+
+    def show(self, current_filter: str):
+        self.display = True
+        self.query_one("#filter-error", Static).display = False
+        input_widget = self.query_one("#filter-input", Input)
+        input_widget.value = current_filter
+        input_widget.focus()
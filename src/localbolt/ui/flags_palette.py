@@ -52,3 +52,28 @@ class FlagsPopup(Static):
         input_widget = self.query_one("#flags-input", Input)
         input_widget.value = current_flags
         input_widget.focus()
+
+
+class CpuTargetsPopup(FlagsPopup):
+    """Same palette, used to pick the CPUs llvm-mca should compare."""
+
+    class TargetsChanged(Message):
+        def __init__(self, cpus: list[str]) -> None:
+            super().__init__()
+            self.cpus = cpus
+
+    def compose(self):
+        yield Static("Target CPUs (llvm-mca -mcpu)", classes="title")
+        yield Input(placeholder="skylake znver3 apple-m1 ...", id="cpus-input")
+
+    def on_input_submitted(self, event: Input.Submitted):
+        # Don't let FlagsPopup's handler treat the CPU list as compiler flags
+        event.prevent_default()
+        self.post_message(self.TargetsChanged(event.value.split()))
+        self.display = False
+
+    def show(self, current_cpus: str):
+        self.display = True
+        input_widget = self.query_one("#cpus-input", Input)
+        input_widget.value = current_cpus
+        input_widget.focus()
@@ -0,0 +1,134 @@
+"""
+Hot-spot ranking: a floating panel listing the functions and source lines
+with the highest estimated cost (LocalBoltState.hot_functions/hot_lines);
+Enter jumps to the selected one in the listing.
+"""
+
+from __future__ import annotations
+from typing import List
+from rich.table import Table
+from rich.text import Text
+from textual.message import Message
+from textual.widgets import Static
+from ..parsing.hotspots import HotSpot
+
+# User Palette
+C_BG = "#EBEEEE"
+C_TEXT = "#191A1A"
+C_ACCENT1 = "#007b9a" # Strong Cyan
+C_ACCENT2 = "#9FBFC5" # Muted Blue-Grey
+C_ACCENT4 = "#af5f00" # Strong Orange
+
+# Rows shown per view; the ranking itself is complete
+MAX_ROWS = 20
+
+
+class HotSpotPanel(Static, can_focus=True):
+    """
+    Ranked table of estimated cost per function or per source line
+    (tab switches). Latency is summed; throughput is the worst
+    reciprocal throughput among the instructions.
+    """
+
+    DEFAULT_CSS = f"""
+    HotSpotPanel {{
+        layer: popups;
+        dock: top;
+        margin: 2 4;
+        width: 100%;
+        height: auto;
+        max-height: 80%;
+        overflow-y: auto;
+        background: {C_BG};
+        color: {C_TEXT};
+        border: solid {C_ACCENT1};
+        padding: 0 1;
+        display: none;
+    }}
+    """
+
+    class HotSpotChosen(Message):
+        def __init__(self, spot: HotSpot) -> None:
+            super().__init__()
+            self.spot = spot
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._functions: List[HotSpot] = []
+        self._lines: List[HotSpot] = []
+        self._source_lines: List[str] = []
+        self._by_line = False
+        self._selected = 0
+
+    @property
+    def rows(self) -> List[HotSpot]:
+        return (self._lines if self._by_line else self._functions)[:MAX_ROWS]
+
+    def show(self, hot_functions: List[HotSpot], hot_lines: List[HotSpot], source_lines: List[str]) -> None:
+        self._functions, self._lines, self._source_lines = hot_functions, hot_lines, source_lines
+        self._selected = 0
+        self._render_table()
+        self.display = True
+        self.focus()
+
+    def on_key(self, event) -> None:
+        rows = self.rows
+        if event.key == "escape":
+            self.display = False
+        elif event.key == "tab":
+            self._by_line = not self._by_line
+            self._selected = 0
+            self._render_table()
+        elif event.key in ("up", "k", "down", "j") and rows:
+            step = -1 if event.key in ("up", "k") else 1
+            self._selected = (self._selected + step) % len(rows)
+            self._render_table()
+        elif event.key == "enter" and rows:
+            self.post_message(self.HotSpotChosen(rows[self._selected]))
+            self.display = False
+        else:
+            return
+        event.stop()
+        event.prevent_default()
+
+    def _render_table(self) -> None:
+        header = Text()
+        header.append(" HOT SPOTS ", style=f"bold {C_BG} on {C_ACCENT1}")
+        header.append("  by source line" if self._by_line else "  by function", style=f"bold {C_TEXT}")
+        header.append("   (tab: switch, enter: jump, esc: close)", style="dim")
+
+        rows = self.rows
+        if not rows:
+            self.update(Text.assemble(header, "\nNo llvm-mca estimates for this listing.", style=C_TEXT))
+            return
+
+        total = sum(spot.total_latency for spot in (self._lines if self._by_line else self._functions)) or 1
+        table = Table(box=None, expand=True, header_style=f"bold {C_ACCENT1}")
+        if self._by_line:
+            table.add_column("Line", justify="right")
+            table.add_column("Source", ratio=1, no_wrap=True, overflow="ellipsis")
+        table.add_column("Function", ratio=1, no_wrap=True, overflow="ellipsis")
+        table.add_column("Instr", justify="right")
+        table.add_column("Latency", justify="right")
+        table.add_column("Share", justify="right")
+        table.add_column("Max RThru", justify="right")
+
+        for i, spot in enumerate(rows):
+            cells = []
+            if self._by_line:
+                source = self._source_lines[spot.source_line - 1].strip() if spot.source_line <= len(self._source_lines) else ""
+                cells += [str(spot.source_line), source]
+            share = spot.total_latency / total
+            cells += [
+                spot.function,
+                str(spot.instructions),
+                Text(str(spot.total_latency), style=f"bold {C_ACCENT4}" if share >= 0.25 else C_TEXT),
+                f"{share:.0%}",
+                f"{spot.max_throughput:.2f}",
+            ]
+            table.add_row(*cells, style=f"on {C_ACCENT2}" if i == self._selected else None)
+
+        grid = Table.grid(expand=True)
+        grid.add_row(header)
+        grid.add_row(table)
+        self.update(grid)
@@ -0,0 +1,69 @@
+"""
+Filtered listing: the lines a listing filter keeps, drawn through
+Textual's line API. Only the rows on screen are rendered, so applying or
+clearing a filter costs the same for ten lines or a hundred thousand.
+"""
+
+from __future__ import annotations
+import bisect
+from array import array
+from typing import Callable, Optional
+from rich.style import Style
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+
+class FilteredListing(ScrollView, can_focus=False):
+    """
+    Shows a subset of the listing's rows. render_row(idx) gives the row of
+    asm line idx (a GutterRow) and row_background(idx) its background
+    colour or None, the same as the full listing's line widgets.
+    """
+
+    DEFAULT_CSS = """
+    FilteredListing {
+        height: 1fr;
+        width: 1fr;
+        layer: filtered;
+        visibility: hidden;
+    }
+    """
+
+    def __init__(self, render_row: Callable, row_background: Callable[[int], Optional[str]], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._render_row = render_row
+        self._row_background = row_background
+        self._rows = array("l")  # asm index of each shown row
+
+    def show_rows(self, rows: array) -> None:
+        self._rows = rows
+        self.virtual_size = Size(0, len(rows))
+        self.refresh()
+
+    def row_of(self, idx: int) -> int:
+        """The row asm line idx is on, or the row of the next shown line if it is hidden."""
+        return bisect.bisect_left(self._rows, idx)
+
+    def scroll_to_line(self, idx: int, top: bool = False) -> None:
+        """Scrolls asm line idx into view; top puts it on the first row."""
+        row = self.row_of(idx)
+        height = self.scrollable_content_region.height
+        if top:
+            self.scroll_to(y=row, animate=False)
+        elif row < self.scroll_y:
+            self.scroll_to(y=row, animate=False)
+        elif row >= self.scroll_y + height:
+            self.scroll_to(y=row - height + 1, animate=False)
+
+    def render_line(self, y: int) -> Strip:
+        row = round(self.scroll_y) + y
+        width = self.scrollable_content_region.width
+        if row >= len(self._rows):
+            return Strip.blank(width, self.rich_style)
+        idx = self._rows[row]
+        background = self._row_background(idx)
+        style = self.rich_style + Style(bgcolor=background) if background else self.rich_style
+        console = self.app.console
+        lines = console.render_lines(self._render_row(idx), console.options.update_width(width), style=style, pad=True)
+        return Strip(lines[0], width)
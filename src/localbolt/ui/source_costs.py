@@ -0,0 +1,101 @@
+"""
+Source-annotated cost view: the whole source file beside the listing, each
+line prefixed with the instructions it compiled to and their summed
+llvm-mca latency (LocalBoltState.source_costs). Follows the asm cursor.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional
+from rich.text import Text
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from ..parsing.hotspots import SourceCost
+
+# User Palette
+C_BG = "#EBEEEE"
+C_TEXT = "#191A1A"
+C_ACCENT1 = "#007b9a" # Strong Cyan
+C_ACCENT2 = "#9FBFC5" # Muted Blue-Grey
+C_ACCENT4 = "#af5f00" # Strong Orange
+
+# Line number, instruction count and cycle columns
+_COST_COLUMNS = "{line:>5} {instructions:>4} {cycles:>6} │ "
+_COST_WIDTH = len(_COST_COLUMNS.format(line="", instructions="", cycles=""))
+
+
+class SourceCostPane(ScrollView, can_focus=False):
+    """
+    Scrollable source file annotated with per-line cost. Only the visible
+    rows are rendered (Line API), so long files cost nothing to scroll.
+    """
+
+    DEFAULT_CSS = f"""
+    SourceCostPane {{
+        width: 45%;
+        height: 1fr;
+        border: solid {C_ACCENT2};
+        background: {C_BG};
+        color: {C_TEXT};
+        margin: 1 1 1 0;
+        display: none;
+    }}
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._source_lines: List[str] = []
+        self._costs: Dict[int, SourceCost] = {}
+        self._max_cycles = 0
+        self._current: Optional[int] = None  # 1-based source line under the asm cursor
+
+    def update_costs(self, source_lines: List[str], costs: Dict[int, SourceCost]) -> None:
+        self._source_lines = source_lines
+        self._costs = costs
+        self._max_cycles = max((cost.cycles for cost in costs.values()), default=0)
+        width = max((len(line.expandtabs(4)) for line in source_lines), default=0)
+        self.virtual_size = Size(_COST_WIDTH + width, len(source_lines))
+        self.refresh()
+
+    def show_line(self, line: Optional[int]) -> None:
+        """Highlights 1-based source line `line` and scrolls it to the middle of the pane."""
+        if line is None or line == self._current:
+            return
+        self._current = line
+        self.refresh()
+        if self.display:
+            self.center_current()
+
+    def center_current(self) -> None:
+        if self._current is not None:
+            self.scroll_to(y=max(self._current - 1 - self.scrollable_content_region.height // 2, 0), animate=False)
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        line = scroll_y + y + 1
+        width = self.scrollable_content_region.width
+        if line > len(self._source_lines):
+            return Strip.blank(width, self.rich_style)
+        row = self._render_row(line)
+        return Strip(list(row.render(self.app.console))).crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+    def _render_row(self, line: int) -> Text:
+        cost = self._costs.get(line)
+        current = line == self._current
+        row = Text(style=f"on {C_ACCENT2}" if current else "")
+        if cost is None or not cost.instructions:
+            row.append(_COST_COLUMNS.format(line=line, instructions="", cycles=""), style=f"dim {C_TEXT}")
+        else:
+            share = cost.cycles / self._max_cycles if self._max_cycles else 0.0
+            if share >= 0.5:
+                cycle_style = f"bold {C_ACCENT4}"
+            elif share >= 0.2:
+                cycle_style = C_ACCENT4
+            else:
+                cycle_style = C_TEXT
+            row.append(f"{line:>5} ", style=f"dim {C_TEXT}")
+            row.append(f"{cost.instructions:>4} ", style=C_ACCENT1)
+            row.append(f"{cost.cycles:>6}", style=cycle_style)
+            row.append(" │ ", style=f"dim {C_TEXT}")
+        row.append(self._source_lines[line - 1].expandtabs(4), style=f"bold {C_TEXT}" if current else C_TEXT)
+        return row
@@ -3,10 +3,14 @@ Floating Source Peek Widget
 """
 
 from __future__ import annotations
-from typing import Dict, List, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 from rich.text import Text
 from textual.widgets import Static
 from ..utils.lang import detect_language, source_label, Language
+from ..parsing.hotspots import SourceCost
+from ..parsing.locations import SourceLocations
+from ..utils.source_files import read_source_lines
 
 # User Palette
 C_BG = "#EBEEEE"
@@ -16,6 +20,56 @@ C_ACCENT2 = "#9FBFC5" # Muted Blue-Grey
 C_ACCENT3 = "#00796b" # Strong Teal
 C_ACCENT4 = "#af5f00" # Strong Orange
 
+_OPERATOR_CHARS = set("+-*/%<>=!&|^~?:")
+_CLOSING = {"(": ")", "[": "]"}
+
+
+def _expression_span(code: str, column: int) -> Optional[Tuple[int, int]]:
+    """
+    The [start, end) slice of code making up the sub-expression at 1-based
+    .loc column `column`: an identifier with any subscripts or call
+    arguments after it, an operator, or a bracket group with the name
+    before it. None if the column is unknown or past the end of the line.
+    """
+    pos = column - 1
+    if column < 1 or pos >= len(code) or code[pos].isspace():
+        return None
+    start = end = pos
+    char = code[pos]
+    if char in _OPERATOR_CHARS:
+        while start > 0 and code[start - 1] in _OPERATOR_CHARS:
+            start -= 1
+        while end < len(code) and code[end] in _OPERATOR_CHARS:
+            end += 1
+        return start, end
+    if char in _CLOSING:
+        # Compilers put subscripts and calls at the bracket: take the name too
+        while start > 0 and (code[start - 1].isalnum() or code[start - 1] == "_"):
+            start -= 1
+    elif char.isalnum() or char == "_":
+        while start > 0 and (code[start - 1].isalnum() or code[start - 1] == "_"):
+            start -= 1
+        while end < len(code) and (code[end].isalnum() or code[end] == "_"):
+            end += 1
+    else:
+        return pos, pos + 1
+    # Subscripts and argument lists following the name
+    while end < len(code) and code[end] in _CLOSING:
+        depth, scan = 0, end
+        while scan < len(code):
+            if code[scan] in _CLOSING:
+                depth += 1
+            elif code[scan] in ")]":
+                depth -= 1
+                if depth == 0:
+                    break
+            scan += 1
+        if scan == len(code):
+            break
+        end = scan + 1
+    return start, end
+
+
 class SourcePeekPanel(Static):
     """
     Floating popup showing C++ source line with context.
@@ -47,22 +101,45 @@ class SourcePeekPanel(Static):
         super().__init__(**kwargs)
         self._source_lines: List[str] = []
         self._asm_mapping: Dict[int, int] = {}
+        self._source_costs: Dict[int, SourceCost] = {}
+        self._locations: SourceLocations = SourceLocations()
+        self._source_dir = ""
         self._language: Language = Language.CPP
 
-    def update_context(self, source_lines: List[str], asm_mapping: Dict[int, int], source_path: str = "") -> None:
+    def update_context(self, source_lines: List[str], asm_mapping: Dict[int, int], source_path: str = "",
+                       source_costs: Optional[Dict[int, SourceCost]] = None,
+                       locations: Optional[SourceLocations] = None) -> None:
         self._source_lines = source_lines
         self._asm_mapping = asm_mapping
+        self._source_costs = source_costs or {}
+        self._locations = locations or SourceLocations()
         if source_path:
             self._language = detect_language(source_path)
+            self._source_dir = os.path.dirname(os.path.abspath(source_path))
 
     def show_for_asm_line(self, asm_line: int) -> None:
+        # Code inlined from a header: show the header's line, read (once) when first needed
+        location = self._locations.lookup(asm_line)
+        if location is not None and self._locations.is_inlined(location):
+            path = self._header_path(location.file_id)
+            header_lines = read_source_lines(path) if path else ()
+            if 0 < location.line <= len(header_lines):
+                title = f"{os.path.basename(path)}:{location.line}"
+                if location.inlined_at:
+                    title += f"  inlined at line {location.inlined_at}"
+                self.display = True
+                self._render_line(location.line, header_lines, title, location.column)
+                return
+
         src_num = self._asm_mapping.get(asm_line)
+        mapped_line = asm_line
         
         # Backward search for nearest mapped line
         if src_num is None:
             for offset in range(1, 20):
                 if asm_line - offset < 0: break
-                src_num = self._asm_mapping.get(asm_line - offset)
+                mapped_line = asm_line - offset
+                src_num = self._asm_mapping.get(mapped_line)
                 if src_num is not None: break
 
         if src_num is None:
@@ -70,35 +147,65 @@ class SourcePeekPanel(Static):
             return
 
         self.display = True
-        self._render_line(src_num)
+        location = self._locations.lookup(mapped_line)
+        if location is not None and location.column and location.line == src_num \
+                and not self._locations.is_inlined(location):
+            self._render_line(src_num, column=location.column)
+        else:
+            self._render_line(src_num)
+
+    def _header_path(self, file_id: int) -> str:
+        path = self._locations.files.get(file_id, "")
+        if path and not os.path.isabs(path):
+            path = os.path.join(self._source_dir, path)
+        return path
 
-    def _render_line(self, line_num: int) -> None:
-        """Renders target line with 1 line of context above and below."""
-        if not self._source_lines or line_num < 1 or line_num > len(self._source_lines):
+    def _render_line(self, line_num: int, source_lines=None, title: str = "", column: int = 0) -> None:
+        """
+        Renders target line with 1 line of context above and below; from
+        source_lines (a header) with title as its label if given, else from
+        the main file with its cost totals. A known .loc column highlights
+        the sub-expression the instruction belongs to.
+        """
+        main_file = source_lines is None
+        source_lines = self._source_lines if main_file else source_lines
+        if not source_lines or line_num < 1 or line_num > len(source_lines):
             self.display = False
             return
 
         text = Text()
-        label = source_label(self._language)
+        label = source_label(self._language) if main_file else title
         text.append(f" {label} ", style=f"bold {C_BG} on {C_ACCENT3}")
+        cost = self._source_costs.get(line_num) if main_file else None
+        if cost is not None and cost.instructions:
+            text.append(f"  line {line_num}: {cost.instructions} instr, {cost.cycles} cycles", style=f"bold {C_ACCENT4}")
+        if column:
+            text.append(f"  col {column}", style=f"dim {C_TEXT}")
         text.append("\n")
 
         # 1. Line Above
         if line_num >= 2:
-            prev = self._source_lines[line_num - 2]
+            prev = source_lines[line_num - 2]
             text.append(f" {line_num - 1:>4} │ ", style=f"dim {C_TEXT}")
             text.append(prev, style=f"dim {C_TEXT}")
             text.append("\n")
 
         # 2. TARGET LINE
-        code = self._source_lines[line_num - 1]
+        code = source_lines[line_num - 1]
         text.append(f"►{line_num:>4} │ ", style=f"bold {C_ACCENT4}")
-        text.append(code, style=f"bold {C_TEXT} on {C_ACCENT2}")
+        span = _expression_span(code, column)
+        if span is None:
+            text.append(code, style=f"bold {C_TEXT} on {C_ACCENT2}")
+        else:
+            start, end = span
+            text.append(code[:start], style=f"bold {C_TEXT} on {C_ACCENT2}")
+            text.append(code[start:end], style=f"bold {C_BG} on {C_ACCENT4}")
+            text.append(code[end:], style=f"bold {C_TEXT} on {C_ACCENT2}")
         text.append("\n")
 
         # 3. Line Below
-        if line_num < len(self._source_lines):
-            nxt = self._source_lines[line_num]
+        if line_num < len(source_lines):
+            nxt = source_lines[line_num]
             text.append(f" {line_num + 1:>4} │ ", style=f"dim {C_TEXT}")
             text.append(nxt, style=f"dim {C_TEXT}")
 
@@ -0,0 +1,128 @@
+"""
+Jump to a function: a palette that fuzzy-matches the typed text against
+the function labels of the listing (LocalBoltState.functions) and moves
+the cursor to the chosen one.
+"""
+
+from __future__ import annotations
+from typing import List, Optional
+from rich.text import Text
+from textual.message import Message
+from textual.widgets import Static, Input
+from ..parsing.functions import FunctionInfo
+from .flags_palette import FlagsPopup
+
+C_TEXT = "#191A1A"
+C_ACCENT1 = "#007b9a" # Strong Cyan
+C_ACCENT2 = "#9FBFC5" # Muted Blue-Grey
+
+# Matches listed below the input
+MAX_RESULTS = 10
+# Demangled C++ names can be very long; the palette is 60 cells wide
+_MAX_NAME_CHARS = 40
+
+
+def fuzzy_score(query: str, name: str) -> Optional[int]:
+    """
+    Score of query as a case-insensitive subsequence of name, or None if it
+    is not one. Runs of consecutive characters, matches at the start of a
+    word and a plain substring match all score higher; gaps between
+    matched characters cost a little.
+    """
+    if not query:
+        return 0
+    query, name = query.lower(), name.lower()
+    score = 20 if query in name else 0
+    pos, prev = 0, -2
+    for ch in query:
+        idx = name.find(ch, pos)
+        if idx < 0:
+            return None
+        if idx == prev + 1:
+            score += 5
+        if idx == 0 or not name[idx - 1].isalnum():
+            score += 3
+        if prev >= 0:
+            score -= min(idx - pos, 5)
+        pos, prev = idx + 1, idx
+    return score
+
+
+def rank_symbols(query: str, functions: List[FunctionInfo], limit: int = MAX_RESULTS) -> List[FunctionInfo]:
+    """
+    The best matches for query, best first; shorter names and then listing
+    order break ties. An empty query lists the functions in listing order.
+    """
+    if not query:
+        return functions[:limit]
+    scored = []
+    for func in functions:
+        score = fuzzy_score(query, func.name)
+        if score is not None:
+            scored.append((-score, len(func.name), func.start, func))
+    scored.sort(key=lambda entry: entry[:3])
+    return [entry[3] for entry in scored[:limit]]
+
+
+class SymbolPicker(FlagsPopup):
+    """Palette listing the functions that match the typed text; Enter jumps to the highlighted one."""
+
+    class SymbolChosen(Message):
+        def __init__(self, function: FunctionInfo) -> None:
+            super().__init__()
+            self.function = function
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._functions: List[FunctionInfo] = []
+        self._matches: List[FunctionInfo] = []
+        self._selected = 0
+
+    def compose(self):
+        yield Static("Go to Function", classes="title")
+        yield Input(placeholder="type part of a name…", id="symbol-input")
+        yield Static(id="symbol-results")
+
+    def show(self, functions: List[FunctionInfo]):
+        self._functions = functions
+        self.display = True
+        input_widget = self.query_one("#symbol-input", Input)
+        input_widget.value = ""
+        self._filter("")
+        input_widget.focus()
+
+    def on_input_changed(self, event: Input.Changed):
+        self._filter(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted):
+        event.prevent_default()
+        if self._matches:
+            self.post_message(self.SymbolChosen(self._matches[self._selected]))
+        self.display = False
+
+    def on_key(self, event):
+        if event.key in ("up", "down") and self._matches:
+            event.stop()
+            step = -1 if event.key == "up" else 1
+            self._selected = (self._selected + step) % len(self._matches)
+            self._render_matches()
+            return
+        super().on_key(event)
+
+    def _filter(self, query: str):
+        self._matches = rank_symbols(query.strip(), self._functions)
+        self._selected = 0
+        self._render_matches()
+
+    def _render_matches(self):
+        text = Text()
+        if not self._matches:
+            text.append("No matching function", style=C_TEXT)
+        for i, func in enumerate(self._matches):
+            if i:
+                text.append("\n")
+            name = func.name if len(func.name) <= _MAX_NAME_CHARS else func.name[:_MAX_NAME_CHARS - 1] + "…"
+            style = f"bold {C_TEXT} on {C_ACCENT2}" if i == self._selected else C_TEXT
+            text.append(f"{name:<{_MAX_NAME_CHARS}}", style=style)
+            text.append(f" {func.instruction_count:>4}i {func.total_cycles:>5}c", style=C_ACCENT1)
+        self.query_one("#symbol-results", Static).update(text)
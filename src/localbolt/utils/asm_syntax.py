@@ -0,0 +1,28 @@
+"""
+Token patterns for x86/ARM assembly, shared by the highlighter and the parsers.
+"""
+import re
+
+REGISTERS = re.compile(
+    r"\b("
+    r"r[abcd]x|r[sd]i|r[bs]p|r(?:8|9|1[0-5])[dwb]?"
+    r"|e[abcd]x|e[sd]i|e[bs]p"
+    r"|[abcd][hl]|[abcd]x|[sd]il?|[bs]pl?"
+    r"|xmm[0-9]+|ymm[0-9]+|zmm[0-9]+"
+    r"|[wx][0-9]{1,2}|sp|fp|lr"
+    r")\b",
+    re.IGNORECASE,
+)
+
+SIZE_KEYWORDS = re.compile(r"\b(DWORD|QWORD|WORD|BYTE|PTR)\b")
+NUMBERS = re.compile(r"\b(0x[0-9a-fA-F]+|0b[01]+|[0-9]+)\b")
+INSTRUCTIONS = re.compile(
+    r"\b("
+    r"movs?[xzbw]?|lea|add|sub|imul|idiv|mul|div|inc|dec"
+    r"|cmp|test|and|or|xor|not|shl|shr|sar|sal"
+    r"|jmp|je|jne|jz|jnz|jg|jge|jl|jle|ja|jae|jb|jbe"
+    r"|call|ret|push|pop|nop|int|syscall|leave|enter"
+    r"|cmov\w+|stp|ldp|stur|ldur|adrp|bl|b\."
+    r")\b",
+    re.IGNORECASE,
+)
@@ -1,6 +1,7 @@
 import re
 import shutil
 from rich.text import Text
+from .asm_syntax import REGISTERS, SIZE_KEYWORDS, NUMBERS, INSTRUCTIONS
 
 # Palette provided by user
 C_FOREGROUND = "#EBEEEE"
@@ -10,30 +11,6 @@ C_MISC2 = "#007b9a" # Strong Cyan (Instructions)
 C_MISC3 = "#00796b" # Strong Teal (Labels)
 C_MISC4 = "#af5f00" # Strong Orange (Registers)
 
-REGISTERS = re.compile(
-    r"\b("
-    r"r[abcd]x|r[sd]i|r[bs]p|r(?:8|9|1[0-5])[dwb]?"
-    r"|e[abcd]x|e[sd]i|e[bs]p"
-    r"|[abcd][hl]|[abcd]x|[sd]il?|[bs]pl?"
-    r"|xmm[0-9]+|ymm[0-9]+|zmm[0-9]+"
-    r"|[wx][0-9]{1,2}|sp|fp|lr"
-    r")\b",
-    re.IGNORECASE,
-)
-
-SIZE_KEYWORDS = re.compile(r"\b(DWORD|QWORD|WORD|BYTE|PTR)\b")
-NUMBERS = re.compile(r"\b(0x[0-9a-fA-F]+|0b[01]+|[0-9]+)\b")
-INSTRUCTIONS = re.compile(
-    r"\b("
-    r"movs?[xzbw]?|lea|add|sub|imul|idiv|mul|div|inc|dec"
-    r"|cmp|test|and|or|xor|not|shl|shr|sar|sal"
-    r"|jmp|je|jne|jz|jnz|jg|jge|jl|jle|ja|jae|jb|jbe"
-    r"|call|ret|push|pop|nop|int|syscall|leave|enter"
-    r"|cmov\w+|stp|ldp|stur|ldur|adrp|bl|b\."
-    r")\b",
-    re.IGNORECASE,
-)
-
 def _severity_styles(cycles: int | None) -> tuple[str, str]:
     """Light-mode compatible heatmap palette."""
     if cycles is None: return (C_TEXT, f"on {C_FOREGROUND}")
@@ -0,0 +1,131 @@
+"""
+Engine logging — a leveled, rotating log written by a background thread.
+
+Callers only put records on an in-memory queue (QueueHandler), so logging
+on the refresh path costs no file syscalls. A single QueueListener per
+process writes them to <log_dir>/localbolt-<pid>.log with size-based
+rotation; the pid keeps concurrent LocalBolt instances from interleaving.
+
+Configuration (config.json keys, overridden by environment variables):
+    log_dir    / LOCALBOLT_LOG_DIR     default ~/.localbolt/logs
+    log_level  / LOCALBOLT_LOG_LEVEL   default INFO
+"""
+import atexit
+import logging
+import os
+import queue
+import re
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import ConfigManager
+
+LOGGER_NAME = "localbolt"
+MAX_BYTES = 1_000_000
+BACKUP_COUNT = 2
+KEEP_LOG_SESSIONS = 10  # processes whose logs (with their rotated backups) survive startup pruning
+
+RE_LOG_FILE = re.compile(r"^localbolt-(\d+)\.log(?:\.\d+)?$")
+
+_listener: Optional[QueueListener] = None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def _prune_old_logs(log_dir: Path) -> None:
+    """
+    Keeps the logs of the KEEP_LOG_SESSIONS most recent processes; this
+    process's and those of running processes are never removed. Files that
+    vanish meanwhile (another instance pruning) are skipped.
+    """
+    files: Dict[int, List[Path]] = defaultdict(list)
+    newest: Dict[int, float] = defaultdict(float)
+    for path in log_dir.glob("localbolt-*.log*"):
+        match = RE_LOG_FILE.match(path.name)
+        if not match:
+            continue
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        pid = int(match.group(1))
+        files[pid].append(path)
+        newest[pid] = max(newest[pid], mtime)
+
+    by_recency = sorted(files, key=newest.__getitem__, reverse=True)
+    for pid in by_recency[KEEP_LOG_SESSIONS:]:
+        if pid == os.getpid() or _pid_alive(pid):
+            continue
+        for stale in files[pid]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def setup_logging(log_dir: Optional[str] = None, level: Optional[str] = None) -> logging.Logger:
+    """
+    Starts the background writer once per process and returns the 'localbolt' logger.
+    Later calls return the same logger without reconfiguring it.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+
+    config = ConfigManager()
+    log_dir = log_dir or os.environ.get("LOCALBOLT_LOG_DIR") or config.get("log_dir") or str(config.config_dir / "logs")
+    level = level or os.environ.get("LOCALBOLT_LOG_LEVEL") or config.get("log_level", "INFO")
+
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+
+    try:
+        path = Path(log_dir).expanduser()
+        path.mkdir(parents=True, exist_ok=True)
+        _prune_old_logs(path)
+        file_handler: logging.Handler = RotatingFileHandler(
+            path / f"localbolt-{os.getpid()}.log", maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT
+        )
+    except OSError:
+        # Unwritable log location must never take the app down
+        file_handler = logging.NullHandler()
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    _listener = None
+
+
+def get_logger(name: str = "") -> logging.Logger:
+    """Child logger of 'localbolt' (e.g. get_logger('engine') -> 'localbolt.engine')."""
+    setup_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
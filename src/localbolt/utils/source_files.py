@@ -0,0 +1,22 @@
+"""
+Source files read on demand (headers shown in the peek panel), cached
+until they change on disk.
+"""
+import os
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=32)
+def _read_lines(path: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    with open(path, "r", errors="replace") as f:
+        return tuple(f.read().splitlines())
+
+
+def read_source_lines(path: str) -> Tuple[str, ...]:
+    """The lines of path, or () if it cannot be read. Read again only once its mtime or size changes."""
+    try:
+        st = os.stat(path)
+        return _read_lines(path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return ()
@@ -2,6 +2,10 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 from ..parsing.perf_parser import InstructionStats
 from ..parsing.diagnostics import Diagnostic
+from ..parsing.asm_diff import ListingDiff
+from ..parsing.functions import FunctionInfo
+from ..parsing.hotspots import HotSpot, SourceCost
+from ..parsing.locations import SourceLocations
 
 @dataclass
 class LocalBoltState:
@@ -15,10 +19,27 @@ class LocalBoltState:
     # Assembly Data
     asm_content: str = ""
     asm_mapping: Dict[int, int] = field(default_factory=dict)
+    # File, line and inlined-at line of each asm line, across the main file and its headers
+    source_locations: SourceLocations = field(default_factory=SourceLocations)
     
     # Performance Data
     perf_stats: Dict[int, InstructionStats] = field(default_factory=dict)
     raw_mca_output: str = ""
+    # Outline of asm_content: one entry per function label, with its line range and cycle total
+    functions: List[FunctionInfo] = field(default_factory=list)
+    # Estimated cost per source line and per function, most expensive first
+    hot_lines: List[HotSpot] = field(default_factory=list)
+    hot_functions: List[HotSpot] = field(default_factory=list)
+    # Source line -> the asm lines it compiled to, with their instruction count and summed cycles
+    source_costs: Dict[int, SourceCost] = field(default_factory=dict)
+    # Per-CPU comparison: cpu name -> instruction index -> stats
+    target_cpus: List[str] = field(default_factory=list)
+    cpu_perf_stats: Dict[str, Dict[int, InstructionStats]] = field(default_factory=dict)
+
+    # Previous successful listing and its per-function diff against the current one
+    previous_asm_content: str = ""
+    previous_perf_stats: Dict[int, InstructionStats] = field(default_factory=dict)
+    asm_diff: Optional[ListingDiff] = None
     
     # Compiler Metadata & Errors
     compiler_output: str = ""
@@ -45,6 +66,10 @@ class LocalBoltState:
         self.perf_stats = stats
         self.raw_mca_output = raw
 
+    def update_cpu_perf(self, stats_by_cpu: Dict[str, Dict[int, InstructionStats]]):
+        self.cpu_perf_stats = stats_by_cpu
+        self.target_cpus = list(stats_by_cpu.keys())
+
     def get_line_number(self, app) -> int:
         """Query the AsmApp for the current cursor line number (1-based)."""
         return app.get_line_number()
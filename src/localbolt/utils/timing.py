@@ -0,0 +1,82 @@
+"""
+Per-refresh pipeline timing.
+
+BoltEngine.refresh activates a RefreshTimings for its duration; pipeline
+code anywhere below it (drivers, parsing) marks its work with
+
+    with stage("lex"):
+        ...
+
+which is a no-op when no refresh is being timed. Stages are recorded flat
+in completion order, so a stage nested inside another (flags inside
+compile) is counted in both.
+"""
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_active: ContextVar[Optional["RefreshTimings"]] = ContextVar("localbolt_refresh_timings", default=None)
+
+
+@dataclass
+class RefreshTimings:
+    source_path: str = ""
+    started_at: float = field(default_factory=time.time)
+    stages: List[Tuple[str, float]] = field(default_factory=list)  # (name, milliseconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000.0)
+
+    def add(self, name: str, ms: float) -> None:
+        self.stages.append((name, ms))
+
+    def by_stage(self) -> Dict[str, float]:
+        """Milliseconds per stage name (repeated stages are summed)."""
+        totals: Dict[str, float] = {}
+        for name, ms in self.stages:
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    @property
+    def total_ms(self) -> float:
+        totals = self.by_stage()
+        return totals.get("refresh", 0.0) + totals.get("ui", 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source_path,
+            "started_at": self.started_at,
+            "total_ms": round(self.total_ms, 3),
+            "stages": {name: round(ms, 3) for name, ms in self.by_stage().items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+
+@contextmanager
+def recording(timings: RefreshTimings) -> Iterator[RefreshTimings]:
+    """Make timings the target of stage() for the current context."""
+    token = _active.set(timings)
+    try:
+        yield timings
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timings = _active.get()
+    if timings is None:
+        yield
+        return
+    with timings.stage(name):
+        yield
@@ -1,51 +1,179 @@
-import time
+import hashlib
+import threading
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, Iterable, Optional, Set
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+DEFAULT_QUIET_PERIOD = 0.1  # seconds without events before a save is delivered
+
+def file_digest(path: str) -> Optional[bytes]:
+    """Content hash of a file, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except OSError:
+        return None
+
 class AssemblyUpdateHandler(FileSystemEventHandler):
     """
-    Listens for changes to a specific source file and triggers a callback.
+    Listens for changes to a source file (and the headers it depends on)
+    and triggers a callback with the source file's path.
+
+    Debounce is trailing-edge: every event restarts a quiet-period timer and
+    the callback runs once the files have stopped changing, so editors that
+    write in chunks are only compiled once, on the final content. Saves
+    that leave the content unchanged are skipped, and atomic-rename saves
+    (write temp file, rename over the target) are picked up via
+    on_moved/on_created. Callbacks never overlap.
     """
-    def __init__(self, target_file: str, callback: Callable[[str], None]):
+    def __init__(self, target_file: str, callback: Callable[[str], None],
+                 quiet_period: float = DEFAULT_QUIET_PERIOD):
         self.target_file = str(Path(target_file).resolve())
         self.callback = callback
-        self.last_triggered = 0
-        self.debounce_seconds = 0.5 # Prevent double-triggers from some editors
+        self.quiet_period = quiet_period
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._callback_lock = threading.Lock()
+        self._digests: Dict[str, Optional[bytes]] = {self.target_file: file_digest(self.target_file)}
+        self._pending: Set[str] = set()
+
+    @property
+    def targets(self) -> Set[str]:
+        return set(self._digests)
+
+    def set_dependencies(self, paths: Iterable[str]):
+        """Track exactly these files besides the source; new ones are hashed now."""
+        wanted = {str(Path(p).resolve()) for p in paths} | {self.target_file}
+        with self._lock:
+            digests = {p: self._digests[p] if p in self._digests else file_digest(p) for p in wanted}
+            self._digests = digests
+
+    def _resolve_target(self, path) -> Optional[str]:
+        if not path:
+            return None
+        resolved = str(Path(path).resolve())
+        return resolved if resolved in self._digests else None
+
+    def _schedule(self, path: str):
+        with self._lock:
+            self._pending.add(path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.quiet_period, self._deliver)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _deliver(self):
+        with self._callback_lock:
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            current = {path: file_digest(path) for path in pending}
+            changed = False
+            with self._lock:
+                for path, digest in current.items():
+                    # Missing file: mid-rename; the following create/move event reschedules
+                    if digest is None or path not in self._digests or digest == self._digests[path]:
+                        continue
+                    self._digests[path] = digest
+                    changed = True
+            if changed:
+                self.callback(self.target_file)
+
+    def cancel(self):
+        """Drop a pending delivery (used when the watcher stops)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
 
     def on_modified(self, event):
         if event.is_directory:
             return
-            
-        if str(Path(event.src_path).resolve()) == self.target_file:
-            now = time.time()
-            if now - self.last_triggered > self.debounce_seconds:
-                self.callback(self.target_file)
-                self.last_triggered = now
+        target = self._resolve_target(event.src_path)
+        if target:
+            self._schedule(target)
+
+    def on_created(self, event):
+        self.on_modified(event)
+
+    def on_closed(self, event):
+        self.on_modified(event)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        target = self._resolve_target(event.dest_path)
+        if target:
+            self._schedule(target)
 
 class FileWatcher:
     """
     Manages the watchdog observer thread.
+
+    Watches are per directory (non-recursive), one for each directory that
+    holds the source or one of its dependencies; update_dependencies only
+    schedules/unschedules the directories that changed.
+
+    Pass an observer to share one watchdog thread between several watchers
+    (workspace mode); the owner of a shared observer starts and stops it.
     """
-    def __init__(self):
-        self.observer = Observer()
-        self.watch = None
+    def __init__(self, quiet_period: float = DEFAULT_QUIET_PERIOD, observer: Optional[Observer] = None):
+        self._owns_observer = observer is None
+        self.observer = observer or Observer()
+        self.watches = {}  # directory -> ObservedWatch
+        self.handler: Optional[AssemblyUpdateHandler] = None
+        self.quiet_period = quiet_period
+        self._dependencies: Set[str] = set()
 
     def start_watching(self, file_path: str, callback: Callable[[str], None]):
         """
-        Starts a background thread watching the directory of the file_path.
+        Starts a background thread watching the source file and any
+        dependencies registered so far.
         """
         path = Path(file_path).resolve()
         if not path.exists():
             raise FileNotFoundError(f"Cannot watch non-existent file: {path}")
 
-        handler = AssemblyUpdateHandler(str(path), callback)
-        # Watch the parent directory
-        self.watch = self.observer.schedule(handler, path.parent, recursive=False)
-        self.observer.start()
+        self.handler = AssemblyUpdateHandler(str(path), callback, self.quiet_period)
+        self.handler.set_dependencies(self._dependencies)
+        self._sync_watches()
+        if self._owns_observer:
+            self.observer.start()
+
+    def update_dependencies(self, paths: Iterable[str]):
+        """Replace the set of dependency files (e.g. headers from the compiler's depfile)."""
+        deps = {str(Path(p).resolve()) for p in paths}
+        if deps == self._dependencies:
+            return
+        self._dependencies = deps
+        if self.handler is not None:
+            self.handler.set_dependencies(deps)
+            self._sync_watches()
+
+    def _sync_watches(self):
+        wanted = {str(Path(p).parent) for p in self.handler.targets}
+        wanted = {d for d in wanted if Path(d).is_dir()}
+        for directory in set(self.watches) - wanted:
+            self._unwatch(self.watches.pop(directory))
+        for directory in wanted - set(self.watches):
+            self.watches[directory] = self.observer.schedule(self.handler, directory, recursive=False)
+
+    def _unwatch(self, watch):
+        if self._owns_observer:
+            self.observer.unschedule(watch)
+        else:
+            # Other watchers may share this directory's watch
+            self.observer.remove_handler_for_watch(self.handler, watch)
 
     def stop_watching(self):
-        if self.observer.is_alive():
+        if self.handler is not None:
+            self.handler.cancel()
+        if not self._owns_observer:
+            for watch in self.watches.values():
+                self._unwatch(watch)
+            self.watches.clear()
+        elif self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
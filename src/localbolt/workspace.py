@@ -0,0 +1,144 @@
+"""
+Workspace mode: several source files in one process.
+
+All engines share one watchdog observer, one driver per language, one
+compile cache and a bounded refresh pool. Only the active file is
+recompiled when it (or a header it includes) is saved; saves to
+background files just mark them stale, and they are refreshed when
+activated.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from watchdog.observers import Observer
+
+from .compiler.cache import CompileCache
+from .compiler.driver import CompilerDriver
+from .compiler.rust_driver import RustCompilerDriver
+from .engine import BoltEngine
+from .utils.config import ConfigManager
+from .utils.lang import Language, detect_language
+from .utils.state import LocalBoltState
+from .utils.watcher import DEFAULT_QUIET_PERIOD, FileWatcher
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class ToolchainRegistry:
+    """One driver per language, discovered on first use and shared by every engine."""
+
+    def __init__(self):
+        self._drivers: Dict[Language, object] = {}
+        self._lock = threading.Lock()
+
+    def driver_for(self, language: Language):
+        with self._lock:
+            if language not in self._drivers:
+                self._drivers[language] = RustCompilerDriver() if language == Language.RUST else CompilerDriver()
+            return self._drivers[language]
+
+
+class Workspace:
+    def __init__(self, source_files: List[str], max_workers: int = 0):
+        self.quiet_period = ConfigManager().get("watch_quiet_ms", DEFAULT_QUIET_PERIOD * 1000) / 1000.0
+        self.observer = Observer()
+        self.toolchains = ToolchainRegistry()
+        self.cache = CompileCache()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1))
+        self.on_update_callback: Optional[Callable[[LocalBoltState], None]] = None
+
+        self.engines: Dict[str, BoltEngine] = {}
+        self.paths: List[str] = []
+        self._stale = set()  # never analyzed, or saved while in the background
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        for source in source_files:
+            self.add(source)
+        self.active: Optional[str] = self.paths[0] if self.paths else None
+
+    def add(self, source: str) -> str:
+        """Create an engine for source (no-op if it is already open); returns its resolved path."""
+        path = str(Path(source).resolve())
+        with self._lock:
+            if path in self.engines:
+                return path
+            engine = BoltEngine(
+                path,
+                driver=self.toolchains.driver_for(detect_language(path)),
+                watcher=FileWatcher(quiet_period=self.quiet_period, observer=self.observer),
+                compile_cache=self.cache,
+            )
+            engine.on_update_callback = partial(self._on_engine_update, path)
+            self.engines[path] = engine
+            self.paths.append(path)
+            self._stale.add(path)
+            self._refresh_locks[path] = threading.Lock()
+            started = self._started
+        if started:
+            engine.watcher.start_watching(path, self._on_file_saved)
+        return path
+
+    def start(self):
+        with self._lock:
+            self._started = True
+        for path, engine in list(self.engines.items()):
+            engine.watcher.start_watching(path, self._on_file_saved)
+        self.observer.start()
+        if self.active is not None:
+            self.activate(self.active)
+
+    def stop(self):
+        for engine in self.engines.values():
+            engine.stop()
+        if self.observer.is_alive():
+            self.observer.stop()
+            self.observer.join()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def activate(self, path: str):
+        """Make path the active file; refreshes it if stale, else re-sends its current state."""
+        with self._lock:
+            self.active = path
+            stale = path in self._stale
+        if stale:
+            self._submit(path)
+        elif self.on_update_callback:
+            self.on_update_callback(self.engines[path].state)
+
+    def refresh(self, path: Optional[str] = None):
+        """Queue a refresh of path (default: the active file)."""
+        self._submit(path or self.active)
+
+    def is_stale(self, path: str) -> bool:
+        return path in self._stale
+
+    def _submit(self, path: str) -> Future:
+        with self._lock:
+            self._stale.discard(path)
+        return self.pool.submit(self._refresh, path)
+
+    def _refresh(self, path: str):
+        # Saves can queue a second refresh while one runs; never run them concurrently
+        with self._refresh_locks[path]:
+            self.engines[path].refresh()
+
+    def _is_visible(self, path: str) -> bool:
+        """Whether anyone is looking at path; only visible files are refreshed on save."""
+        return path == self.active
+
+    def _on_file_saved(self, path: str):
+        with self._lock:
+            background = not self._is_visible(path)
+            if background:
+                self._stale.add(path)
+        if not background:
+            self._submit(path)
+
+    def _on_engine_update(self, path: str, state: LocalBoltState):
+        if path == self.active and self.on_update_callback:
+            self.on_update_callback(state)
@@ -0,0 +1,171 @@
+"""
+Unit tests for function splitting and structural listing comparison.
+"""
+from localbolt.parsing.functions import split_functions, is_instruction_line, line_anchors
+from localbolt.parsing.asm_diff import (
+    normalize_instructions, diff_counts, compare_listings, myers_matches, line_matches, diff_listings,
+    MAX_DIFF_EDITS,
+)
+
+
+LISTING_O0 = """# GNU C++17 banner
+
+square(int):
+\tpush\trbp\t#
+\tmov\teax, edi\t# tmp84, x
+\timul\teax, eax\t# _2, tmp84
+\tpop\trbp\t#
+\tret
+
+main:
+\tmov\teax, 0
+\tret"""
+
+LISTING_O2 = """square(int):
+\timul\tedi, edi\t# tmp84, tmp85
+\tmov\teax, edi
+\tret
+
+main:
+\txor\teax, eax
+\tret"""
+
+
+class TestSplitFunctions:
+    def test_splits_on_function_labels(self):
+        funcs = split_functions(LISTING_O0.splitlines())
+        assert [f.name for f in funcs] == ["square(int)", "main"]
+        assert funcs[0].instruction_count == 5
+        assert funcs[1].instruction_count == 2
+
+    def test_local_labels_stay_in_function(self):
+        lines = ["foo:", "\tjmp\t.L2", ".L2:", "\tret"]
+        funcs = split_functions(lines)
+        assert len(funcs) == 1
+        assert funcs[0].instruction_count == 2
+        assert funcs[0].end == 4
+
+    def test_macos_block_labels_stay_in_function(self):
+        lines = ["square(int):", "\tcmp\tedi, 0", "LBB0_2:", "\tret", "", "Lookup:", "\tret"]
+        funcs = split_functions(lines)
+        assert [(f.name, f.instruction_count) for f in funcs] == [("square(int)", 2), ("Lookup", 1)]
+
+    def test_cycles_summed_per_function(self):
+        lines = LISTING_O2.splitlines()
+        funcs = split_functions(lines, {2: 3, 3: 1, 4: 1, 7: 1})
+        assert funcs[0].total_cycles == 5
+        assert funcs[1].total_cycles == 1
+
+    def test_blank_separator_trimmed(self):
+        funcs = split_functions(LISTING_O2.splitlines())
+        assert funcs[0].end == 4
+
+    def test_is_instruction_line(self):
+        assert is_instruction_line("\tret")
+        assert not is_instruction_line("foo:")
+        assert not is_instruction_line("\t.p2align 4")
+        assert not is_instruction_line("# comment")
+
+    def test_line_anchors(self):
+        lines = LISTING_O2.splitlines()
+        anchors = line_anchors(lines, {1: 2, 2: 2, 3: 3, 6: 6, 7: 6})
+        assert anchors[:4] == [("square(int)", 0, 0), ("square(int)", 2, 0), ("square(int)", 2, 1), ("square(int)", 3, 0)]
+        assert anchors[5:] == [("main", 0, 0), ("main", 6, 0), ("main", 6, 1)]
+        # Inserting code above leaves the anchors of later lines unchanged
+        shifted = line_anchors(["\tnop"] + lines, {2: 2, 3: 2, 4: 3, 7: 6, 8: 6})
+        assert shifted[1:] == anchors
+
+
+class TestNormalize:
+    def test_comments_and_whitespace_stripped(self):
+        assert normalize_instructions(["\tmov\teax, edi\t# tmp84"]) == ["mov eax, edi"]
+
+    def test_local_labels_renamed_by_first_use(self):
+        a = normalize_instructions(["\tjle\t.L6", "\tjmp\t.L9", "\tjne\t.L6"])
+        b = normalize_instructions(["\tjle\t.L2", "\tjmp\t.L3", "\tjne\t.L2"])
+        assert a == b == ["jle .L0", "jmp .L1", "jne .L0"]
+
+    def test_diff_counts(self):
+        assert diff_counts(["a", "b", "c"], ["a", "c", "d"]) == (1, 1)
+        assert diff_counts([], ["x"]) == (1, 0)
+
+    def test_diff_counts_past_cap_counts_everything(self):
+        a = [f"mov r{i}" for i in range(MAX_DIFF_EDITS)]
+        b = [f"add r{i}" for i in range(MAX_DIFF_EDITS)]
+        assert diff_counts(a + ["ret"], b + ["ret"]) == (MAX_DIFF_EDITS + 1, MAX_DIFF_EDITS + 1)
+
+
+class TestCompareListings:
+    def test_per_function_comparison(self):
+        mapping_a = {3: 1, 4: 1, 5: 2, 6: 2, 7: 2}
+        mapping_b = {1: 2, 2: 2, 3: 2}
+        result = compare_listings(LISTING_O0, {5: 3}, mapping_a, LISTING_O2, {2: 3}, mapping_b)
+        by_name = {f.name: f for f in result}
+        sq = by_name["square(int)"]
+        assert (sq.instructions_a, sq.instructions_b) == (5, 3)
+        assert (sq.cycles_a, sq.cycles_b) == (3, 3)
+        assert sq.removed > 0
+        assert sq.line_deltas == {1: (2, 0)}
+        main = by_name["main"]
+        assert (main.added, main.removed) == (1, 1)
+        assert main.only_in is None
+
+    def test_function_only_in_one_listing(self):
+        result = compare_listings("foo:\n\tret", {}, {}, "bar:\n\tret", {}, {})
+        assert [(f.name, f.only_in) for f in result] == [("foo", "a"), ("bar", "b")]
+
+
+class TestMyers:
+    def test_identical(self):
+        assert myers_matches([1, 2, 3], [1, 2, 3]) == [(0, 0), (1, 1), (2, 2)]
+
+    def test_insert_and_delete(self):
+        a, b = list("abcabba"), list("cbabac")
+        matches = myers_matches(a, b)
+        # Longest common subsequence of the classic Myers example has length 4
+        assert len(matches) == 4
+        assert all(a[i] == b[j] for i, j in matches)
+
+    def test_empty_sides(self):
+        assert myers_matches([], [1, 2]) == []
+        assert myers_matches([1, 2], []) == []
+
+    def test_max_edits(self):
+        assert myers_matches([1, 2, 3], [1, 4, 3], max_edits=2) == [(0, 0), (2, 2)]
+        assert myers_matches([1, 2, 3], [4, 5, 6], max_edits=2) is None
+        assert line_matches(["a", "b"], ["a", "x", "b"], max_edits=1) == [(0, 0), (1, 2)]
+
+
+class TestDiffListings:
+    OLD = "square(int):\n\tmov\teax, edi\n\tjmp\t.L3\n\tret\n\nhelper:\n\tret"
+    NEW = "square(int):\n\tmov\teax, edi\n\timul\teax, eax\n\tjmp\t.L7\n\tret\n\nfresh:\n\tret"
+
+    def test_per_function_status(self):
+        diff = diff_listings(self.OLD, {}, self.NEW, {})
+        status = {f.name: f.status for f in diff.functions}
+        assert status == {"square(int)": "changed", "fresh": "added", "helper": "removed"}
+
+    def test_added_lines_point_into_new_listing(self):
+        diff = diff_listings(self.OLD, {}, self.NEW, {})
+        square = diff.functions[0]
+        # Renumbered local label (.L3 -> .L7) is not a change
+        assert square.added_lines == [2]
+        assert square.removed_lines == []
+        assert diff.added_lines == {2, 7}
+
+    def test_cycle_change_without_code_change(self):
+        diff = diff_listings("f:\n\tret", {2: 1}, "f:\n\tret", {2: 5})
+        assert diff.functions[0].status == "changed"
+        assert (diff.functions[0].cycles_before, diff.functions[0].cycles_after) == (1, 5)
+
+    def test_too_different_is_replaced(self):
+        old = "f:\n" + "\n".join(f"\tmov\tr{i}, 1" for i in range(MAX_DIFF_EDITS))
+        new = "f:\n" + "\n".join(f"\tadd\tr{i}, 1" for i in range(MAX_DIFF_EDITS))
+        entry = diff_listings(old, {}, new, {}).functions[0]
+        assert entry.status == "replaced"
+        assert entry.added_lines == list(range(1, MAX_DIFF_EDITS + 1))
+        assert len(entry.removed_lines) == MAX_DIFF_EDITS
+
+    def test_unchanged(self):
+        diff = diff_listings(self.OLD, {}, self.OLD, {})
+        assert diff.changed == []
@@ -0,0 +1,133 @@
+"""
+Unit tests for headless batch analysis (localbolt analyze).
+Compilation is mocked — no real compilers needed.
+"""
+import csv
+import io
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from localbolt.batch import (
+    FileReport, FunctionReport, analyze_file, analyze_many, collect_sources,
+    run_analyze, write_csv, write_json,
+)
+from localbolt.compiler.driver import CompilerDriver
+from localbolt.parsing.locations import SourceLocations
+
+LISTING = "square(int):\n\tmov\teax, edi\n\timul\teax, eax\n\tret\n\nmain:\n\txor\teax, eax\n\tret"
+
+
+@pytest.fixture
+def src_tree(tmp_path):
+    (tmp_path / "hot").mkdir()
+    (tmp_path / "hot" / "a.cpp").write_text("int a() { return 1; }\n")
+    (tmp_path / "hot" / "b.rs").write_text("fn b() {}\n")
+    (tmp_path / "hot" / "notes.txt").write_text("not code\n")
+    (tmp_path / "c.cc").write_text("int c() { return 3; }\n")
+    return tmp_path
+
+
+class TestCollectSources:
+    def test_recursive_glob_filters_unsupported(self, src_tree):
+        sources = collect_sources([str(src_tree / "**" / "*")])
+        names = sorted(Path(p).name for p in sources)
+        assert names == ["a.cpp", "b.rs", "c.cc"]
+
+    def test_plain_file(self, src_tree):
+        path = str(src_tree / "c.cc")
+        assert collect_sources([path, path]) == [path]
+
+    def test_compile_commands_entries(self, src_tree):
+        db = src_tree / "compile_commands.json"
+        db.write_text(json.dumps([
+            {"directory": str(src_tree), "file": "c.cc", "command": "g++ -Iinc -DFAST -O2 -c c.cc"},
+        ]))
+        assert collect_sources([], str(db)) == [str((src_tree / "c.cc").resolve())]
+
+    def test_database_flags_reach_the_compiler_once(self, src_tree):
+        # The database lives where the driver's own search would not find it
+        db = src_tree / "elsewhere" / "compile_commands.json"
+        db.parent.mkdir()
+        db.write_text(json.dumps([
+            {"directory": str(src_tree), "file": "c.cc", "command": "g++ -std=c++17 -DFAST -c c.cc"},
+        ]))
+        [path] = collect_sources([], str(db))
+        with patch.object(CompilerDriver, "compile", autospec=True, return_value=("", "error")) as compile:
+            report = analyze_file(path, ["-O2"], compile_db=str(db))
+        driver = compile.call_args[0][0]
+        command = driver._build_command(path, ["-O2"])
+        assert command.count("-DFAST") == 1 and command.count("-std=c++17") == 1
+        assert report.flags == ["-O2"]
+
+
+class TestAnalyzeFile:
+    def test_per_function_report(self, src_tree):
+        path = str(src_tree / "c.cc")
+        with patch("localbolt.compiler.driver.CompilerDriver.compile", return_value=("raw", "")):
+            with patch("localbolt.compiler.driver.CompilerDriver.analyze_perf", return_value=""):
+                with patch("localbolt.engine.process_assembly", return_value=(LISTING, {1: 1, 2: 2}, LISTING, SourceLocations())):
+                    report = analyze_file(path, ["-O2"])
+        assert report.ok
+        assert report.flags == ["-O2"]
+        assert [(f.name, f.instructions, f.source_line) for f in report.functions] == [
+            ("square(int)", 3, 1), ("main", 2, None),
+        ]
+
+    def test_compile_error_reported(self, src_tree):
+        path = str(src_tree / "c.cc")
+        with patch("localbolt.compiler.driver.CompilerDriver.compile", return_value=("", "c.cc:1:1: error: nope")):
+            report = analyze_file(path, [])
+        assert not report.ok
+        assert "nope" in report.error
+
+    def test_analyze_many_in_process_keeps_order(self, src_tree):
+        sources = [str(src_tree / "c.cc"), str(src_tree / "hot" / "a.cpp")]
+        with patch("localbolt.batch.analyze_file", side_effect=lambda p, f, db: FileReport(file=p, flags=f)) as mock:
+            reports = analyze_many(sources, ["-O3"], jobs=1)
+        assert [r.file for r in reports] == sources
+        assert reports[0].flags == ["-O3"]
+        assert mock.call_count == 2
+
+
+class TestWriters:
+    REPORTS = [
+        FileReport("a.cpp", ["-O2"], [FunctionReport("f(int)", 3, 5, 1), FunctionReport("g", 1, 1)]),
+        FileReport("b.cpp", [], error="b.cpp:1:1: error: boom\nmore"),
+    ]
+
+    def test_json_round_trips(self):
+        out = io.StringIO()
+        write_json(self.REPORTS, out)
+        data = json.loads(out.getvalue())
+        assert data[0]["functions"][0] == {"name": "f(int)", "instructions": 3, "cycles": 5, "source_line": 1}
+        assert data[1]["error"].startswith("b.cpp")
+
+    def test_csv_one_row_per_function(self):
+        out = io.StringIO()
+        write_csv(self.REPORTS, out)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert rows[0][:4] == ["file", "function", "instructions", "cycles"]
+        assert rows[1][:4] == ["a.cpp", "f(int)", "3", "5"]
+        assert rows[3][0] == "b.cpp" and rows[3][-1] == "b.cpp:1:1: error: boom"
+
+
+class TestRunAnalyze:
+    def test_no_sources_is_an_error(self, tmp_path, capsys):
+        assert run_analyze([str(tmp_path / "*.cpp")]) == 1
+
+    def test_writes_output_file(self, src_tree):
+        out = src_tree / "report.csv"
+        fake = [FileReport(str(src_tree / "c.cc"), [], [FunctionReport("c()", 2, 2)])]
+        with patch("localbolt.batch.analyze_many", return_value=fake) as mock:
+            code = run_analyze([str(src_tree / "c.cc"), "--flags=-O2 -march=native", "-o", str(out)])
+        assert code == 0
+        assert mock.call_args[0][1] == ["-O2", "-march=native"]
+        assert "c()" in out.read_text()
+
+    def test_failure_sets_exit_code(self, src_tree, capsys):
+        fake = [FileReport(str(src_tree / "c.cc"), [], error="boom")]
+        with patch("localbolt.batch.analyze_many", return_value=fake):
+            assert run_analyze([str(src_tree / "c.cc")]) == 1
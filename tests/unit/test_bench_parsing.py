@@ -0,0 +1,74 @@
+"""
+Tests for the parsing benchmark helpers (benchmarks/bench_parsing.py):
+corpus scaling and baseline comparison.
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BENCH = Path(__file__).resolve().parents[2] / "benchmarks" / "bench_parsing.py"
+spec = importlib.util.spec_from_file_location("bench_parsing", BENCH)
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+MCA = """Iterations:        100
+
+Instruction Info:
+[1]: #uOps
+
+[1]    [2]    [3]    [4]    [5]    [6]    Instructions:
+ 1      1     0.50                        add	eax, 1
+ 1      5     0.50    *                   mov	eax, dword ptr [rdi]
+
+
+Resources:
+"""
+
+
+class TestScaling:
+    def test_scale_lines_cuts_and_repeats(self):
+        assert bench.scale_lines("a\nb\nc\n", 2) == "a\nb\n"
+        assert bench.scale_lines("a\nb\n", 5) == "a\nb\na\nb\na\n"
+
+    def test_scale_mca_repeats_instruction_rows(self):
+        scaled = bench.scale_mca(MCA, 5)
+        stats = bench.parse_mca_output(scaled)
+        assert len(stats) == 5
+        assert [stats[i].latency for i in range(5)] == [1, 5, 1, 5, 1]
+        assert "Resources:" in scaled
+
+
+class TestCompare:
+    def test_reports_time_and_memory_regressions(self):
+        before = {"a/gcc/1000": bench.Result(0.010, 0, 0, 100.0), "b/gcc/1000": bench.Result(0.010, 0, 0, 100.0)}
+        after = {"a/gcc/1000": bench.Result(0.012, 0, 0, 100.0), "b/gcc/1000": bench.Result(0.0105, 0, 0, 150.0)}
+        messages = bench.compare(before, after, threshold=10)
+        assert messages == [
+            "a/gcc/1000: time 10.0ms -> 12.0ms",
+            "b/gcc/1000: peak 100KiB -> 150KiB",
+        ]
+
+    def test_new_cases_are_ignored(self):
+        assert bench.compare({}, {"a/gcc/1000": bench.Result(1.0, 0, 0, 1.0)}, threshold=10) == []
+
+    def test_baseline_round_trip(self, tmp_path):
+        results = {"a/gcc/1000": bench.Result(0.5, 2000.0, 1.5, 64.0)}
+        path = tmp_path / "baseline.json"
+        bench.save_results(results, str(path))
+        assert bench.load_results(str(path)) == results
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        path.write_text('{"version": 99, "results": {}}')
+        with pytest.raises(ValueError):
+            bench.load_results(str(path))
+
+
+def test_recorded_corpora_build_cases():
+    cases = bench.build_cases([100])
+    assert "clean_assembly_with_mapping/gcc/100" in cases
+    assert "parse_mca_output/gcc/100" in cases
+    assert "parse_diagnostics/gcc/100" in cases
+    for case in cases.values():
+        case.fn()
@@ -0,0 +1,50 @@
+"""
+Tests for the end-to-end refresh benchmark (benchmarks/bench_refresh.py)
+and its stand-in toolchain (benchmarks/fake_toolchain.py).
+"""
+import io
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parents[2] / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+
+import bench_refresh  # noqa: E402
+import fake_toolchain  # noqa: E402
+
+
+class TestFakeToolchain:
+    def test_compiler_writes_recorded_asm_and_depfile(self, tmp_path, monkeypatch):
+        recorded = tmp_path / "recorded.s"
+        recorded.write_text("main:\n\tret\n")
+        monkeypatch.setenv("LOCALBOLT_FAKE_ASM", str(recorded))
+        out, dep = tmp_path / "out.s", tmp_path / "out.d"
+        assert fake_toolchain.run("g++", ["-S", "-O2", "a.cpp", "-MD", "-MF", str(dep), "-o", str(out)]) == 0
+        assert out.read_text() == "main:\n\tret\n"
+        assert dep.exists()
+
+    def test_mca_replays_report(self, tmp_path, monkeypatch, capsys):
+        report = tmp_path / "mca.txt"
+        report.write_text("Instruction Info:\n")
+        monkeypatch.setenv("LOCALBOLT_FAKE_MCA", str(report))
+        monkeypatch.setattr(sys, "stdin", io.StringIO("ret\n"))
+        assert fake_toolchain.run("llvm-mca", ["-mcpu=znver3"]) == 0
+        assert capsys.readouterr().out == "Instruction Info:\n"
+
+    def test_install_writes_executable_launchers(self, tmp_path):
+        fake_toolchain.install(tmp_path)
+        for tool in fake_toolchain.TOOLS:
+            launcher = tmp_path / tool
+            assert launcher.stat().st_mode & 0o111
+            assert launcher.read_text().startswith(f"#!{sys.executable}")
+
+
+class TestSummary:
+    def test_median_p95_max(self):
+        samples = [{"ui": float(ms)} for ms in range(1, 21)]
+        assert bench_refresh.summarize(samples)["ui"] == {"median": 10.5, "p95": 19.0, "max": 20.0}
+
+    def test_compare_flags_slower_median(self):
+        before = {"ui": {"median": 100.0, "p95": 0, "max": 0}, "read": {"median": 0.1, "p95": 0, "max": 0}}
+        after = {"ui": {"median": 150.0, "p95": 0, "max": 0}, "read": {"median": 0.5, "p95": 0, "max": 0}}
+        assert bench_refresh.compare(before, after, threshold=20) == ["ui: median 100.0ms -> 150.0ms"]
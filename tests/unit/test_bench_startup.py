@@ -0,0 +1,48 @@
+"""
+Tests for the CLI startup benchmark (benchmarks/bench_startup.py). The
+forbidden-module budgets are checked here too since they do not depend
+on machine speed.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[2] / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+
+import bench_startup  # noqa: E402
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |       2620 | localbolt.main
+import time:      9000 |       9000 |     textual.app
+"""
+
+
+def test_parse_importtime():
+    assert bench_startup.parse_importtime(IMPORTTIME + "usage: localbolt\n") == {
+        "_io": 120, "localbolt.main": 2500, "textual.app": 9000,
+    }
+
+
+def test_check_budget_reports_forbidden_and_slow():
+    scenario = bench_startup.Scenario(["--help"], budget_ms=10)
+    result = bench_startup.Result(wall_ms=30, import_ms=12, modules=3, forbidden=["textual.app"])
+    messages = bench_startup.check_budget("help", scenario, result)
+    assert any("textual.app" in m for m in messages)
+    assert any("over budget" in m for m in messages)
+
+
+def test_compare_flags_import_growth():
+    before = {"help": bench_startup.Result(50, 30, 70)}
+    assert bench_startup.compare(before, {"help": bench_startup.Result(55, 33, 70)}, 20) == []
+    assert bench_startup.compare(before, {"help": bench_startup.Result(90, 60, 300)}, 20)
+
+
+@pytest.mark.parametrize("name", ["help", "missing-file", "query-no-daemon"])
+def test_light_paths_skip_heavy_modules(name):
+    result = bench_startup.run_scenario(bench_startup.SCENARIOS[name], repeat=1)
+    assert result.modules > 0
+    assert result.forbidden == []
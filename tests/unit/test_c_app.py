@@ -18,15 +18,24 @@ from __future__ import annotations
 import importlib
 import sys
 import tempfile
+import threading
 import types
 from dataclasses import dataclass, field
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from rich.console import Console
 from rich.text import Text
 from textual.widgets import Static, TextArea
 
+from localbolt.parsing.perf_parser import line_cycle_counts as _real_line_cycle_counts
+from localbolt.parsing.asm_diff import FlagComparison, FunctionComparison, diff_listings
+from localbolt.parsing.functions import split_functions
+from localbolt.parsing.hotspots import HotSpot, SourceCost
+from localbolt.parsing.listing_filter import parse_filter
+from localbolt.parsing.locations import SourceLocations
+
 
 # ────────────────────────────────────────────────────────────
 # Fake state/engine matching main branch interfaces
@@ -53,8 +62,16 @@ class FakeState:
     source_lines: list = field(default_factory=list)
     asm_content: str = "push rbp\nmov rbp, rsp\nret"
     asm_mapping: dict = field(default_factory=dict)
+    source_locations: SourceLocations = field(default_factory=SourceLocations)
     perf_stats: dict = field(default_factory=dict)
     raw_mca_output: str = ""
+    functions: list = field(default_factory=list)
+    hot_lines: list = field(default_factory=list)
+    hot_functions: list = field(default_factory=list)
+    source_costs: dict = field(default_factory=dict)
+    target_cpus: list = field(default_factory=list)
+    cpu_perf_stats: dict = field(default_factory=dict)
+    asm_diff: object = None
     compiler_output: str = ""
     diagnostics: list = field(default_factory=list)
     last_update: float = 0.0
@@ -81,9 +98,14 @@ class FakeEngine:
     def __init__(self, source_file: str):
         self.state = FakeState(source_path=source_file)
         self.on_update_callback = None
+        self.user_flags = []
+        self.target_cpus = []
+        self.last_timings = None
+        self.recorded_stages = []
         self._started = False
         self._refreshed = False
         self._stopped = False
+        self.refresh_threads = []
 
     def start(self):
         self._started = True
@@ -95,9 +117,55 @@ class FakeEngine:
 
     def refresh(self):
         self._refreshed = True
+        self.refresh_threads.append(threading.current_thread())
         if self.on_update_callback:
             self.on_update_callback(self.state)
 
+    def record_stage(self, name, ms):
+        self.recorded_stages.append(name)
+
+    def set_target_cpus(self, cpus):
+        self.target_cpus = cpus
+        self.refresh()
+
+    def set_flags(self, flags):
+        self.user_flags = flags
+        self.refresh()
+
+    def compare_flags(self, flags_a, flags_b):
+        return FlagComparison(flags_a, flags_b, functions=[
+            FunctionComparison("main", instructions_a=4, instructions_b=2, cycles_a=6, cycles_b=2, added=1, removed=3),
+        ])
+
+
+class FakeWorkspace:
+    """Mimics localbolt.workspace.Workspace: one FakeEngine per file."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.engines = {p: FakeEngine(p) for p in self.paths}
+        self.active = self.paths[0]
+        self.on_update_callback = None
+        self.activated = []
+        self.refreshed = []
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+        self.on_update_callback(self.engines[self.active].state)
+
+    def stop(self):
+        self.stopped = True
+
+    def activate(self, path):
+        self.active = path
+        self.activated.append(path)
+        self.on_update_callback(self.engines[path].state)
+
+    def refresh(self, path=None):
+        self.refreshed.append(path)
+        self.on_update_callback(self.engines[path or self.active].state)
+
 
 class FakeFileWatcher:
     def start_watching(self, *a, **k):
@@ -125,6 +193,7 @@ def _inject_fakes(engine_instance=None):
     pp_mod = types.ModuleType("localbolt.parsing.perf_parser")
     pp_mod.InstructionStats = FakeInstructionStats
     pp_mod.parse_mca_output = MagicMock(return_value={})
+    pp_mod.line_cycle_counts = _real_line_cycle_counts
 
     # --- localbolt.parsing.diagnostics ---
     diag_mod = types.ModuleType("localbolt.parsing.diagnostics")
@@ -407,6 +476,102 @@ class TestEngineIntegration:
             cleanup()
             Path(tmp).unlink(missing_ok=True)
 
+    @pytest.mark.asyncio
+    async def test_huge_error_output_is_capped(self):
+        """Megabytes of template errors must not all land in the TextArea."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.diagnostics = [FakeDiagnostic(severity="error", message="boom")]
+        engine.state.compiler_output = "\n".join(f"a.cpp:{i}:1: note: candidate" for i in range(50_000))
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp, _MAX_ERROR_VIEW_LINES
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                error_view = pilot.app.query_one("#error-view", TextArea)
+                assert error_view.document.line_count == _MAX_ERROR_VIEW_LINES + 1
+                assert error_view.text.endswith(f"… {50_000 - _MAX_ERROR_VIEW_LINES} more lines")
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_failed_build_keeps_stale_listing(self):
+        """A failed rebuild keeps the last good listing, marks it stale and overlays the diagnostics."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "main:\n\tpush\trbp\n\tmov\teax, 1\n\tret"
+        engine.state.asm_mapping = {1: 1, 2: 2, 3: 2}
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                await pilot.press("j", "j")
+                widgets = list(app._line_widgets)
+                engine.state.diagnostics = [FakeDiagnostic(severity="error", message="expected ';'", line=2)]
+                engine.state.compiler_output = "a.cpp:2:9: error: expected ';'"
+                engine.refresh()
+                await pilot.pause()
+                assert app._line_widgets == widgets and app._cursor == 2
+                assert pilot.app.query_one("#asm-container-outer").has_class("stale")
+                assert pilot.app.query_one("#diagnostics-bar", Static).display is True
+                assert pilot.app.query_one("#error-view", TextArea).display is False
+                assert app._diag_marks == {2: "error", 3: "error"}
+                assert "error: expected ';'" in app._render_line(2).plain
+                assert "expected ';'" not in app._render_line(3).plain
+                await pilot.press("e")
+                await pilot.pause()
+                assert pilot.app.query_one("#error-view", TextArea).display is True
+
+                # The fix compiles to the same listing: marks go, nothing is re-mounted
+                engine.state.diagnostics = []
+                engine.refresh()
+                await pilot.pause()
+                assert app._line_widgets == widgets
+                assert not pilot.app.query_one("#asm-container-outer").has_class("stale")
+                assert pilot.app.query_one("#error-view", TextArea).display is False
+                assert app._diag_marks == {}
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_cursor_follows_instruction_across_edits(self):
+        """An edit above the cursor shifts the listing; the cursor stays on its instruction and unchanged lines keep their widgets."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.source_lines = ["int f() {", "  return 1;", "}", "int g() {", "  return 2;", "}"]
+        engine.state.asm_content = "f:\n\tmov\teax, 1\n\tret\ng:\n\tmov\teax, 2\n\tret"
+        engine.state.asm_mapping = {1: 2, 2: 3, 4: 5, 5: 6}
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp, AsmLine
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                await pilot.press("j", "j", "j", "j")
+                assert app._cursor == 4
+                g_widgets = app._line_widgets[3:]
+
+                # A new line in f() adds an instruction and moves g() down one source line
+                engine.state.source_lines = ["int f() {", "  int x = 0;", "  return 1;", "}", "int g() {", "  return 2;", "}"]
+                engine.state.asm_content = "f:\n\txor\tecx, ecx\n\tmov\teax, 1\n\tret\ng:\n\tmov\teax, 2\n\tret"
+                engine.state.asm_mapping = {1: 2, 2: 3, 3: 4, 5: 6, 6: 7}
+                engine.refresh()
+                await pilot.pause()
+                assert app._cursor == 5
+                assert app._asm_lines[app._cursor] == "\tmov\teax, 2"
+                assert app._line_widgets[4:] == g_widgets
+                assert app._line_widgets[5].has_class("cursor")
+                assert not any(w.has_class("cursor") for i, w in enumerate(app._line_widgets) if i != 5)
+                assert len(pilot.app.query(AsmLine)) == 7
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
     @pytest.mark.asyncio
     async def test_assembly_mode_when_no_errors(self):
         """When state has no errors, AsmLine widgets should be visible, error-view hidden."""
@@ -487,6 +652,348 @@ class TestEngineIntegration:
             cleanup()
             Path(tmp).unlink(missing_ok=True)
 
+    @pytest.mark.asyncio
+    async def test_symbol_picker_jumps_to_function(self):
+        """'s' opens the picker; typing filters the outline (j/k go to the input) and Enter jumps to the label."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        lines = ["main:", "\tcall\tjoin_keys()", "\tret", "", "join_keys():", "\tret", "", "square(int):", "\timul\tedi, edi", "\tret"]
+        engine.state.asm_content = "\n".join(lines)
+        engine.state.functions = split_functions(lines)
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.symbol_picker import SymbolPicker
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                await pilot.press("s")
+                await pilot.pause()
+                picker = pilot.app.query_one("#symbol-palette", SymbolPicker)
+                assert picker.display is True
+                assert [f.name for f in picker._matches] == ["main", "join_keys()", "square(int)"]
+                await pilot.press("j", "k")
+                await pilot.pause()
+                assert app._cursor == 0
+                assert [f.name for f in picker._matches] == ["join_keys()"]
+                await pilot.press("backspace", "backspace", "s", "q", "enter")
+                await pilot.pause()
+                assert picker.display is False
+                assert app._cursor == 7
+                assert app._line_widgets[7].has_class("cursor")
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_hotspot_panel_ranks_and_jumps(self):
+        """'h' lists the costliest functions; tab switches to source lines, Enter jumps, focus goes back to the listing."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "f:\n\timul\teax, edi\n\tret\ng:\n\tdiv\tecx\n\tret"
+        engine.state.source_lines = ["int f(int x) { return x * x; }", "int g(int x) { return 7 / x; }"]
+        engine.state.hot_functions = [HotSpot("g", 0, 3, 2, 30, 6.0), HotSpot("f", 0, 0, 2, 4, 1.0)]
+        engine.state.hot_lines = [HotSpot("g", 2, 4, 2, 30, 6.0), HotSpot("f", 1, 1, 2, 4, 1.0)]
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.hotspot_view import HotSpotPanel
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                await pilot.press("h")
+                await pilot.pause()
+                panel = pilot.app.query_one("#hotspot-panel", HotSpotPanel)
+                assert panel.display is True and [s.function for s in panel.rows] == ["g", "f"]
+                await pilot.press("tab", "j")
+                await pilot.pause()
+                assert panel.rows[panel._selected].source_line == 1
+                assert app._cursor == 0
+                await pilot.press("enter")
+                await pilot.pause()
+                assert panel.display is False and app._cursor == 1
+                await pilot.press("j")
+                await pilot.pause()
+                assert app._cursor == 2
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_source_cost_pane_follows_cursor(self):
+        """'v' shows the annotated source beside the listing; it tracks the cursor's line, and siblings come from its reverse index."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "f:\n\timul\teax, edi\n\tadd\teax, 1\n\tret"
+        engine.state.source_lines = ["int f(int x) {", "  return x * x + 1;", "}"]
+        engine.state.asm_mapping = {1: 2, 2: 2, 3: 3}
+        engine.state.source_costs = {2: SourceCost([1, 2], 2, 4), 3: SourceCost([3], 1, 1)}
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.source_costs import SourceCostPane
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                pane = pilot.app.query_one("#source-costs", SourceCostPane)
+                assert pane.display is False
+                await pilot.press("v", "j")
+                await pilot.pause()
+                assert pane.display is True and pane._current == 2
+                assert app._sibling_lines == {2}
+                assert "2    2      4 │   return x * x + 1;" in pane._render_row(2).plain
+                assert pane._render_row(1).plain.split() == ["1", "│", "int", "f(int", "x)", "{"]
+                await pilot.press("j", "j")
+                await pilot.pause()
+                assert pane._current == 3 and app._sibling_lines == set()
+                await pilot.press("v")
+                assert pane.display is False
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_filter_shows_matching_function_only(self):
+        """'/' filters the listing without touching the line widgets; the cursor skips hidden lines and a jump into them clears the filter."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        asm = ["helper:", "\tmov\teax, 1", "\tret", "kernel:", "\timul\teax, edi", "\tret", "tail:", "\tret"]
+        engine.state.asm_content = "\n".join(asm)
+        engine.state.functions = split_functions(asm)
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.listing_view import FilteredListing
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                widgets = list(app._line_widgets)
+                await pilot.press("slash", *"kern", "enter")
+                await pilot.pause()
+                filtered = pilot.app.query_one("#asm-filtered", FilteredListing)
+                assert filtered.visible and list(filtered._rows) == [3, 4, 5]
+                assert app._cursor == 3 and app._line_widgets == widgets
+                assert filtered.render_line(0).text.startswith("▶ kernel:")
+                assert "3 of 8 lines" in pilot.app.query_one("#asm-container-outer").border_title
+                await pilot.press("j", "j", "j")
+                await pilot.pause()
+                assert app._cursor == 5
+                await pilot.press("k")
+                assert app._cursor == 4
+
+                await pilot.press("slash", "backspace", "backspace", "backspace", "backspace", *"min:x", "enter")
+                await pilot.pause()
+                assert pilot.app.query_one("#filter-error", Static).display is True
+                await pilot.press("escape")
+
+                app._jump_to(6)
+                await pilot.pause()
+                assert app._filter == parse_filter("") and not filtered.visible and app._cursor == 6
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_resize_reflows_without_rerender(self):
+        """The cycle gutter is right-aligned at paint time; a resize re-renders no line."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "imul eax, edi\nret"
+        engine.state.perf_stats = {0: FakeInstructionStats(latency=3), 1: FakeInstructionStats(latency=1)}
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp, AsmLine
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                widgets = list(app._line_widgets)
+                with patch.object(app, "_apply_line") as apply_line:
+                    await pilot.resize_terminal(80, 40)
+                    await pilot.pause()
+                assert not apply_line.called and app._line_widgets == widgets
+
+                row = app._render_line(0)
+                for width in (80, 50):
+                    painted = Console(width=width).render_lines(row, pad=False)[0]
+                    text = "".join(segment.text for segment in painted)
+                    assert text.startswith("▶ imul eax, edi") and text.rstrip().endswith("3")
+                    assert len(text.rstrip()) == width - 8
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+
+    @pytest.mark.asyncio
+    async def test_cpu_columns_highlight_deltas(self):
+        """With per-CPU stats, each line gets one cycle column per CPU."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "imul eax, edi\nret"
+        engine.state.cpu_perf_stats = {
+            "skylake": {0: FakeInstructionStats(latency=3), 1: FakeInstructionStats(latency=1)},
+            "znver3": {0: FakeInstructionStats(latency=4), 1: FakeInstructionStats(latency=1)},
+        }
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                assert app._cpu_cycles == {"skylake": {1: 3, 2: 1}, "znver3": {1: 4, 2: 1}}
+                gutter = app._render_cpu_gutter(1)
+                assert gutter.plain.split() == ["3", "4"]
+                # The znver3 delta is styled, the reference column is not
+                assert any("bold" in str(span.style) for span in gutter.spans)
+                assert not any("bold" in str(span.style) for span in app._render_cpu_gutter(2).spans)
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+
+    @pytest.mark.asyncio
+    async def test_compare_flags_shows_panel(self):
+        """Submitting 'A | B' in the compare palette shows the per-function table."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.compare_view import ComparisonPanel
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                await pilot.press("x")
+                await pilot.press(*"-O2", "enter")
+                await app.workers.wait_for_complete()
+                await pilot.pause()
+                panel = pilot.app.query_one("#compare-panel", ComparisonPanel)
+                assert panel.display is True
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+
+    @pytest.mark.asyncio
+    async def test_diff_marks_added_lines_and_label(self):
+        """Lines added since the previous save get a '+' gutter; the function label gets a summary."""
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.state.asm_content = "main:\n\tpush\trbp\n\tmov\teax, 1\n\tret"
+        engine.state.asm_diff = diff_listings("main:\n\tpush\trbp\n\tret", {}, engine.state.asm_content, {})
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                assert app._diff_added == {2}
+                assert app._render_line(2).plain.startswith("+ ")
+                assert "+1 -0" in app._render_line(0).plain
+                await pilot.press("d")
+                await pilot.pause()
+                assert not app._render_line(2).plain.startswith("+ ")
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+
+    @pytest.mark.asyncio
+    async def test_timing_hud_shows_stages(self):
+        """The UI populate time is reported back to the engine and 't' shows the HUD."""
+        from localbolt.utils.timing import RefreshTimings
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        engine.last_timings = RefreshTimings(stages=[("compile", 120.0), ("mca", 40.0), ("refresh", 170.0)])
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                assert "ui" in engine.recorded_stages
+                hud = pilot.app.query_one("#perf-hud", Static)
+                assert hud.display is False
+                await pilot.press("t")
+                await pilot.pause()
+                assert hud.display is True
+                rendered = str(hud.render())
+                assert "compile 120.0ms" in rendered and "refresh" not in rendered
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+
+    @pytest.mark.asyncio
+    async def test_flag_change_refreshes_off_the_ui_thread(self):
+        tmp = _make_tmp_cpp()
+        engine = FakeEngine(tmp)
+        fakes, cleanup = _inject_fakes(engine_instance=engine)
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.flags_palette import FlagsPopup
+            app = LocalBoltApp(source_file=tmp)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                engine.refresh_threads.clear()
+                pilot.app.post_message(FlagsPopup.FlagsChanged("-O1 -march=native"))
+                await pilot.pause()
+                await pilot.app.workers.wait_for_complete()
+                assert engine.user_flags == ["-O1", "-march=native"]
+                assert engine.refresh_threads and threading.main_thread() not in engine.refresh_threads
+        finally:
+            cleanup()
+            Path(tmp).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_workspace_target_change_goes_through_workspace(self):
+        tmp_a, tmp_b = _make_tmp_cpp(), _make_tmp_cpp()
+        fakes, cleanup = _inject_fakes()
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from localbolt.ui.flags_palette import CpuTargetsPopup
+            workspace = FakeWorkspace([tmp_a, tmp_b])
+            app = LocalBoltApp(source_file=tmp_a, workspace=workspace)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                pilot.app.post_message(CpuTargetsPopup.TargetsChanged(["znver4"]))
+                await pilot.pause()
+                engine = workspace.engines[tmp_a]
+                assert engine.target_cpus == ["znver4"]
+                assert workspace.refreshed == [None]
+                assert not engine._refreshed
+        finally:
+            cleanup()
+            Path(tmp_a).unlink(missing_ok=True)
+            Path(tmp_b).unlink(missing_ok=True)
+
+    @pytest.mark.asyncio
+    async def test_workspace_tabs_switch_active_engine(self):
+        """Workspace mode shows one tab per file; ']' activates the next file's engine."""
+        tmp_a, tmp_b = _make_tmp_cpp(), _make_tmp_cpp()
+        fakes, cleanup = _inject_fakes()
+        try:
+            from localbolt.ui.app import LocalBoltApp
+            from textual.widgets import Tabs
+            workspace = FakeWorkspace([tmp_a, tmp_b])
+            workspace.engines[tmp_a].state.asm_content = "push rbp\nret"
+            workspace.engines[tmp_b].state.asm_content = "imul eax, edi\nadd eax, 1\nret"
+            app = LocalBoltApp(source_file=tmp_a, workspace=workspace)
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.pause()
+                assert workspace.started
+                assert len(pilot.app.query_one("#file-tabs", Tabs).query("Tab")) == 2
+                assert len(pilot.app.query("AsmLine")) == 2
+                await pilot.press("]")
+                await pilot.pause()
+                assert pilot.app.engine is workspace.engines[tmp_b]
+                assert workspace.activated == [tmp_b]
+                assert len(pilot.app.query("AsmLine")) == 3
+            assert workspace.stopped
+        finally:
+            cleanup()
+            Path(tmp_a).unlink(missing_ok=True)
+            Path(tmp_b).unlink(missing_ok=True)
+
 
 # ────────────────────────────────────────────────────────────
 # Source Peek tests
@@ -0,0 +1,110 @@
+"""
+Tests for header dependency tracking: depfile parsing (compiler/depfile.py),
+the drivers' depfile flags, and FileWatcher/AssemblyUpdateHandler
+following the dependency set (utils/watcher.py).
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+from watchdog.events import FileModifiedEvent
+
+from localbolt.compiler.depfile import parse_depfile, read_depfile
+from localbolt.compiler.driver import CompilerDriver
+from localbolt.compiler.rust_driver import RustCompilerDriver
+from localbolt.utils.watcher import AssemblyUpdateHandler, FileWatcher
+
+
+class TestParseDepfile:
+    def test_gcc_rule_with_continuations(self):
+        text = "/tmp/out.s: main.cpp include/vec.h \\\n  /abs/util.h\n"
+        assert parse_depfile(text, "/proj") == ["/proj/main.cpp", "/proj/include/vec.h", "/abs/util.h"]
+
+    def test_rustc_phony_rules_and_dedupe(self):
+        text = "/tmp/out.s: src/main.rs src/m.rs\n\nsrc/main.rs:\nsrc/m.rs:\n"
+        assert parse_depfile(text, "/proj") == ["/proj/src/main.rs", "/proj/src/m.rs"]
+
+    def test_escaped_spaces_and_dollars(self):
+        text = "out.s: my\\ dir/a.h cost$$.h\n"
+        assert parse_depfile(text, "/p") == ["/p/my dir/a.h", "/p/cost$.h"]
+
+    def test_missing_file_is_none(self, tmp_path):
+        assert read_depfile(str(tmp_path / "nope.d")) is None
+
+
+class TestDriverDepfiles:
+    def test_cpp_driver_requests_user_headers_in_same_compile(self):
+        with patch("shutil.which", return_value="/usr/bin/g++"):
+            driver = CompilerDriver()
+            with patch("subprocess.run") as mock_run:
+                mock_run.return_value = MagicMock(returncode=1, stderr="err")
+                driver.compile("test.cpp", [])
+                cmd = mock_run.call_args[0][0]
+        assert "-MMD" in cmd
+        assert cmd[cmd.index("-MF") + 1].endswith(".d")
+        assert driver.last_dependencies is None  # nothing written by the mock
+
+    def test_cpp_driver_reads_depfile(self, tmp_path):
+        header = tmp_path / "k.h"
+        header.write_text("#define K 3\n")
+        source = tmp_path / "a.cpp"
+        source.write_text('#include "k.h"\nint f() { return K; }\n')
+        driver = CompilerDriver()
+        driver.set_compiler("g++")
+        asm, _ = driver.compile(str(source), [])
+        assert asm
+        assert str(header) in driver.last_dependencies
+
+    def test_rust_driver_emits_dep_info(self):
+        with patch("shutil.which", return_value="/usr/bin/rustc"):
+            driver = RustCompilerDriver()
+            with patch("subprocess.run") as mock_run:
+                mock_run.return_value = MagicMock(returncode=1, stderr="err")
+                driver.compile("test.rs", [])
+                cmd = mock_run.call_args[0][0]
+        assert any(arg.startswith("dep-info=") and arg.endswith(".d") for arg in cmd)
+
+
+class TestDependencyWatching:
+    def test_header_change_delivers_source_path(self, tmp_path):
+        source, header = tmp_path / "a.cpp", tmp_path / "inc" / "k.h"
+        header.parent.mkdir()
+        source.write_text("int f();\n")
+        header.write_text("#define K 3\n")
+        calls = []
+        handler = AssemblyUpdateHandler(str(source), calls.append, quiet_period=0.05)
+        handler.set_dependencies([str(header)])
+        header.write_text("#define K 4\n")
+        handler.on_modified(FileModifiedEvent(str(header)))
+        time.sleep(0.2)
+        assert calls == [str(source.resolve())]
+
+    def test_dropped_dependency_is_ignored(self, tmp_path):
+        source, header = tmp_path / "a.cpp", tmp_path / "k.h"
+        source.write_text("int f();\n")
+        header.write_text("#define K 3\n")
+        calls = []
+        handler = AssemblyUpdateHandler(str(source), calls.append, quiet_period=0.05)
+        handler.set_dependencies([str(header)])
+        handler.set_dependencies([])
+        header.write_text("#define K 4\n")
+        handler.on_modified(FileModifiedEvent(str(header)))
+        time.sleep(0.2)
+        assert calls == []
+
+    def test_watches_follow_dependency_directories(self, tmp_path):
+        source = tmp_path / "src" / "a.cpp"
+        inc_a, inc_b = tmp_path / "inc_a" / "a.h", tmp_path / "inc_b" / "b.h"
+        for path in (source, inc_a, inc_b):
+            path.parent.mkdir()
+            path.write_text("\n")
+        watcher = FileWatcher()
+        watcher.start_watching(str(source), lambda p: None)
+        try:
+            watcher.update_dependencies([str(inc_a)])
+            assert set(watcher.watches) == {str(source.parent), str(inc_a.parent)}
+            src_watch = watcher.watches[str(source.parent)]
+            watcher.update_dependencies([str(inc_b)])
+            assert set(watcher.watches) == {str(source.parent), str(inc_b.parent)}
+            assert watcher.watches[str(source.parent)] is src_watch  # unchanged dirs are not re-registered
+        finally:
+            watcher.stop_watching()
@@ -2,8 +2,15 @@
 Unit tests for diagnostics parsing.
 Ensures both GCC/Clang and Rust compiler error formats are handled.
 """
+import json
+from unittest.mock import MagicMock, patch
+
 import pytest
-from localbolt.parsing.diagnostics import parse_diagnostics, Diagnostic
+from localbolt.compiler.driver import CompilerDriver, probe_json_diagnostics
+from localbolt.compiler.rust_driver import RustCompilerDriver
+from localbolt.parsing.diagnostics import (
+    MAX_MESSAGE_CHARS, MAX_NOTES, Diagnostic, DiagnosticParser, parse_compiler_output, parse_diagnostics,
+)
 
 
 class TestParseDiagnosticsCpp:
@@ -63,27 +70,35 @@ class TestParseDiagnosticsCpp:
 
 
 class TestParseDiagnosticsRust:
-    """Test parsing of rustc-style error output.
-    
-    rustc format:   error[E0308]: mismatched types
-                     --> src/main.rs:5:10
-    
-    This format does NOT match the GCC pattern, so we expect 0 results.
-    This documents current behavior — Rust diagnostics may need a separate parser.
-    """
-
-    def test_rustc_errors_not_parsed_by_gcc_pattern(self):
-        """rustc native format is not matched — documents the gap."""
-        stderr = (
-            "error[E0308]: mismatched types\n"
-            " --> src/main.rs:5:10\n"
-            "  |\n"
-            "5 |     let x: i32 = \"hello\";\n"
-            "  |                  ^^^^^^^ expected `i32`, found `&str`\n"
-        )
-        result = parse_diagnostics(stderr)
-        # Current parser doesn't handle rustc format — this is expected
-        assert len(result) == 0
+    """Test parsing of rustc-style error output (header line, then a --> span)."""
+
+    RUSTC = (
+        "error[E0308]: mismatched types\n"
+        " --> src/main.rs:5:10\n"
+        "  |\n"
+        "5 |     let x: i32 = \"hello\";\n"
+        "  |                  ^^^^^^^ expected `i32`, found `&str`\n"
+        "\n"
+        "note: function defined here\n"
+        " --> src/main.rs:1:4\n"
+        "warning: unused variable: `y`\n"
+        " --> src/main.rs:6:9\n"
+        "\n"
+        "error: aborting due to 1 previous error\n"
+    )
+
+    def test_rustc_spans_parsed(self):
+        result = parse_diagnostics(self.RUSTC)
+        assert [(d.severity, d.line, d.column) for d in result] == [("error", 5, 10), ("warning", 6, 9)]
+        assert result[0].code == "E0308"
+        assert result[0].file == "src/main.rs"
+
+    def test_rustc_child_note_grouped(self):
+        note = parse_diagnostics(self.RUSTC)[0].notes[0]
+        assert (note.message, note.line, note.column) == ("function defined here", 1, 4)
+
+    def test_rustc_summary_without_span_dropped(self):
+        assert not any("aborting" in d.message for d in parse_diagnostics(self.RUSTC))
 
     def test_rustc_with_gcc_style_line(self):
         """If rustc ever emits gcc-style lines, they should parse."""
@@ -93,6 +108,205 @@ class TestParseDiagnosticsRust:
         assert result[0].line == 5
 
 
+class TestDiagnosticGrouping:
+    """Notes, backtraces, de-duplication, caps and the source-file filter."""
+
+    TEMPLATE_ERROR = (
+        "a.cpp: In instantiation of 'void f(T) [with T = int]':\n"
+        "a.cpp:10:6:   required from here\n"
+        "a.cpp:5:3: error: no match for 'operator+'\n"
+        "    5 |   t + s;\n"
+        "      |   ~~^~~\n"
+        "In file included from /usr/include/c++/12/string:53,\n"
+        "                 from a.cpp:1:\n"
+        "/usr/include/c++/12/bits/basic_string.h:3375:5: note: candidate: 'operator+(...)'\n"
+        "a.cpp:7:1: warning: no return statement\n"
+    )
+
+    def test_notes_attach_to_primary(self):
+        error, warning = parse_diagnostics(self.TEMPLATE_ERROR)
+        assert error.severity == "error" and warning.severity == "warning"
+        assert [n.message for n in error.notes] == ["required from here", "candidate: 'operator+(...)'"]
+        assert error.notes[1].file == "/usr/include/c++/12/bits/basic_string.h"
+        assert warning.notes == []
+
+    def test_header_diagnostic_keeps_include_chain(self):
+        stderr = (
+            "In file included from main.cpp:2:\n"
+            "util.h:4:7: error: redefinition of 'int g'\n"
+        )
+        (error,) = parse_diagnostics(stderr)
+        assert error.file == "util.h"
+        assert [(n.file, n.line) for n in error.notes] == [("main.cpp", 2)]
+
+    def test_duplicates_dropped(self):
+        line = "a.cpp:3:1: error: expected ';'\n"
+        assert len(parse_diagnostics(line * 50)) == 1
+
+    def test_fatal_error_is_error(self):
+        (d,) = parse_diagnostics("a.cpp:1:10: fatal error: missing.h: No such file or directory\n")
+        assert d.severity == "error"
+
+    def test_cap_keeps_first_error(self):
+        warnings = "".join(f"a.cpp:{i}:1: warning: w{i}\n" for i in range(1, 20))
+        parser = DiagnosticParser(max_diagnostics=5)
+        for line in (warnings + "a.cpp:99:1: error: boom\n").splitlines():
+            parser.feed(line)
+        result = parser.finish()
+        assert len(result) == 6 and result[-1].severity == "error"
+        assert parser.dropped == 14
+
+    def test_notes_and_messages_are_capped(self):
+        notes = "".join(f"a.cpp:{i}:1: note: candidate {i}\n" for i in range(100))
+        (d,) = parse_diagnostics("a.cpp:1:1: error: " + "x" * 10_000 + "\n" + notes)
+        assert len(d.notes) == MAX_NOTES
+        assert len(d.message) == MAX_MESSAGE_CHARS
+
+    def test_source_filter_drops_header_warnings_only(self, tmp_path):
+        source = str(tmp_path / "a.cpp")
+        stderr = (
+            f"{source}:3:1: warning: mine\n"
+            "/usr/include/x.h:9:1: warning: theirs\n"
+            "/usr/include/y.h:2:1: error: broken header\n"
+        )
+        result = parse_diagnostics(stderr, source_path=source)
+        assert [d.message for d in result] == ["mine", "broken header"]
+
+    def test_accepts_line_iterables(self):
+        assert len(parse_diagnostics(iter(["a.cpp:1:1: error: x\n", "a.cpp:2:1: error: y\n"]))) == 2
+
+
+def _gcc_location(line, column, file="a.cpp"):
+    return {"file": file, "line": line, "column": column, "byte-column": column, "display-column": column}
+
+
+def _rust_span(line, start, end, primary=True, label=None, replacement=None):
+    return {"file_name": "src/main.rs", "line_start": line, "line_end": line, "column_start": start,
+            "column_end": end, "is_primary": primary, "label": label, "suggested_replacement": replacement}
+
+
+class TestJsonDiagnostics:
+    """GCC -fdiagnostics-format=json and rustc --error-format=json output."""
+
+    GCC = json.dumps([
+        {"kind": "error", "message": "no match for 'operator+'", "option": "",
+         "locations": [{"caret": _gcc_location(7, 12), "finish": _gcc_location(7, 18)}],
+         "children": [{"kind": "note", "message": "candidate: 'f(int)'",
+                       "locations": [{"caret": _gcc_location(2, 5, "a.h")}], "children": []}],
+         "fixits": [{"start": _gcc_location(7, 19), "next": _gcc_location(7, 19), "string": ";"}]},
+        {"kind": "warning", "message": "unused variable 'x'", "option": "-Wunused-variable",
+         "locations": [{"caret": _gcc_location(3, 9)}], "children": []},
+    ]) + "\ncompilation terminated.\n"
+
+    RUSTC = "".join(json.dumps(entry) + "\n" for entry in [
+        {"$message_type": "diagnostic", "message": "unused variable: `x`", "level": "warning",
+         "code": {"code": "unused_variables", "explanation": None},
+         "spans": [_rust_span(2, 9, 10)],
+         "children": [{"message": "if this is intentional, prefix it with an underscore", "level": "help",
+                       "spans": [_rust_span(2, 9, 10, replacement="_x")], "children": []}],
+         "rendered": "warning: unused variable: `x`\n"},
+        {"$message_type": "diagnostic", "message": "mismatched types", "level": "error",
+         "code": {"code": "E0308", "explanation": "..."},
+         "spans": [_rust_span(5, 18, 21, label="expected `i32`, found `&str`"),
+                   _rust_span(5, 12, 15, primary=False, label="expected due to this")],
+         "children": [], "rendered": "error[E0308]: mismatched types\n"},
+        {"$message_type": "diagnostic", "message": "aborting due to 1 previous error", "level": "error",
+         "code": None, "spans": [], "children": [], "rendered": "error: aborting due to 1 previous error\n"},
+    ])
+
+    def test_gcc_ranges_children_and_fixits(self):
+        error, warning = parse_diagnostics(self.GCC)
+        assert (error.file, error.line, error.column, error.end_line, error.end_column) == ("a.cpp", 7, 12, 7, 18)
+        assert [n.message for n in error.notes] == ["candidate: 'f(int)'", "fix-it: insert ';'"]
+        assert error.notes[0].file == "a.h"
+        assert warning.code == "-Wunused-variable"
+        assert (warning.end_line, warning.end_column) == (3, 9)
+
+    def test_rustc_spans_labels_and_children(self):
+        warning, error = parse_diagnostics(self.RUSTC)
+        assert warning.code == "unused_variables"
+        assert warning.notes[0].message == "if this is intentional, prefix it with an underscore: `_x`"
+        assert (error.line, error.column, error.end_column, error.code) == (5, 18, 20, "E0308")
+        assert [(n.message, n.column) for n in error.notes] == [
+            ("expected `i32`, found `&str`", 18), ("expected due to this", 12)]
+
+    def test_rustc_spanless_error_kept_only_without_others(self):
+        only = json.dumps({"message": "unknown codegen option: `foo`", "level": "error", "code": None,
+                           "spans": [], "children": [], "rendered": "error: unknown codegen option: `foo`\n"})
+        assert [d.message for d in parse_diagnostics(only + "\n")] == ["unknown codegen option: `foo`"]
+
+    def test_compiler_output_is_rendered(self):
+        _, text = parse_compiler_output(self.GCC)
+        assert text.splitlines() == [
+            "a.cpp:7:12: error: no match for 'operator+'",
+            "  a.h:2:5: note: candidate: 'f(int)'",
+            "  a.cpp:7:19: note: fix-it: insert ';'",
+            "a.cpp:3:9: warning: unused variable 'x' [-Wunused-variable]",
+            "compilation terminated.",
+        ]
+        _, text = parse_compiler_output(self.RUSTC)
+        assert text.startswith("warning: unused variable: `x`\nerror[E0308]")
+
+    def test_text_output_is_returned_unchanged(self):
+        stderr = "a.cpp:1:1: error: x\n"
+        assert parse_compiler_output(stderr) == ([Diagnostic(1, 1, "error", "x", "a.cpp")], stderr)
+
+    def test_malformed_json_falls_back_to_text(self):
+        (d,) = parse_diagnostics('{"truncated\na.cpp:4:2: error: real one\n')
+        assert (d.line, d.message) == (4, "real one")
+
+    def test_json_entries_share_caps_and_dedupe(self):
+        entry = {"kind": "error", "message": "same", "locations": [{"caret": _gcc_location(1, 1)}]}
+        assert len(parse_diagnostics(json.dumps([entry] * 50))) == 1
+
+
+class TestDriverJsonDiagnostics:
+    """The drivers request JSON diagnostics where the toolchain supports them."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_probe_cache(self):
+        probe_json_diagnostics.cache_clear()
+        yield
+        probe_json_diagnostics.cache_clear()
+
+    def _gcc_command(self, probe_stderr, config=None):
+        with patch("shutil.which", return_value="/usr/bin/g++"):
+            driver = CompilerDriver(config)
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr=probe_stderr)
+            command = driver._build_command("test.cpp", [])
+        return command, mock_run.call_count
+
+    def test_gcc_probe_enables_json(self):
+        command, probes = self._gcc_command("[]\n")
+        assert "-fdiagnostics-format=json" in command and probes == 1
+
+    def test_compiler_without_json_gets_text(self):
+        command, _ = self._gcc_command("clang: error: invalid value 'json'")
+        assert "-fdiagnostics-format=json" not in command
+
+    def test_config_can_force_text(self):
+        config = MagicMock()
+        config.get.side_effect = lambda key, default=None: "text" if key == "diagnostics_format" else default
+        command, probes = self._gcc_command("[]\n", config)
+        assert "-fdiagnostics-format=json" not in command and probes == 0
+
+    def test_probe_runs_once_per_compiler(self):
+        # Across drivers too: batch analysis builds one per file
+        with patch("shutil.which", return_value="/usr/bin/g++"):
+            drivers = [CompilerDriver(), CompilerDriver()]
+        with patch("subprocess.run", return_value=MagicMock(returncode=0, stderr="[]")) as mock_run:
+            assert all(driver.json_diagnostics() for driver in drivers for _ in range(2))
+        assert mock_run.call_count == 1
+
+    def test_rustc_requests_json_unless_user_chose(self):
+        with patch("shutil.which", return_value="/usr/bin/rustc"):
+            driver = RustCompilerDriver()
+        assert "--error-format=json" in driver._build_command([])
+        command = driver._build_command(["--error-format=short"])
+        assert "--error-format=json" not in command and "--error-format=short" in command
+
+
 class TestDiagnosticDataclass:
     """Test the Diagnostic dataclass itself."""
 
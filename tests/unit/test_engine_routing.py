@@ -9,9 +9,15 @@ import os
 from pathlib import Path
 from unittest.mock import patch, MagicMock, PropertyMock
 from localbolt.engine import BoltEngine
+from localbolt.parsing.locations import SourceLocations
 from localbolt.utils.lang import Language
 
 
+def _identity_process_assembly(asm, *args, with_locations=False, **kwargs):
+    """process_assembly stand-in that passes the compiler output through as the listing."""
+    return (asm, {}, asm, SourceLocations()) if with_locations else (asm, {}, asm)
+
+
 def _make_temp_file(suffix: str, content: str = "") -> str:
     """Create a temp file with the given suffix and return its path."""
     f = tempfile.NamedTemporaryFile(suffix=suffix, delete=False, mode="w")
@@ -70,7 +76,7 @@ class TestEngineRefresh:
             with patch.object(engine.driver, "compile", return_value=("push rbp\nret", "")):
                 with patch.object(engine.driver, "analyze_perf", return_value=""):
                     with patch("localbolt.engine.process_assembly") as mock_pa:
-                        mock_pa.return_value = ("clean", {}, "mangled")
+                        mock_pa.return_value = ("clean", {}, "mangled", SourceLocations())
                         engine.refresh()
                         # Should be called with language="cpp"
                         mock_pa.assert_called_once()
@@ -88,7 +94,7 @@ class TestEngineRefresh:
             with patch.object(engine.driver, "compile", return_value=("push rbp\nret", "")):
                 with patch.object(engine.driver, "analyze_perf", return_value=""):
                     with patch("localbolt.engine.process_assembly") as mock_pa:
-                        mock_pa.return_value = ("clean", {}, "mangled")
+                        mock_pa.return_value = ("clean", {}, "mangled", SourceLocations())
                         engine.refresh()
                         mock_pa.assert_called_once()
                         call_args = mock_pa.call_args
@@ -119,7 +125,7 @@ class TestEngineRefresh:
             engine.on_update_callback = callback
             with patch.object(engine.driver, "compile", return_value=("push rbp", "")):
                 with patch.object(engine.driver, "analyze_perf", return_value=""):
-                    with patch("localbolt.engine.process_assembly", return_value=("c", {}, "m")):
+                    with patch("localbolt.engine.process_assembly", return_value=("c", {}, "m", SourceLocations())):
                         engine.refresh()
                         callback.assert_called_once()
         finally:
@@ -135,6 +141,30 @@ class TestEngineRefresh:
         finally:
             os.unlink(path)
 
+    def test_concurrent_refreshes_run_one_at_a_time(self):
+        import threading
+        import time
+        path = _make_temp_file(".cpp", "int main() {}")
+        try:
+            engine = BoltEngine(path)
+            running, overlaps = [], []
+
+            def pipeline():
+                running.append(1)
+                overlaps.append(len(running))
+                time.sleep(0.05)
+                running.pop()
+
+            with patch.object(engine, "_run_pipeline", side_effect=pipeline):
+                threads = [threading.Thread(target=engine.refresh) for _ in range(3)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+            assert overlaps == [1, 1, 1]
+        finally:
+            os.unlink(path)
+
     def test_set_flags_triggers_refresh(self):
         path = _make_temp_file(".cpp", "int main() {}")
         try:
@@ -145,3 +175,122 @@ class TestEngineRefresh:
                 mock_refresh.assert_called_once()
         finally:
             os.unlink(path)
+
+
+class TestEngineTargetCpus:
+    """Test per-CPU llvm-mca comparison."""
+
+    def test_set_target_cpus_triggers_refresh(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        try:
+            engine = BoltEngine(path)
+            with patch.object(engine, "refresh") as mock_refresh:
+                engine.set_target_cpus(["skylake", "znver3"])
+                assert engine.target_cpus == ["skylake", "znver3"]
+                mock_refresh.assert_called_once()
+        finally:
+            os.unlink(path)
+
+    def test_refresh_runs_mca_once_per_cpu(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        mca = "Instruction Info:\n[0]: {1, 0.50, 0.50, 0.00,  - }     ret\n"
+        try:
+            engine = BoltEngine(path)
+            engine.target_cpus = ["skylake", "znver3"]
+            with patch.object(engine.driver, "compile", return_value=("ret", "")):
+                with patch.object(engine.driver, "analyze_perf", return_value=mca) as mock_mca:
+                    with patch("localbolt.engine.process_assembly", return_value=("ret", {}, "ret", SourceLocations())):
+                        engine.refresh()
+            cpus = sorted(str(c.kwargs.get("mcpu")) for c in mock_mca.call_args_list)
+            assert cpus == ["None", "skylake", "znver3"]
+            assert engine.state.target_cpus == ["skylake", "znver3"]
+            assert engine.state.cpu_perf_stats["znver3"][0].latency == 1
+        finally:
+            os.unlink(path)
+
+    def test_no_target_cpus_leaves_comparison_empty(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        try:
+            engine = BoltEngine(path)
+            with patch.object(engine.driver, "compile", return_value=("ret", "")):
+                with patch.object(engine.driver, "analyze_perf", return_value="") as mock_mca:
+                    with patch("localbolt.engine.process_assembly", return_value=("ret", {}, "ret", SourceLocations())):
+                        engine.refresh()
+            mock_mca.assert_called_once_with("ret")
+            assert engine.state.cpu_perf_stats == {}
+        finally:
+            os.unlink(path)
+
+
+class TestEngineCompareFlags:
+    """Test compiling two flag sets side by side."""
+
+    def test_compare_flags_compiles_both_sets(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        outputs = {
+            ("-O0",): "main:\n\tpush\trbp\n\tmov\teax, 0\n\tpop\trbp\n\tret",
+            ("-O2",): "main:\n\txor\teax, eax\n\tret",
+        }
+        try:
+            engine = BoltEngine(path)
+            compile_mock = lambda src, user_flags=[]: (outputs[tuple(user_flags)], "")
+            with patch.object(engine.driver, "compile", side_effect=compile_mock):
+                with patch.object(engine.driver, "analyze_perf", return_value=""):
+                    with patch("localbolt.engine.process_assembly", side_effect=_identity_process_assembly):
+                        result = engine.compare_flags(["-O0"], ["-O2"])
+            assert result.ok
+            assert [f.name for f in result.functions] == ["main"]
+            assert result.functions[0].instructions_a == 4
+            assert result.functions[0].instructions_b == 2
+            # The active flags are untouched
+            assert engine.user_flags == []
+        finally:
+            os.unlink(path)
+
+    def test_analyze_flags_leaves_state_alone(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        try:
+            engine = BoltEngine(path)
+            with patch.object(engine.driver, "compile", return_value=("main:\n\txor\teax, eax\n\tret", "")):
+                with patch.object(engine.driver, "analyze_perf", return_value=""):
+                    with patch("localbolt.engine.process_assembly", side_effect=_identity_process_assembly):
+                        state = engine.analyze_flags(["-O2"])
+            assert [(f.name, f.instruction_count) for f in state.functions] == [("main", 2)]
+            assert state.user_flags == ["-O2"]
+            assert engine.user_flags == [] and engine.state.asm_content == ""
+        finally:
+            os.unlink(path)
+
+    def test_compare_flags_reports_compile_errors(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        try:
+            engine = BoltEngine(path)
+            with patch.object(engine.driver, "compile", return_value=("", "error: bad flag")):
+                result = engine.compare_flags(["-O2"], ["-Obogus"])
+            assert not result.ok
+            assert "bad flag" in result.errors_b
+            assert result.functions == []
+        finally:
+            os.unlink(path)
+
+
+class TestEngineSaveDiff:
+    """Test the diff between consecutive refreshes."""
+
+    def test_second_refresh_diffs_against_first(self):
+        path = _make_temp_file(".cpp", "int main() {}")
+        listings = iter(["main:\n\tret", "main:\n\txor\teax, eax\n\tret"])
+        try:
+            engine = BoltEngine(path)
+            with patch.object(engine.driver, "compile", side_effect=lambda *a, **k: (next(listings), "")):
+                with patch.object(engine.driver, "analyze_perf", return_value=""):
+                    with patch("localbolt.engine.process_assembly", side_effect=_identity_process_assembly):
+                        engine.refresh()
+                        assert engine.state.asm_diff is None
+                        engine.refresh()
+            assert engine.state.previous_asm_content == "main:\n\tret"
+            diff = engine.state.asm_diff
+            assert [f.status for f in diff.functions] == ["changed"]
+            assert diff.added_lines == {1}
+        finally:
+            os.unlink(path)
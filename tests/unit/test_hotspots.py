@@ -0,0 +1,84 @@
+"""
+Unit tests for the per-source-line and per-function cost ranking.
+"""
+from localbolt.parsing.functions import split_functions
+from localbolt.parsing.hotspots import line_costs, rank_hotspots, source_costs
+from localbolt.parsing.perf_parser import InstructionStats, line_cycle_counts, mca_instruction_lines
+
+LISTING = [
+    "square(int):",
+    "\timul\tedi, edi",
+    "\tmov\teax, edi",
+    "\tret",
+    "",
+    "divide(int, int):",
+    "\tmov\teax, edi",
+    "\txor\tedx, edx",
+    "\tidiv\tesi",
+    "\tret",
+]
+# Instruction index -> stats; idiv dominates
+STATS = {
+    0: InstructionStats(3, 1.0, 1.0),
+    1: InstructionStats(1, 1.0, 0.25),
+    2: InstructionStats(1, 1.0, 1.0),
+    3: InstructionStats(1, 1.0, 0.25),
+    4: InstructionStats(1, 1.0, 0.5),
+    5: InstructionStats(26, 10.0, 6.0),
+    6: InstructionStats(1, 1.0, 1.0),
+}
+MAPPING = {1: 1, 2: 1, 3: 1, 6: 3, 7: 4, 8: 4, 9: 5}
+
+
+def _rank(stats=STATS):
+    instr_lines = mca_instruction_lines(LISTING)
+    functions = split_functions(LISTING, line_cycle_counts(LISTING, stats, instr_lines))
+    return rank_hotspots(line_costs(len(LISTING), instr_lines, stats), instr_lines, stats, MAPPING, functions)
+
+
+class TestRankHotspots:
+    def test_instruction_lines_skip_labels(self):
+        assert list(mca_instruction_lines(LISTING)) == [1, 2, 3, 6, 7, 8, 9]
+
+    def test_line_costs(self):
+        latency, throughput = line_costs(len(LISTING), mca_instruction_lines(LISTING), STATS)
+        assert list(latency) == [0, 3, 1, 1, 0, 0, 1, 1, 26, 1]
+        assert throughput[8] == 6.0 and throughput[0] == 0.0
+
+    def test_functions_ranked_by_latency(self):
+        _, functions = _rank()
+        assert [(f.function, f.total_latency, f.max_throughput) for f in functions] == [
+            ("divide(int, int)", 29, 6.0), ("square(int)", 5, 1.0),
+        ]
+        assert functions[0].asm_line == 5 and functions[0].instructions == 4
+
+    def test_source_lines_ranked_with_jump_target(self):
+        lines, _ = _rank()
+        top = lines[0]
+        assert (top.function, top.source_line, top.instructions, top.total_latency) == ("divide(int, int)", 4, 2, 27)
+        assert top.asm_line == 7
+        assert [spot.source_line for spot in lines] == [4, 1, 5, 3]
+
+    def test_ties_broken_by_throughput(self):
+        stats = {idx: InstructionStats(1, 1.0, 2.0 if idx == 6 else 0.5) for idx in range(7)}
+        lines, _ = _rank(stats)
+        # Lines 3 and 5 both cost one cycle; ret (line 5) has the worse reciprocal throughput
+        assert [spot.source_line for spot in lines] == [1, 4, 5, 3]
+
+    def test_no_estimates(self):
+        assert _rank({}) == ([], [])
+
+
+class TestSourceCosts:
+    def test_reverse_index_with_totals(self):
+        instr_lines = mca_instruction_lines(LISTING)
+        latency, _ = line_costs(len(LISTING), instr_lines, STATS)
+        costs = source_costs(latency, instr_lines, MAPPING)
+        assert sorted(costs) == [1, 3, 4, 5]
+        assert costs[1].asm_lines == [1, 2, 3] and (costs[1].instructions, costs[1].cycles) == (3, 5)
+        assert costs[4].asm_lines == [7, 8] and costs[4].cycles == 27
+
+    def test_mapped_labels_are_not_instructions(self):
+        instr_lines = mca_instruction_lines(LISTING)
+        costs = source_costs(line_costs(len(LISTING), instr_lines, {})[0], instr_lines, {0: 2, 1: 2})
+        assert costs[2].asm_lines == [0, 1] and (costs[2].instructions, costs[2].cycles) == (1, 0)
@@ -5,7 +5,7 @@ the Rust changes don't break C++ assembly cleaning.
 """
 import pytest
 import os
-from localbolt.parsing.lexer import clean_assembly_with_mapping
+from localbolt.parsing.lexer import clean_assembly_with_mapping, clean_assembly_with_locations
 
 
 class TestLexerEmptyInput:
@@ -151,6 +151,26 @@ _Z3foov:
         # Label should be there (possibly with underscore stripped on macOS)
         assert "foov:" in cleaned or "Z3foov:" in cleaned
 
+    def test_function_label_survives_local_labels(self):
+        """GCC -O2 puts .LVL/.LBB labels between the function label and its first instruction."""
+        asm = """
+    .file 1 "test.cpp"
+    .text
+_Z3foov:
+.LVL0:
+.LFB0:
+    .loc 1 1 0
+    imul edi, edi
+.LVL1:
+    ret
+"""
+        cleaned, _ = clean_assembly_with_mapping(asm, "test.cpp")
+        lines = cleaned.splitlines()
+        assert lines[0].endswith("Z3foov:")
+        assert ".LVL0:" not in cleaned
+        # Local labels after the first instruction are still kept
+        assert ".LVL1:" in cleaned
+
     def test_system_symbol_block_filtered(self):
         asm = """
     .file 1 "test.cpp"
@@ -233,6 +253,98 @@ main:
         assert 500 not in mapping.values()
 
 
+class TestLexerInlinedCode:
+    """keep_inlined: header code stays, costed on the main-file line it was inlined into."""
+
+    ASM = """
+    .file 1 "main.cpp"
+    .file 2 "/usr/include/vec.h"
+    .text
+main:
+    .loc 1 5 0
+    pushq %rbp
+    .loc 2 40 7
+    movl $42, %eax
+    .loc 1 6 0
+    ret
+_Z4axpyIiEvPT_:
+    .loc 2 12 0
+    imull %esi, %eax
+    ret
+"""
+
+    def test_inlined_code_kept_and_attributed(self):
+        cleaned, mapping, locations = clean_assembly_with_locations(self.ASM, "main.cpp")
+        lines = cleaned.splitlines()
+        mov = next(i for i, line in enumerate(lines) if "$42" in line)
+        assert mapping[mov] == 5
+        assert locations.lookup(mov) == (2, 40, 7, 0, 5)
+        assert locations.is_inlined(locations.lookup(mov))
+        assert locations.lookup(mov + 1) == (1, 6, 0, 0, 0)
+        assert locations.files == {1: "main.cpp", 2: "/usr/include/vec.h"}
+
+    def test_header_function_has_no_main_line(self):
+        # A template defined in the header: its code was not inlined into any main-file line
+        cleaned, mapping, locations = clean_assembly_with_locations(self.ASM, "main.cpp")
+        lines = cleaned.splitlines()
+        imul = next(i for i, line in enumerate(lines) if "imull" in line)
+        assert imul not in mapping
+        assert locations.lookup(imul) == (2, 12, 0, 0, 0)
+
+    def test_macos_block_label_keeps_call_site(self):
+        asm = """
+    .file 1 "main.cpp"
+    .file 2 "/usr/include/vec.h"
+    .text
+main:
+    .loc 1 5 0
+    pushq %rbp
+LBB0_1:
+    .loc 2 40 7
+    movl $42, %eax
+    ret
+"""
+        cleaned, mapping, locations = clean_assembly_with_locations(asm, "main.cpp")
+        lines = cleaned.splitlines()
+        mov = next(i for i, line in enumerate(lines) if "$42" in line)
+        # The block label is not a new function: the code is still inlined at line 5
+        assert mapping[mov] == 5
+        assert locations.lookup(mov).inlined_at == 5
+
+    def test_default_mapping_drops_inlined_code(self):
+        cleaned, mapping = clean_assembly_with_mapping(self.ASM, "main.cpp")
+        assert "$42" not in cleaned and "imull" not in cleaned
+
+    def test_three_part_file_paths_joined(self):
+        asm = """
+    .file 1 "/src" "main.rs"
+    .file 2 "/rustc/lib" "iter.rs"
+    .text
+main:
+    .loc 1 3 0
+    ret
+"""
+        _, _, locations = clean_assembly_with_locations(asm, "main.rs")
+        assert locations.files == {1: "/src/main.rs", 2: "/rustc/lib/iter.rs"}
+
+    def test_columns_and_discriminators(self):
+        asm = """
+    .file 1 "main.c"
+    .text
+main:
+    .loc 1 5 9 is_stmt 1 discriminator 3 view .LVU6
+    addl $1, %eax
+    .loc 1 5 20 view -0
+    imull %esi, %eax
+    ret
+"""
+        cleaned, _, locations = clean_assembly_with_locations(asm, "main.c")
+        lines = cleaned.splitlines()
+        add = next(i for i, line in enumerate(lines) if "addl" in line)
+        assert locations.lookup(add) == (1, 5, 9, 3, 0)
+        assert locations.lookup(add + 1) == (1, 5, 20, 0, 0)
+
+
 class TestLexerDataDirectives:
     """Test handling of data directives (.asciz, .string)."""
 
@@ -0,0 +1,64 @@
+"""
+Unit tests for the listing filter: parsing the filter text and which lines it keeps.
+"""
+import pytest
+
+from localbolt.parsing.functions import split_functions
+from localbolt.parsing.listing_filter import ListingFilter, parse_filter, visible_lines
+
+LISTING = [
+    "helper(int):",          # 0
+    "\tlea\teax, [rdi+1]",   # 1  src 1
+    "\tret",                 # 2  src 1
+    "",                      # 3
+    "kernel(int*, int):",    # 4
+    "\ttest\tesi, esi",      # 5  src 4
+    "\tjle\t.L4",            # 6  src 4
+    ".L3:",                  # 7
+    "\timul\teax, [rdi]",    # 8  src 5
+    "\tadd\trdi, 4",         # 9  src 5
+    "\tjne\t.L3",            # 10 src 5
+    ".L4:",                  # 11
+    "\tret",                 # 12 src 7
+]
+MAPPING = {1: 1, 2: 1, 5: 4, 6: 4, 8: 5, 9: 5, 10: 5, 12: 7}
+CYCLES = {6: 1, 7: 1, 9: 3, 10: 1, 11: 1, 13: 1}  # 1-based line numbers
+FUNCTIONS = split_functions(LISTING, CYCLES)
+
+
+def _shown(listing_filter):
+    mask = visible_lines(LISTING, FUNCTIONS, MAPPING, CYCLES, listing_filter)
+    return [idx for idx, shown in enumerate(mask) if shown]
+
+
+class TestParseFilter:
+    def test_terms(self):
+        assert parse_filter("kern* line:5-3 min:2") == ListingFilter(("kern*",), (3, 5), 2)
+        assert parse_filter("line:7").source_range == (7, 7)
+        assert not parse_filter("  ").active
+
+    def test_round_trip(self):
+        listing_filter = parse_filter("kernel line:4-5 min:3")
+        assert parse_filter(listing_filter.describe()) == listing_filter
+
+    @pytest.mark.parametrize("text", ["line:a-b", "min:-1", "min:x"])
+    def test_malformed(self, text):
+        with pytest.raises(ValueError):
+            parse_filter(text)
+
+
+class TestVisibleLines:
+    def test_no_filter_shows_everything(self):
+        assert _shown(ListingFilter()) == list(range(len(LISTING)))
+
+    def test_function_pattern(self):
+        assert _shown(ListingFilter(("KERNEL",))) == list(range(4, 13))
+        assert _shown(ListingFilter(("h*(int)",))) == [0, 1, 2]
+        assert _shown(ListingFilter(("nothing",))) == []
+
+    def test_source_range_keeps_labels_of_touched_functions(self):
+        assert _shown(ListingFilter(source_range=(5, 5))) == [4, 8, 9, 10]
+
+    def test_cold_blocks_hidden(self):
+        # helper has no cost; kernel's loop (.L3, 5 cycles) stays, its entry (2) and exit (1) blocks go
+        assert _shown(ListingFilter(min_cycles=3)) == [3, 4, 7, 8, 9, 10]
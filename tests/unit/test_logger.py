@@ -0,0 +1,93 @@
+"""
+Tests for the queue-backed engine logger (utils/logger.py).
+"""
+import logging
+import os
+import time
+from logging.handlers import QueueHandler
+
+import pytest
+
+from localbolt.utils import logger as logger_mod
+from localbolt.utils.logger import get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def fresh_logging():
+    shutdown_logging()
+    yield
+    shutdown_logging()
+
+
+def _log_path(log_dir):
+    return log_dir / f"localbolt-{os.getpid()}.log"
+
+
+class TestLogger:
+    def test_writes_per_process_file(self, tmp_path, fresh_logging):
+        setup_logging(str(tmp_path), "INFO")
+        get_logger("engine").info("refreshing %s", "a.cpp")
+        shutdown_logging()
+        text = _log_path(tmp_path).read_text()
+        assert "INFO" in text
+        assert "localbolt.engine: refreshing a.cpp" in text
+
+    def test_level_filters_debug(self, tmp_path, fresh_logging):
+        setup_logging(str(tmp_path), "INFO")
+        log = get_logger("engine")
+        log.debug("hidden")
+        log.warning("shown")
+        shutdown_logging()
+        text = _log_path(tmp_path).read_text()
+        assert "hidden" not in text
+        assert "shown" in text
+
+    def test_env_overrides_location(self, tmp_path, fresh_logging, monkeypatch):
+        monkeypatch.setenv("LOCALBOLT_LOG_DIR", str(tmp_path / "env"))
+        monkeypatch.setenv("LOCALBOLT_LOG_LEVEL", "DEBUG")
+        setup_logging()
+        get_logger().debug("from env")
+        shutdown_logging()
+        assert "from env" in _log_path(tmp_path / "env").read_text()
+
+    def test_setup_is_idempotent(self, tmp_path, fresh_logging):
+        setup_logging(str(tmp_path), "INFO")
+        setup_logging(str(tmp_path / "other"), "DEBUG")
+        handlers = logging.getLogger(logger_mod.LOGGER_NAME).handlers
+        assert sum(isinstance(h, QueueHandler) for h in handlers) == 1
+        assert not (tmp_path / "other").exists()
+
+    def test_prunes_old_session_logs(self, tmp_path, fresh_logging, monkeypatch):
+        monkeypatch.setattr(logger_mod, "_pid_alive", lambda pid: pid == 100001)
+        for i in range(logger_mod.KEEP_LOG_SESSIONS + 5):
+            for suffix in ("", ".1", ".2"):
+                old = tmp_path / f"localbolt-{100000 + i}.log{suffix}"
+                old.write_text("x")
+                os.utime(old, (time.time() - 1000 + i, time.time() - 1000 + i))
+        setup_logging(str(tmp_path), "INFO")
+        shutdown_logging()
+        pids = {p.name.split(".")[0] for p in tmp_path.glob("localbolt-*.log*")}
+        # Sessions are counted, not files: rotated backups don't crowd out other processes
+        assert len(pids) == logger_mod.KEEP_LOG_SESSIONS + 2
+        assert f"localbolt-{os.getpid()}" in pids
+        assert "localbolt-100001" in pids  # still running
+        assert not (tmp_path / "localbolt-100000.log.1").exists()
+
+    def test_prune_survives_files_vanishing(self, tmp_path, monkeypatch):
+        (tmp_path / "localbolt-100000.log").write_text("x")
+        real_stat = logger_mod.Path.stat
+
+        def stat(path, *args, **kwargs):
+            if path.name == "localbolt-100000.log":
+                raise FileNotFoundError(path)
+            return real_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(logger_mod.Path, "stat", stat)
+        logger_mod._prune_old_logs(tmp_path)
+
+    def test_unwritable_location_does_not_raise(self, tmp_path, fresh_logging):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        setup_logging(str(blocker / "logs"), "INFO")
+        get_logger("engine").error("dropped")
+        shutdown_logging()
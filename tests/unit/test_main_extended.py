@@ -119,3 +119,64 @@ class TestRunAssemblyHelp:
                 with pytest.raises(SystemExit) as exc_info:
                     run()
                 assert exc_info.value.code == 0
+
+
+class TestSubcommands:
+    """Test that subcommands bypass the TUI parser."""
+
+    def test_analyze_dispatches(self):
+        mock_analyze = MagicMock(return_value=0)
+        with patch("sys.argv", ["localbolt", "analyze", "src/*.cpp", "-o", "out.json"]):
+            with patch.dict("localbolt.main._SUBCOMMANDS", {"analyze": mock_analyze}):
+                with pytest.raises(SystemExit) as exc:
+                    run()
+        assert exc.value.code == 0
+        mock_analyze.assert_called_once_with(["src/*.cpp", "-o", "out.json"])
+
+
+class TestWorkspaceMode:
+    """Several files open as tabs in one process."""
+
+    def test_multiple_files_run_workspace(self, tmp_path):
+        a, b = tmp_path / "a.cpp", tmp_path / "b.rs"
+        a.write_text("int main() {}")
+        b.write_text("fn main() {}")
+        mock_workspace = MagicMock()
+        with patch("sys.argv", ["localbolt", str(a), str(b)]):
+            with patch("localbolt.main.run_workspace_tui", mock_workspace):
+                run()
+        mock_workspace.assert_called_once_with([str(a), str(b)])
+
+    def test_any_unsupported_file_rejected(self, tmp_path):
+        a, b = tmp_path / "a.cpp", tmp_path / "notes.txt"
+        a.write_text("int main() {}")
+        b.write_text("")
+        with patch("sys.argv", ["localbolt", str(a), str(b)]):
+            with patch("localbolt.main.run_workspace_tui") as mock_workspace:
+                with pytest.raises(SystemExit) as exc:
+                    run()
+        assert exc.value.code == 1
+        mock_workspace.assert_not_called()
+
+
+class TestDaemonMode:
+    """--connect hands the file to a running 'localbolt serve'."""
+
+    def test_connect_runs_remote_tui(self, tmp_path):
+        a = tmp_path / "a.cpp"
+        a.write_text("int main() {}")
+        with patch("sys.argv", ["localbolt", "--connect", "--socket", "/tmp/lb.sock", str(a)]):
+            with patch("localbolt.main.run_remote_tui") as mock_remote:
+                run()
+        mock_remote.assert_called_once_with(str(a), "/tmp/lb.sock")
+
+    def test_connect_takes_one_file(self, tmp_path):
+        a, b = tmp_path / "a.cpp", tmp_path / "b.cpp"
+        a.write_text("int main() {}")
+        b.write_text("int main() {}")
+        with patch("sys.argv", ["localbolt", "--connect", str(a), str(b)]):
+            with patch("localbolt.main.run_remote_tui") as mock_remote:
+                with pytest.raises(SystemExit) as exc:
+                    run()
+        assert exc.value.code == 1
+        mock_remote.assert_not_called()
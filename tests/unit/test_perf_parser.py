@@ -3,7 +3,7 @@ Extended edge case tests for the perf_parser (llvm-mca output parsing).
 Ensures both legacy and table formats work, and edge cases don't crash.
 """
 import pytest
-from localbolt.parsing.perf_parser import parse_mca_output, InstructionStats
+from localbolt.parsing.perf_parser import parse_mca_output, parse_mca_outputs, InstructionStats
 
 
 class TestParseMcaLegacyFormat:
@@ -115,3 +115,19 @@ class TestInstructionStats:
         s1 = InstructionStats(1, 0.5, 0.5)
         s2 = InstructionStats(2, 0.5, 0.5)
         assert s1 != s2
+
+
+class TestParseMcaMultiCpu:
+    """Test parse_mca_outputs (one report per target CPU)."""
+
+    def test_one_stat_set_per_cpu(self):
+        skylake = "Instruction Info:\n[0]: {3, 1.00, 1.00, 0.00,  - }     imul   eax, edi\n"
+        znver3 = "Instruction Info:\n[0]: {4, 1.00, 1.00, 0.00,  - }     imul   eax, edi\n"
+        stats = parse_mca_outputs({"skylake": skylake, "znver3": znver3})
+        assert list(stats) == ["skylake", "znver3"]
+        assert stats["skylake"][0].latency == 3
+        assert stats["znver3"][0].latency == 4
+
+    def test_failed_cpu_report_is_empty(self):
+        stats = parse_mca_outputs({"bogus": "llvm-mca error: unknown cpu", "none": None})
+        assert stats == {"bogus": {}, "none": {}}
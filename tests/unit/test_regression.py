@@ -0,0 +1,109 @@
+"""
+Unit tests for the baseline regression gate (localbolt check).
+"""
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from localbolt.batch import FileReport, FunctionReport
+from localbolt.regression import (
+    baseline_from_reports, compare_to_baseline, load_baseline, new_and_missing,
+    run_check, write_baseline,
+)
+
+
+def _reports(cycles_sq=10, instr_sq=4):
+    return [
+        FileReport("hot.cpp", [], [FunctionReport("sq(int)", instr_sq, cycles_sq), FunctionReport("main", 2, 2)]),
+        FileReport("broken.cpp", [], error="boom"),
+    ]
+
+
+class TestBaselineFormat:
+    def test_keys_are_file_and_function(self):
+        baseline = baseline_from_reports(_reports())
+        assert baseline == {"hot.cpp::sq(int)": (4, 10), "hot.cpp::main": (2, 2)}
+
+    def test_one_function_per_sorted_line(self, tmp_path):
+        out = io.StringIO()
+        write_baseline(baseline_from_reports(_reports()), out)
+        lines = out.getvalue().splitlines()
+        assert lines[1] == '"hot.cpp::main": [2, 2],'
+        assert lines[2] == '"hot.cpp::sq(int)": [4, 10]'
+        # Still valid JSON
+        path = tmp_path / "b.json"
+        path.write_text(out.getvalue())
+        assert load_baseline(str(path)) == {"hot.cpp::main": (2, 2), "hot.cpp::sq(int)": (4, 10)}
+
+    def test_empty_baseline_round_trips(self, tmp_path):
+        path = tmp_path / "b.json"
+        with open(path, "w") as f:
+            write_baseline({}, f)
+        assert load_baseline(str(path)) == {}
+
+    def test_unknown_version_rejected(self, tmp_path):
+        path = tmp_path / "b.json"
+        path.write_text(json.dumps({"version": 99, "functions": {}}))
+        with pytest.raises(ValueError):
+            load_baseline(str(path))
+
+    @pytest.mark.parametrize("data", [
+        [1, 2],
+        {"version": 1, "functions": [["f", 1, 2]]},
+        {"version": 1, "functions": {"f": 3}},
+        {"version": 1, "functions": {"f": [1]}},
+        {"version": 1, "functions": {"f": ["x", 2]}},
+    ])
+    def test_wrong_shape_rejected(self, tmp_path, data):
+        path = tmp_path / "b.json"
+        path.write_text(json.dumps(data))
+        with pytest.raises(ValueError, match="Malformed baseline"):
+            load_baseline(str(path))
+
+
+class TestCompare:
+    def test_growth_over_threshold_is_regression(self):
+        regs = compare_to_baseline({"f": (10, 100)}, {"f": (10, 106)}, threshold=5)
+        assert [(r.metric, r.before, r.after) for r in regs] == [("cycles", 100, 106)]
+        assert regs[0].percent == pytest.approx(6.0)
+
+    def test_growth_within_threshold_passes(self):
+        assert compare_to_baseline({"f": (10, 100)}, {"f": (10, 105)}, threshold=5) == []
+
+    def test_improvement_passes(self):
+        assert compare_to_baseline({"f": (10, 100)}, {"f": (8, 50)}) == []
+
+    def test_cost_from_zero_is_regression(self):
+        regs = compare_to_baseline({"f": (3, 0)}, {"f": (3, 4)})
+        assert regs[0].percent == float("inf")
+
+    def test_new_and_missing(self):
+        assert new_and_missing({"a": (1, 1), "b": (1, 1)}, {"b": (1, 1), "c": (1, 1)}) == (["c"], ["a"])
+
+
+class TestRunCheck:
+    def test_update_then_pass_then_fail(self, tmp_path, capsys):
+        src = tmp_path / "hot.cpp"
+        src.write_text("int sq(int x) { return x * x; }\n")
+        baseline = tmp_path / "baseline.json"
+
+        with patch("localbolt.regression.analyze_many", return_value=_reports()):
+            assert run_check([str(src), "--baseline", str(baseline), "--update"]) == 1  # broken.cpp failed
+            assert "hot.cpp::sq(int)" in baseline.read_text()
+
+        ok = [r for r in _reports() if r.ok]
+        with patch("localbolt.regression.analyze_many", return_value=ok):
+            assert run_check([str(src), "--baseline", str(baseline)]) == 0
+
+        worse = [r for r in _reports(cycles_sq=20) if r.ok]
+        with patch("localbolt.regression.analyze_many", return_value=worse):
+            assert run_check([str(src), "--baseline", str(baseline)]) == 1
+        assert "REGRESSION hot.cpp::sq(int): cycles 10 -> 20" in capsys.readouterr().out
+
+    def test_missing_baseline_file(self, tmp_path):
+        src = tmp_path / "hot.cpp"
+        src.write_text("int f();\n")
+        with patch("localbolt.regression.analyze_many", return_value=[]):
+            assert run_check([str(src), "--baseline", str(tmp_path / "nope.json")]) == 1
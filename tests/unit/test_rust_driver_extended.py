@@ -77,6 +77,18 @@ class TestRustDriverAnalyzePerf:
                     result = driver.analyze_perf("push rbp\nret")
                     assert "Instruction Info" in result
 
+    def test_analyze_perf_passes_mcpu(self):
+        mock_proc = MagicMock()
+        mock_proc.communicate.return_value = ("Instruction Info:", "")
+        mock_proc.returncode = 0
+
+        with patch("shutil.which", return_value="/usr/bin/rustc"):
+            driver = RustCompilerDriver()
+            with patch("shutil.which", return_value="/usr/bin/llvm-mca"):
+                with patch("subprocess.Popen", return_value=mock_proc) as mock_popen:
+                    driver.analyze_perf("push rbp\nret", mcpu="znver3")
+                    assert "-mcpu=znver3" in mock_popen.call_args[0][0]
+
     def test_analyze_perf_mca_error(self):
         mock_proc = MagicMock()
         mock_proc.communicate.return_value = ("", "fatal error")
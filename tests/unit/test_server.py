@@ -0,0 +1,239 @@
+"""
+Tests for the daemon (server.py), its clients (client.py) and the wire
+format (protocol.py). The engine pipeline is patched out; no compiler runs.
+"""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from localbolt import protocol
+from localbolt.client import BoltClient, RemoteEngine, run_query
+from localbolt.parsing.asm_diff import FlagComparison, FunctionComparison, FunctionDiff, ListingDiff
+from localbolt.parsing.diagnostics import Diagnostic
+from localbolt.parsing.functions import FunctionInfo
+from localbolt.parsing.hotspots import HotSpot, SourceCost
+from localbolt.parsing.locations import SourceLocations
+from localbolt.parsing.perf_parser import InstructionStats
+from localbolt.server import BoltServer
+from localbolt.utils.state import LocalBoltState
+
+ASM = "sq(int):\n\timul\tedi, edi\n\tmov\teax, edi\n\tret\n"
+
+
+def test_state_round_trip():
+    state = LocalBoltState(
+        source_path="/src/a.cpp", source_code="int sq(int x) { return x * x; }\n",
+        asm_content=ASM, asm_mapping={1: 1, 2: 1},
+        perf_stats={0: InstructionStats(3, 1.0, 1.0), 1: InstructionStats(1, 1.0, 0.25)},
+        functions=[FunctionInfo("sq(int)", 0, 4, instruction_count=3, total_cycles=4)],
+        hot_lines=[HotSpot("sq(int)", 1, 1, 2, 4, 1.0)], hot_functions=[HotSpot("sq(int)", 0, 0, 3, 4, 1.0)],
+        source_costs={1: SourceCost([1, 2], instructions=2, cycles=4)},
+        source_locations=SourceLocations({1: "/src/a.cpp", 2: "/inc/b.h"}),
+        cpu_perf_stats={"znver4": {0: InstructionStats(3, 1.0, 0.5)}},
+        asm_diff=ListingDiff([FunctionDiff("sq(int)", "changed", added_lines=[1], cycles_after=4, label_line=0)]),
+        user_flags=["-O2"], diagnostics=[Diagnostic(1, 5, "warning", "unused", end_line=1, end_column=9)],
+        previous_asm_content=ASM, previous_perf_stats={0: InstructionStats(3, 1.0, 1.0)},
+    )
+    state.source_locations.append(1, 1, 1)
+    state.source_locations.append(2, 2, 30, column=9, discriminator=2, inlined_at=1)
+    encoded = protocol.encode_state(state)
+    # The previous listing stays server-side: asm_diff already carries what changed
+    assert "previous_asm_content" not in encoded and "previous_perf_stats" not in encoded
+    decoded = protocol.decode_state(protocol.decode(protocol.encode(encoded)))
+    assert decoded.asm_mapping == state.asm_mapping
+    assert decoded.perf_stats == state.perf_stats
+    assert decoded.functions == state.functions
+    assert decoded.hot_lines == state.hot_lines and decoded.hot_functions == state.hot_functions
+    assert decoded.source_costs == state.source_costs
+    assert decoded.source_locations.files == {1: "/src/a.cpp", 2: "/inc/b.h"}
+    assert decoded.source_locations.lookup(2) == (2, 30, 9, 2, 1)
+    assert decoded.cpu_perf_stats == state.cpu_perf_stats and decoded.target_cpus == ["znver4"]
+    assert decoded.asm_diff == state.asm_diff
+    assert decoded.diagnostics == state.diagnostics
+    assert decoded.source_lines == ["int sq(int x) { return x * x; }"]
+
+
+def test_comparison_round_trip():
+    result = FlagComparison(["-O1"], ["-O3"], [FunctionComparison("f", 4, 2, 9, 5, 0, 2, {3: (2, 1)})])
+    encoded = protocol.decode(protocol.encode(protocol.encode_comparison(result)))
+    assert protocol.decode_comparison(encoded) == result
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "a.cpp"
+    path.write_text("int sq(int x) { return x * x; }\n")
+    return str(path)
+
+
+@pytest.fixture
+def pipeline_runs():
+    runs = []
+
+    def fake_pipeline(engine):
+        runs.append(list(engine.user_flags))
+        engine.state.source_code = "int sq(int x) { return x * x; }\n"
+        engine.state.user_flags = engine.user_flags
+        engine.state.update_asm(ASM, {1: 1, 2: 1, 3: 1})
+        engine.state.update_perf({0: InstructionStats(3, 1.0, 1.0)}, "")
+        engine.state.functions = [FunctionInfo("sq(int)", 0, 4, instruction_count=3, total_cycles=3)]
+
+    with patch("localbolt.engine.BoltEngine._run_pipeline", fake_pipeline):
+        yield runs
+
+
+@pytest.fixture
+def server(pipeline_runs):
+    # AF_UNIX paths are limited to ~100 bytes, too short for pytest's tmp_path
+    directory = tempfile.mkdtemp(prefix="lb-")
+    srv = BoltServer(os.path.join(directory, "s.sock"), max_workers=2)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _open(server, source):
+    """RemoteEngine on source; returns (engine, event fired on each state update)."""
+    engine = RemoteEngine(source, server.socket_path)
+    updated = threading.Event()
+    engine.on_update_callback = lambda state: updated.set()
+    engine.start()
+    assert updated.wait(5)
+    return engine, updated
+
+
+def test_remote_engine_receives_state(server, source, pipeline_runs):
+    engine, updated = _open(server, source)
+    assert engine.state.asm_content == ASM
+    assert engine.state.perf_stats[0].latency == 3
+
+    updated.clear()
+    engine.set_flags(["-O3"])
+    assert updated.wait(5)
+    assert engine.state.user_flags == ["-O3"]
+    assert pipeline_runs == [[], ["-O3"]]
+    engine.stop()
+
+
+@pytest.mark.asyncio
+async def test_tui_settings_reach_the_daemon(server, source, pipeline_runs):
+    """--connect mode: the flags and CPU palettes reconfigure the daemon's engine, not just the local copy."""
+    from localbolt.ui.app import LocalBoltApp
+    from localbolt.ui.flags_palette import CpuTargetsPopup, FlagsPopup
+    engine = RemoteEngine(source, server.socket_path)
+    app = LocalBoltApp(source, engine=engine)
+    async with app.run_test(size=(120, 40)) as pilot:
+        await pilot.pause()
+        pilot.app.post_message(FlagsPopup.FlagsChanged("-O1"))
+        await pilot.pause()
+        await pilot.app.workers.wait_for_complete()
+        pilot.app.post_message(CpuTargetsPopup.TargetsChanged(["znver4"]))
+        await pilot.pause()
+        await pilot.app.workers.wait_for_complete()
+    daemon_engine = server.workspace.engines[engine.path]
+    assert daemon_engine.user_flags == ["-O1"] and daemon_engine.target_cpus == ["znver4"]
+    assert ["-O1"] in pipeline_runs
+    assert engine.user_flags == ["-O1"]
+
+
+def test_reopening_is_served_warm(server, source, pipeline_runs):
+    engine, _ = _open(server, source)
+    engine.stop()
+    engine, _ = _open(server, source)
+    assert engine.state.asm_content == ASM
+    assert len(pipeline_runs) == 1
+    engine.stop()
+
+
+@pytest.fixture
+def query_runs():
+    """Flag sets analyzed for queries, apart from the shared engine."""
+    runs = []
+
+    def fake_analyze(engine, flags):
+        runs.append(list(flags))
+        return ASM, {1: 1, 2: 1, 3: 1}, {2: 3}, ""
+
+    with patch("localbolt.engine.BoltEngine._analyze_with_flags", fake_analyze):
+        yield runs
+
+
+def test_query_reports_functions(server, source, pipeline_runs, query_runs, capsys):
+    assert run_query([source, "--socket", server.socket_path, "--flags=-O2", "-f", "csv"]) == 0
+    assert "sq(int),3,3,1," in capsys.readouterr().out
+    assert run_query([source, "--socket", server.socket_path]) == 0
+    assert query_runs == [["-O2"]]
+    assert pipeline_runs == [[]]
+
+
+def test_query_flags_leave_the_shared_engine_alone(server, source, pipeline_runs, query_runs, capsys):
+    engine, updated = _open(server, source)
+    updated.clear()
+    assert run_query([source, "--socket", server.socket_path, "--flags=-O2"]) == 0
+    assert '"-O2"' in capsys.readouterr().out
+    assert server.workspace.engines[engine.path].user_flags == []
+    assert pipeline_runs == [[]] and not updated.is_set()
+    engine.stop()
+
+
+def test_request_errors(server, source):
+    client = BoltClient(server.socket_path)
+    with pytest.raises(RuntimeError, match="absolute"):
+        client.request("open", file="a.cpp")
+    with pytest.raises(RuntimeError, match="not open"):
+        client.request("refresh", file=source)
+    with pytest.raises(RuntimeError, match="Unknown op"):
+        client.request("frobnicate")
+    assert client.request("ping")["version"] == protocol.PROTOCOL_VERSION
+    client.close()
+
+
+def test_socket_is_private_and_exclusive(server):
+    assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+    assert os.stat(os.path.dirname(server.socket_path)).st_mode & 0o777 == 0o700
+    with pytest.raises(RuntimeError, match="already listening"):
+        BoltServer(server.socket_path)
+
+
+def test_socket_created_private_and_directory_tightened(pipeline_runs):
+    directory = tempfile.mkdtemp(prefix="lb-")
+    os.chmod(directory, 0o755)
+    modes = []
+    real_bind = socket.socket.bind
+
+    def bind(sock, address):
+        real_bind(sock, address)
+        modes.append(os.stat(address).st_mode & 0o777)
+
+    with patch("socket.socket.bind", bind):
+        srv = BoltServer(os.path.join(directory, "s.sock"))
+    srv.server_close()
+    # Private from the moment it exists, not only after a later chmod
+    assert modes == [0o600]
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_leftover_socket_is_replaced(pipeline_runs):
+    directory = tempfile.mkdtemp(prefix="lb-")
+    path = os.path.join(directory, "s.sock")
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    dead.bind(path)
+    dead.close()
+    srv = BoltServer(path)
+    srv.server_close()
+    assert not os.path.exists(path)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_query_without_daemon(capsys):
+    assert run_query(["a.cpp", "--socket", "/nonexistent/localbolt.sock"]) == 1
+    assert "localbolt serve" in capsys.readouterr().err
@@ -0,0 +1,27 @@
+"""
+Unit tests for the cached on-demand source reader used for header peeks.
+"""
+import os
+
+from localbolt.utils.source_files import read_source_lines
+
+
+def test_reads_once_until_changed(tmp_path, monkeypatch):
+    header = tmp_path / "vec.h"
+    header.write_text("int a;\nint b;\n")
+    assert read_source_lines(str(header)) == ("int a;", "int b;")
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k))
+    assert read_source_lines(str(header)) == ("int a;", "int b;")
+    assert opened == []
+
+    header.write_text("int c;\n")
+    os.utime(header, ns=(0, 10**9))
+    assert read_source_lines(str(header)) == ("int c;",)
+    assert opened == [str(header)]
+
+
+def test_missing_file(tmp_path):
+    assert read_source_lines(str(tmp_path / "missing.h")) == ()
@@ -90,6 +90,61 @@ class TestSourcePeekMapping:
         )
         panel.show_for_asm_line(-1)
 
+    def test_header_shows_line_cost(self):
+        from localbolt.parsing.hotspots import SourceCost
+        panel = SourcePeekPanel()
+        panel.update_context(["int x;", "x *= 3;"], {0: 2}, source_costs={2: SourceCost([0], instructions=1, cycles=3)})
+        panel.update = lambda text: setattr(panel, "rendered", text.plain)
+        panel._render_line(2)
+        assert "line 2: 1 instr, 3 cycles" in panel.rendered
+        panel._render_line(1)
+        assert "instr" not in panel.rendered
+
+    def test_inlined_code_shows_header_line(self, tmp_path):
+        from localbolt.parsing.locations import SourceLocations
+        (tmp_path / "vec.h").write_text("template <class T>\nT twice(T x) {\n  return x + x;\n}\n")
+        locations = SourceLocations({1: "main.cpp", 2: "vec.h"})
+        locations.append(0, 2, 3, inlined_at=7)
+        panel = SourcePeekPanel()
+        panel.update_context(["int main() {"] * 8, {0: 7}, str(tmp_path / "main.cpp"), locations=locations)
+        panel.update = lambda text: setattr(panel, "rendered", text.plain)
+        panel.show_for_asm_line(0)
+        assert "vec.h:3  inlined at line 7" in panel.rendered
+        assert "return x + x;" in panel.rendered
+
+    def test_unreadable_header_falls_back_to_main_file(self):
+        from unittest.mock import MagicMock
+        from localbolt.parsing.locations import SourceLocations
+        locations = SourceLocations({1: "main.cpp", 2: "/nonexistent/vec.h"})
+        locations.append(0, 2, 3, inlined_at=1)
+        panel = SourcePeekPanel()
+        panel.update_context(["int main() {"], {0: 1}, "main.cpp", locations=locations)
+        panel._render_line = MagicMock()
+        panel.show_for_asm_line(0)
+        panel._render_line.assert_called_once_with(1)
+
+    def test_column_highlights_sub_expression(self):
+        from localbolt.parsing.locations import SourceLocations
+        from localbolt.ui.source_peek import _expression_span
+        code = "a[i] = b[i] * c[i] + d;"
+        start, end = _expression_span(code, 8)
+        assert code[start:end] == "b[i]"
+        start, end = _expression_span(code, 13)
+        assert code[start:end] == "*"
+        start, end = _expression_span(code, 16)
+        assert code[start:end] == "c[i]"
+        assert _expression_span(code, 0) is None
+        locations = SourceLocations({1: "main.c"})
+        locations.append(0, 1, 1, column=13)
+        panel = SourcePeekPanel()
+        panel.update_context([code], {0: 1}, "main.c", locations=locations)
+        panel.update = lambda text: setattr(panel, "rendered", text)
+        panel.show_for_asm_line(0)
+        assert "col 13" in panel.rendered.plain
+        highlighted = [panel.rendered.plain[span.start:span.end] for span in panel.rendered.spans
+                       if "on #af5f00" in str(span.style)]
+        assert highlighted == ["*"]
+
     def test_update_context_stores_lines(self):
         panel = SourcePeekPanel()
         lines = ["int main() {", "  return 0;", "}"]
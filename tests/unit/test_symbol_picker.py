@@ -0,0 +1,40 @@
+"""
+Unit tests for the jump-to-function palette's fuzzy matching.
+"""
+from localbolt.parsing.functions import FunctionInfo
+from localbolt.ui.symbol_picker import fuzzy_score, rank_symbols
+
+
+def _functions(*names):
+    return [FunctionInfo(name, start=i * 10, end=i * 10 + 5) for i, name in enumerate(names)]
+
+
+class TestFuzzyScore:
+    def test_subsequence_matches(self):
+        assert fuzzy_score("sqi", "square(int)") is not None
+        assert fuzzy_score("SQ", "square(int)") is not None
+        assert fuzzy_score("qs", "square(int)") is None
+
+    def test_empty_query_matches_everything(self):
+        assert fuzzy_score("", "main") == 0
+
+    def test_substring_beats_scattered(self):
+        assert fuzzy_score("sum", "checksum(int*)") > fuzzy_score("sum", "std::unique_ptr<S>::m()")
+
+    def test_word_start_beats_mid_word(self):
+        assert fuzzy_score("v", "std::vector<int>::size()") > fuzzy_score("v", "move()")
+
+
+class TestRankSymbols:
+    def test_best_match_first(self):
+        funcs = _functions("hash_combine(unsigned long)", "hash(int)", "rehash()")
+        assert [f.name for f in rank_symbols("hash", funcs)][:2] == ["hash(int)", "hash_combine(unsigned long)"]
+
+    def test_filters_and_limits(self):
+        funcs = _functions(*(f"f{i}()" for i in range(30)), "main")
+        assert [f.name for f in rank_symbols("main", funcs)] == ["main"]
+        assert len(rank_symbols("f", funcs, limit=5)) == 5
+
+    def test_empty_query_lists_in_listing_order(self):
+        funcs = _functions("main", "a()")
+        assert [f.name for f in rank_symbols("", funcs)] == ["main", "a()"]
@@ -0,0 +1,92 @@
+"""
+Tests for per-refresh stage timing (utils/timing.py) and the engine's
+timing/trace API.
+"""
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from localbolt.engine import BoltEngine
+from localbolt.utils.timing import RefreshTimings, recording, stage
+
+
+class TestRefreshTimings:
+    def test_stage_outside_recording_is_noop(self):
+        with stage("lex"):
+            pass  # no active timings; must not raise
+
+    def test_recording_collects_stages(self):
+        timings = RefreshTimings()
+        with recording(timings):
+            with stage("compile"):
+                pass
+            with stage("mca"):
+                pass
+        with stage("after"):
+            pass
+        assert [name for name, _ in timings.stages] == ["compile", "mca"]
+
+    def test_repeated_stages_summed(self):
+        timings = RefreshTimings(stages=[("mca", 1.0), ("mca", 2.5), ("refresh", 5.0), ("ui", 2.0)])
+        assert timings.by_stage() == {"mca": 3.5, "refresh": 5.0, "ui": 2.0}
+        assert timings.total_ms == 7.0
+
+    def test_json_line(self):
+        timings = RefreshTimings(source_path="a.cpp", started_at=1.0, stages=[("read", 0.1234)])
+        assert json.loads(timings.to_json()) == {
+            "source": "a.cpp", "started_at": 1.0, "total_ms": 0.0, "stages": {"read": 0.123},
+        }
+
+
+def _refresh(engine):
+    with patch.object(engine.driver, "compile", return_value=("main:\n\tret", "")):
+        with patch.object(engine.driver, "analyze_perf", return_value=""):
+            engine.refresh()
+
+
+class TestEngineTimings:
+    @pytest.fixture
+    def source(self):
+        f = tempfile.NamedTemporaryFile(suffix=".cpp", delete=False, mode="w")
+        f.write("int main() {}")
+        f.close()
+        yield f.name
+        os.unlink(f.name)
+
+    def test_refresh_records_pipeline_stages(self, source):
+        engine = BoltEngine(source)
+        _refresh(engine)
+        stages = engine.last_timings.by_stage()
+        for name in ("read", "compile", "lex", "demangle", "mca", "parse", "refresh"):
+            assert name in stages
+        assert engine.timing_history[-1] is engine.last_timings
+
+    def test_record_stage_attaches_to_last_refresh(self, source):
+        engine = BoltEngine(source)
+        engine.record_stage("ui", 1.0)  # nothing to attach to yet
+        _refresh(engine)
+        engine.record_stage("ui", 12.5)
+        assert engine.last_timings.by_stage()["ui"] == 12.5
+
+    def test_export_trace_writes_jsonl(self, source, tmp_path):
+        engine = BoltEngine(source)
+        _refresh(engine)
+        _refresh(engine)
+        out = tmp_path / "trace.jsonl"
+        engine.export_trace(str(out))
+        lines = out.read_text().splitlines()
+        assert len(lines) == 2
+        assert "compile" in json.loads(lines[0])["stages"]
+
+    def test_trace_env_appends_after_next_refresh(self, source, tmp_path):
+        out = tmp_path / "trace.jsonl"
+        with patch.dict(os.environ, {"LOCALBOLT_TRACE": str(out)}):
+            engine = BoltEngine(source)
+        _refresh(engine)
+        engine.record_stage("ui", 3.0)
+        assert not out.exists()
+        engine.stop()
+        assert "ui" in json.loads(out.read_text().splitlines()[0])["stages"]
@@ -0,0 +1,92 @@
+"""
+Tests for trailing-edge debouncing in AssemblyUpdateHandler (utils/watcher.py).
+Events are fed to the handler directly; no observer thread is started.
+"""
+import os
+import time
+
+import pytest
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+
+from localbolt.utils.watcher import AssemblyUpdateHandler
+
+QUIET = 0.05
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "main.cpp"
+    path.write_text("int f() { return 1; }\n")
+    return path
+
+
+def _handler(source, calls):
+    return AssemblyUpdateHandler(str(source), calls.append, quiet_period=QUIET)
+
+
+def _settle():
+    time.sleep(QUIET * 4)
+
+
+class TestTrailingEdge:
+    def test_burst_delivers_once_with_final_content(self, source):
+        calls, seen = [], []
+        handler = AssemblyUpdateHandler(str(source), lambda p: (calls.append(p), seen.append(source.read_text())),
+                                        quiet_period=QUIET)
+        source.write_text("int f() {")
+        handler.on_modified(FileModifiedEvent(str(source)))
+        source.write_text("int f() { return 2; }\n")
+        handler.on_modified(FileModifiedEvent(str(source)))
+        assert calls == []  # nothing fires inside the quiet period
+        _settle()
+        assert calls == [str(source.resolve())]
+        assert seen == ["int f() { return 2; }\n"]
+
+    def test_unchanged_content_is_skipped(self, source):
+        calls = []
+        handler = _handler(source, calls)
+        os.utime(source)
+        handler.on_modified(FileModifiedEvent(str(source)))
+        _settle()
+        assert calls == []
+
+    def test_other_files_are_ignored(self, source, tmp_path):
+        calls = []
+        handler = _handler(source, calls)
+        source.write_text("changed\n")
+        handler.on_modified(FileModifiedEvent(str(tmp_path / "other.cpp")))
+        _settle()
+        assert calls == []
+
+    def test_cancel_drops_pending_delivery(self, source):
+        calls = []
+        handler = _handler(source, calls)
+        source.write_text("changed\n")
+        handler.on_modified(FileModifiedEvent(str(source)))
+        handler.cancel()
+        _settle()
+        assert calls == []
+
+
+class TestAtomicSaves:
+    def test_rename_over_target(self, source, tmp_path):
+        calls = []
+        handler = _handler(source, calls)
+        tmp = tmp_path / ".main.cpp.swp"
+        tmp.write_text("int f() { return 3; }\n")
+        os.replace(tmp, source)
+        handler.on_moved(FileMovedEvent(str(tmp), str(source)))
+        _settle()
+        assert calls == [str(source.resolve())]
+
+    def test_delete_then_create(self, source):
+        calls = []
+        handler = _handler(source, calls)
+        source.unlink()
+        handler.on_modified(FileModifiedEvent(str(source)))
+        _settle()
+        assert calls == []  # file missing mid-save: wait for the create
+        source.write_text("int f() { return 4; }\n")
+        handler.on_created(FileCreatedEvent(str(source)))
+        _settle()
+        assert calls == [str(source.resolve())]
@@ -0,0 +1,136 @@
+"""
+Tests for workspace mode (workspace.py) and the shared compile cache
+(compiler/cache.py). Engines' refresh is patched out; no compiler runs.
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from localbolt.compiler.cache import CompileCache
+from localbolt.engine import BoltEngine
+from localbolt.workspace import Workspace
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _past_ns():
+    return time.time_ns() + 10**9  # compile "started" after every write in the test
+
+
+class TestCompileCache:
+    def test_hit_while_inputs_unchanged(self, tmp_path):
+        src, hdr = _write(tmp_path / "a.cpp", "int f();\n"), _write(tmp_path / "a.h", "#pragma once\n")
+        cache = CompileCache()
+        cache.store("g++", src, ["-O2"], "asm", "", [src, hdr], _past_ns())
+        entry = cache.lookup("g++", src, ["-O2"])
+        assert entry.asm == "asm"
+        assert cache.lookup("g++", src, ["-O3"]) is None
+
+    def test_header_edit_misses(self, tmp_path):
+        src, hdr = _write(tmp_path / "a.cpp", "int f();\n"), _write(tmp_path / "a.h", "#define K 1\n")
+        cache = CompileCache()
+        cache.store("g++", src, [], "asm", "", [src, hdr], _past_ns())
+        _write(tmp_path / "a.h", "#define K 2\n")
+        assert cache.lookup("g++", src, []) is None
+
+    def test_failures_and_unknown_dependencies_not_cached(self, tmp_path):
+        src = _write(tmp_path / "a.cpp", "int f(\n")
+        cache = CompileCache()
+        cache.store("g++", src, [], "", "error", [src], _past_ns())
+        cache.store("g++", src, ["-O1"], "asm", "", None, _past_ns())
+        assert cache.lookup("g++", src, []) is None
+        assert cache.lookup("g++", src, ["-O1"]) is None
+
+    def test_input_modified_during_compile_not_cached(self, tmp_path):
+        src = _write(tmp_path / "a.cpp", "int f();\n")
+        cache = CompileCache()
+        cache.store("g++", src, [], "asm", "", [src], started_ns=0)
+        assert cache.lookup("g++", src, []) is None
+
+    def test_lru_eviction(self, tmp_path):
+        src = _write(tmp_path / "a.cpp", "int f();\n")
+        cache = CompileCache(max_entries=2)
+        for level in ("-O0", "-O1", "-O2"):
+            cache.store("g++", src, [level], f"asm{level}", "", [src], _past_ns())
+        assert cache.lookup("g++", src, ["-O0"]) is None
+        assert cache.lookup("g++", src, ["-O2"]).asm == "asm-O2"
+
+    def test_engine_skips_driver_on_hit(self, tmp_path):
+        src = _write(tmp_path / "a.cpp", "int f();\n")
+        engine = BoltEngine(src, compile_cache=CompileCache())
+        engine.driver = MagicMock(compiler="g++", last_dependencies=[src])
+        engine.driver.compile.return_value = ("f:\n\tret\n", "")
+        with patch("localbolt.engine.time.time_ns", return_value=_past_ns()):
+            assert engine._compile([])[0] == "f:\n\tret\n"
+            assert engine._compile([])[0] == "f:\n\tret\n"
+        assert engine.driver.compile.call_count == 1
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    paths = [_write(tmp_path / "a.cpp", "int a();\n"), _write(tmp_path / "b.cpp", "int b();\n"),
+             _write(tmp_path / "c.rs", "fn c() {}\n")]
+    ws = Workspace(paths, max_workers=2)
+    refreshed = []
+    for path, engine in ws.engines.items():
+        engine.refresh = lambda path=path: (refreshed.append(path), ws.engines[path].on_update_callback(ws.engines[path].state))
+    ws.refreshed = refreshed
+    yield ws
+    ws.stop()
+
+
+def _drain(ws):
+    ws.pool.submit(lambda: None).result()
+    time.sleep(0.05)
+
+
+class TestWorkspace:
+    def test_shares_observer_drivers_and_cache(self, workspace):
+        a, b, c = workspace.engines.values()
+        assert a.watcher.observer is b.watcher.observer is workspace.observer
+        assert a.driver is b.driver
+        assert c.driver is not a.driver
+        assert a.compile_cache is c.compile_cache is workspace.cache
+
+    def test_only_active_file_is_analyzed_at_start(self, workspace):
+        updates = []
+        workspace.on_update_callback = updates.append
+        workspace.start()
+        _drain(workspace)
+        assert workspace.refreshed == [workspace.paths[0]]
+        assert updates == [workspace.engines[workspace.paths[0]].state]
+
+    def test_background_save_refreshes_on_activation(self, workspace):
+        workspace.start()
+        _drain(workspace)
+        a, b, _ = workspace.paths
+        workspace._on_file_saved(b)
+        _drain(workspace)
+        assert workspace.refreshed == [a]
+        assert workspace.is_stale(b)
+        workspace.activate(b)
+        _drain(workspace)
+        assert workspace.refreshed == [a, b]
+
+    def test_reactivating_fresh_file_resends_state(self, workspace):
+        updates = []
+        workspace.on_update_callback = updates.append
+        workspace.start()
+        _drain(workspace)
+        a, b, _ = workspace.paths
+        workspace.activate(b)
+        _drain(workspace)
+        workspace.activate(a)
+        assert workspace.refreshed == [a, b]
+        assert updates[-1] is workspace.engines[a].state
+
+    def test_background_updates_are_not_forwarded(self, workspace):
+        updates = []
+        workspace.on_update_callback = updates.append
+        a, b, _ = workspace.paths
+        workspace._on_engine_update(b, workspace.engines[b].state)
+        assert updates == []